@@ -5,7 +5,13 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications.core'
 
+    def ready(self):
+        from applications.core import jobs, signals  # noqa: F401
+
 
 class TenantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'applications.tenants'
+
+    def ready(self):
+        from applications.tenants import jobs, signals  # noqa: F401
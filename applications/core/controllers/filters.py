@@ -0,0 +1,110 @@
+from functools import lru_cache
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import (DateField, DateTimeField, DecimalField, FloatField, IntegerField, TimeField,
+                              UniqueConstraint)
+from django.db.models.functions import Upper
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from applications.core.services.query_usage import (FILTER_USAGE, ORDERING_USAGE, SEARCH_USAGE,
+                                                    record_query_usage)
+
+# ``filterset_fields`` value that exposes only the fields a database index can serve.
+INDEXED_FIELDS = '__indexed__'
+RANGE_FIELD_TYPES = (DateField, DateTimeField, DecimalField, FloatField, IntegerField, TimeField)
+FULLTEXT_SEARCH = 'fulltext'
+FULLTEXT_CONFIG = 'simple'
+
+
+@lru_cache(maxsize=None)
+def indexed_fields(model):
+    """Fields of ``model`` leading some index: primary key, unique, ``db_index`` (incl. foreign keys), Meta indexes."""
+    names = {field.name for field in model._meta.concrete_fields if field.primary_key or field.unique or field.db_index}
+    names |= {index.fields[0].lstrip('-') for index in model._meta.indexes if index.fields}
+    names |= {constraint.fields[0] for constraint in model._meta.constraints
+              if isinstance(constraint, UniqueConstraint) and constraint.fields}
+    names |= {fields[0] for fields in model._meta.unique_together}
+    return tuple(sorted(names))
+
+
+def indexed_filterset_fields(model):
+    fields = {}
+    for name in indexed_fields(model):
+        field = model._meta.get_field(name)
+        lookups = ['exact', 'in']
+        if isinstance(field, RANGE_FIELD_TYPES) and not field.is_relation:
+            lookups += ['lt', 'lte', 'gt', 'gte']
+        fields[name] = lookups
+    return fields
+
+
+def trigram_index(*fields, name):
+    """GIN trigram index making ``icontains`` search on ``fields`` index-backed. Needs the pg_trgm extension
+    (``django.contrib.postgres.operations.TrigramExtension`` in a migration)."""
+    return GinIndex(*[OpClass(Upper(field), name='gin_trgm_ops') for field in fields], name=name)
+
+
+def fulltext_index(*fields, name):
+    """GIN index matching the ``search_mode = 'fulltext'`` query on ``fields``."""
+    return GinIndex(SearchVector(*fields, config=FULLTEXT_CONFIG), name=name)
+
+
+@lru_cache(maxsize=None)
+def _indexed_filterset_class(filterset_base, model):
+    meta = type('Meta', (), {'model': model, 'fields': indexed_filterset_fields(model)})
+    return type(f'{model.__name__}IndexedFilterSet', (filterset_base,), {'Meta': meta})
+
+
+class IndexedFilterBackend(DjangoFilterBackend):
+    """``DjangoFilterBackend`` that understands ``filterset_fields = INDEXED_FIELDS`` and records filter usage."""
+
+    def get_filterset_class(self, view, queryset=None):
+        if getattr(view, 'filterset_fields', None) != INDEXED_FIELDS or getattr(view, 'filterset_class', None):
+            return super().get_filterset_class(view, queryset)
+        return _indexed_filterset_class(self.filterset_base, queryset.model)
+
+    def filter_queryset(self, request, queryset, view):
+        field_names = [param.split('__')[0] for param in request.query_params]
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        record_query_usage(queryset.model, FILTER_USAGE, [name for name in field_names if name in model_fields])
+        return super().filter_queryset(request, queryset, view)
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """
+    ``OrderingFilter`` that records ordering usage and, unless the view lists its own ``ordering_fields``, only
+    accepts the fields a database index can serve (``INDEXED_FIELDS``) instead of every serializer field.
+    """
+
+    def get_valid_fields(self, queryset, view, context=None):
+        ordering_fields = getattr(view, 'ordering_fields', self.ordering_fields)
+        if ordering_fields is not None and ordering_fields != INDEXED_FIELDS:
+            return super().get_valid_fields(queryset, view, context or {})
+        return [(name, name) for name in indexed_fields(queryset.model)]
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if request.query_params.get(self.ordering_param):
+            record_query_usage(queryset.model, ORDERING_USAGE, [field.lstrip('-') for field in ordering or []])
+        return ordering
+
+
+class IndexedSearchFilter(SearchFilter):
+    """
+    ``SearchFilter`` (``icontains``, index-backed once the fields have a ``trigram_index``) or, for views with
+    ``search_mode = 'fulltext'``, a Postgres full-text query matching ``fulltext_index``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return super().filter_queryset(request, queryset, view)
+        record_query_usage(queryset.model, SEARCH_USAGE, [field.lstrip('^=@$') for field in search_fields])
+        if getattr(view, 'search_mode', None) != FULLTEXT_SEARCH:
+            return super().filter_queryset(request, queryset, view)
+        vector = SearchVector(*search_fields, config=FULLTEXT_CONFIG)
+        query = SearchQuery(' '.join(terms), config=FULLTEXT_CONFIG, search_type='websearch')
+        return queryset.annotate(search_vector=vector).filter(search_vector=query)
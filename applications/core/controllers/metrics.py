@@ -0,0 +1,48 @@
+import hmac
+
+from django.db import connection
+from django.http import HttpResponse
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from applications.core.services.request_metrics import get_request_metrics
+from applications.core.services.request_timing import get_instrumentation_options
+from applications.core.services.tenant_cache import get_tenant_cache
+from applications.core.services.timing_stats import timing_stats
+
+
+class HasMetricsToken(BasePermission):
+    """Lets scrapers in with ``Authorization: Bearer <INSTRUMENTATION['METRICS_TOKEN']>``, when a token is set."""
+
+    def has_permission(self, request, view):
+        token = get_instrumentation_options()['METRICS_TOKEN']
+        if not token:
+            return False
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+class DatabasePoolMetricsController(APIView):
+    """Connection pool usage and ``search_path`` reuse of the worker answering the request."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, _):
+        return Response(connection.get_pool_stats())
+
+
+class TenantCacheMetricsController(APIView):
+    """Hit/miss counters per cache namespace of the worker answering the request."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, _):
+        return Response(get_tenant_cache().stats())
+
+
+class PrometheusMetricsController(APIView):
+    """Request latency, status, phase time, query and model validation counters of the worker answering the scrape."""
+    authentication_classes = []
+    permission_classes = [HasMetricsToken]
+
+    def get(self, _):
+        body = get_request_metrics().render() + timing_stats.render()
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -1,14 +1,629 @@
+import csv
+import hashlib
+import io
+import logging
+import math
+import uuid
 from abc import ABC
+from functools import update_wrapper
 
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.http import http_date, parse_etags, quote_etag
+from django_tenants.utils import get_tenant_model
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
 from rest_framework.viewsets import ModelViewSet
 
+from applications.core.controllers.filters import INDEXED_FIELDS
+from applications.core.controllers.renderers import CSVStreamRenderer, NDJSONStreamRenderer, ORJSONRenderer
+from applications.core.jobs import CSV_IMPORT_JOB
+from applications.core.serializers.compiled import NotCompilable, compile_serializer
+from applications.core.serializers.introspection import iter_nested_serializers, related_lookups
+from applications.core.serializers.timing import timed_serializer
+from applications.core.services import fast_json
+from applications.core.services.aggregations import apply_bulk_aggregations
+from applications.core.services.csv_import import CsvImporter
+from applications.core.services.model_versions import bump_model_version, get_model_versions, track_model_versions
+from applications.core.services.query_budget import (OFF_MODE, RAISE_MODE, QueryBudgetExceeded, QueryCounter,
+                                                     get_query_budget_options)
+from applications.core.services.request_timing import measure
+from applications.core.services.tenant_cache import get_tenant_cache
+from applications.tenants.context import get_current_tenant
+from applications.tenants.services.jobs import enqueue
 
-class ReadableWritableModelController(ModelViewSet, ABC):
+logger = logging.getLogger(__name__)
+
+
+class AsyncActionsMixin:
+    """
+    Serves the actions listed in ``async_actions`` from coroutine handlers named ``a<action>`` (``alist``,
+    ``acallback``...) when ``ASYNC_CONTROLLERS`` is enabled, so ASGI deployments do not spend a thread per request on
+    them. Any other action of the same route keeps running on its sync handler.
+    """
+    async_actions = ()
+    serve_async = False
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if not cls._has_async_actions(actions):
+            return super().as_view(actions, **initkwargs)
+        view = super().as_view(actions, serve_async=True, **initkwargs)
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) in cls.async_actions:
+                return await view(request, *args, **kwargs)
+            return await sync_view(request, *args, **kwargs)
+
+        return markcoroutinefunction(update_wrapper(async_view, view))
+
+    @classmethod
+    def _has_async_actions(cls, actions):
+        if not getattr(settings, 'ASYNC_CONTROLLERS', False) or not actions:
+            return False
+        return any(action in cls.async_actions for action in actions.values())
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.serve_async and self.action_map.get(request.method.lower()) in self.async_actions:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f'a{self.action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class ConditionalReadMixin:
+    """
+    ETag / Last-Modified support for ``list`` and ``retrieve``. Validators come from the per-tenant version of the
+    queryset model and of every model nested in the readable serializer (bumped on save/delete), so an unchanged
+    resource answers 304 before any query or serialization runs. With ``cache_list_pages`` the serialized list page is
+    also kept in the tenant cache, keyed on the same validator (hence on the query params).
+
+    Versions must be shared by every worker, so ``conditional_reads`` (None) is only on when the tenant cache's L2 is
+    shared. Requests are validated with the ETag alone: ``Last-Modified`` has one second resolution and cannot tell a
+    write from a read made in the same second.
+    """
+    conditional_reads = None
+    cache_list_pages = False
+    list_page_cache_timeout = 300
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Track versions as soon as the controller is defined, so writes bump them in every process importing it.
+        for model in cls._declared_dependency_models():
+            track_model_versions(model)
+
+    @classmethod
+    def _declared_dependency_models(cls):
+        queryset = getattr(cls, 'queryset', None)
+        models = {queryset.model} if queryset is not None else set()
+        serializer_class = getattr(cls, 'readable_serializer', None) or getattr(cls, 'serializer_class', None)
+        if serializer_class is not None:
+            models |= {nested.Meta.model for _, nested, _ in iter_nested_serializers(serializer_class())}
+        return models
+
+    def list(self, request, *args, **kwargs):
+        if not self.uses_conditional_reads():
+            return super().list(request, *args, **kwargs)
+        etag, last_modified = self.get_read_validators(request)
+        not_modified = self._not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        if self.cache_list_pages:
+            data = get_tenant_cache().get_or_set('list-pages', etag,
+                                                 lambda: super(ConditionalReadMixin, self).list(request).data,
+                                                 timeout=self.list_page_cache_timeout)
+            response = Response(data)
+        else:
+            response = super().list(request, *args, **kwargs)
+        return self._with_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.uses_conditional_reads():
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = self.get_read_validators(request)
+        not_modified = self._not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self._with_validators(super().retrieve(request, *args, **kwargs), etag, last_modified)
+
+    def uses_conditional_reads(self):
+        if self.conditional_reads is None:
+            return get_tenant_cache().is_shared
+        return self.conditional_reads
+
+    def get_read_validators(self, request):
+        versions = get_model_versions(self.get_dependency_models())
+        fingerprint = '|'.join([self.__class__.__qualname__, self.action, request.get_full_path(),
+                                str(getattr(request.user, 'pk', None)), request.accepted_media_type or '',
+                                *(f'{version:.6f}' for version in versions)])
+        return quote_etag(hashlib.sha1(fingerprint.encode()).hexdigest()), math.ceil(max(versions))
+
+    def get_dependency_models(self):
+        # Cached on the class itself: a subclass may nest other models than the controller it extends.
+        cls = type(self)
+        if '_dependency_models' not in cls.__dict__:
+            models = {self.get_queryset().model}
+            serializer_class = self.readable_serializer or self.get_serializer_class()
+            if serializer_class is not None:
+                models |= {nested.Meta.model for _, nested, _ in iter_nested_serializers(serializer_class())}
+            for model in models:
+                track_model_versions(model)
+            cls._dependency_models = tuple(sorted(models, key=lambda model: model._meta.label))
+        return cls._dependency_models
+
+    @staticmethod
+    def _not_modified_response(request, etag, last_modified):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is None or not (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            return None
+        return ConditionalReadMixin._with_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag,
+                                                     last_modified)
+
+    @staticmethod
+    def _with_validators(response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class QueryBudgetMixin:
+    """
+    When ``QUERY_BUDGET['MODE']`` is ``log`` or ``raise`` (development and tests), counts the queries of every request,
+    reports them in ``X-Query-Count`` and checks them against ``query_budgets[action]``. SQL repeated at least
+    ``N_PLUS_ONE_THRESHOLD`` times in one request is reported as a likely N+1.
+    """
+    query_budgets = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        options = get_query_budget_options()
+        if options['MODE'] == OFF_MODE or getattr(self, 'serve_async', False):
+            return super().dispatch(request, *args, **kwargs)
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = super().dispatch(request, *args, **kwargs)
+        response['X-Query-Count'] = str(counter.count)
+        self._check_query_budget(counter, options)
+        return response
+
+    def _check_query_budget(self, counter, options):
+        problems = []
+        budget = self.query_budgets.get(self.action)
+        if budget is not None and counter.count > budget:
+            problems.append(f'{counter.count} queries, budget is {budget}')
+        for sql, times in counter.repeated_statements(options['N_PLUS_ONE_THRESHOLD']).items():
+            problems.append(f'possible N+1, {times} times: {sql}')
+        if not problems:
+            return
+        message = f'{self.__class__.__name__}.{self.action}: ' + '; '.join(problems)
+        if options['MODE'] == RAISE_MODE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class BulkActionsMixin:
+    """
+    ``<list url>/bulk/`` endpoint: POST creates, PUT/PATCH update (every item carries its ``id``) and DELETE removes
+    (``{"ids": [...]}``) many rows at once. The whole payload is validated first and nothing is written unless every
+    row is valid; errors come back per row index. Writes use ``bulk_create``/``bulk_update`` in ``bulk_batch_size``
+    batches inside one transaction.
+    """
+    bulk_batch_size = 500
+    bulk_max_rows = 5000
+
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({'error': 'Expected a non empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.bulk_max_rows:
+            return Response({'error': f'At most {self.bulk_max_rows} rows per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if request.method == 'POST':
+            return self.bulk_create(rows)
+        return self.bulk_update(rows, partial=request.method == 'PATCH')
+
+    def bulk_create(self, rows):
+        serializer = self._without_unique_validators(self.get_serializer(data=rows, many=True))
+        if not serializer.is_valid():
+            return self._bulk_errors_response(enumerate(serializer.errors))
+        model = self.get_queryset().model
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        if any(many_to_many & attributes.keys() for attributes in serializer.validated_data):
+            # bulk_create cannot set many-to-many relations: fall back to the serializer, still in one transaction.
+            with transaction.atomic():
+                serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        instances = [model(**attributes) for attributes in serializer.validated_data]
+        errors = self.validate_bulk_instances(instances)
+        if errors:
+            return self._bulk_errors_response(errors.items())
+        with transaction.atomic():
+            instances = model.objects.bulk_create(instances, batch_size=self.bulk_batch_size)
+            apply_bulk_aggregations(model, created=instances)
+        bump_model_version(model)
+        return Response(self.get_serializer(instances, many=True).data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, rows, partial=False):
+        model = self.get_queryset().model
+        ids = [self._bulk_pk(model, row) for row in rows]
+        existing = self.filter_queryset(self.get_queryset()).in_bulk([pk for pk in ids if pk is not None])
+        many_to_many = {field.name for field in model._meta.many_to_many}
+        instances, relations, errors, updated_fields = [], [], {}, set()
+        for index, (pk, row) in enumerate(zip(ids, rows)):
+            if pk not in existing:
+                errors[index] = {'id': ['Not found.']}
+                continue
+            serializer = self._without_unique_validators(self.get_serializer(existing[pk], data=row, partial=partial))
+            if not serializer.is_valid():
+                errors[index] = serializer.errors
+                continue
+            for attribute, value in serializer.validated_data.items():
+                if attribute in many_to_many:
+                    relations.append((existing[pk], attribute, value))
+                    continue
+                setattr(existing[pk], attribute, value)
+                updated_fields.add(attribute)
+            instances.append((index, existing[pk]))
+        errors.update(self.validate_bulk_instances([instance for _, instance in instances],
+                                                   indexes=[index for index, _ in instances]))
+        if errors:
+            return self._bulk_errors_response(sorted(errors.items()))
+        instances = [instance for _, instance in instances]
+        with transaction.atomic():
+            if updated_fields:
+                model.objects.bulk_update(instances, fields=sorted(updated_fields), batch_size=self.bulk_batch_size)
+            # bulk_update cannot write many-to-many relations: set them per row, as ``serializer.save()`` would.
+            for instance, attribute, value in relations:
+                getattr(instance, attribute).set(value)
+            apply_bulk_aggregations(model, updated=instances)
+        bump_model_version(model)
+        return Response(self.get_serializer(instances, many=True).data)
+
+    def bulk_destroy(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'Expected {"ids": [...]}'}, status=status.HTTP_400_BAD_REQUEST)
+        model = self.get_queryset().model
+        pks = [self._bulk_pk(model, {'id': pk}) for pk in ids]
+        errors = [(index, {'id': ['Invalid id.']}) for index, pk in enumerate(pks) if pk is None]
+        if errors:
+            return self._bulk_errors_response(errors)
+        with transaction.atomic():
+            deleted, _ = self.filter_queryset(self.get_queryset()).filter(pk__in=pks).delete()
+        bump_model_version(model)
+        return Response({'deleted': deleted})
+
+    def validate_bulk_instances(self, instances, indexes=None):
+        """Model-level validation (``CleanModelMixin``) of instances about to be bulk written: {index: errors}."""
+        indexes = list(indexes) if indexes is not None else list(range(len(instances)))
+        model = self.get_queryset().model
+        if hasattr(model, 'full_clean_batch'):
+            errors = model.full_clean_batch(instances)
+            return {indexes[position]: row_errors for position, row_errors in errors.items()}
+        errors = {}
+        for index, instance in zip(indexes, instances):
+            try:
+                instance.full_clean()
+            except ValidationError as e:
+                errors[index] = e.message_dict
+        return errors
+
+    def _without_unique_validators(self, serializer):
+        """
+        Drops the per-row ``UniqueValidator`` queries when ``validate_bulk_instances`` checks uniqueness for the whole
+        batch in one query anyway.
+        """
+        if not hasattr(self.get_queryset().model, 'full_clean_batch'):
+            return serializer
+        for field in getattr(serializer, 'child', serializer).fields.values():
+            field.validators = [validator for validator in field.validators
+                                if not isinstance(validator, UniqueValidator)]
+        return serializer
+
+    @staticmethod
+    def _bulk_pk(model, row):
+        """The row's ``id`` as the primary key type ``in_bulk`` keys use (``"7"`` -> ``7``), None when invalid."""
+        if not isinstance(row, dict) or row.get('id') is None:
+            return None
+        try:
+            return model._meta.pk.to_python(row['id'])
+        except ValidationError:
+            return None
+
+    @staticmethod
+    def _bulk_errors_response(errors):
+        errors = [{'index': index, 'errors': row_errors} for index, row_errors in errors if row_errors]
+        return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands back the line, so ``csv.writer`` can feed a generator."""
+
+    @staticmethod
+    def write(value):
+        return value
+
+
+class ExportActionsMixin:
+    """
+    ``<list url>/export/csv/`` and ``<list url>/export/ndjson/`` stream every row matching the ``list`` filters and
+    ordering, without pagination. Rows are read through a server-side cursor ``export_chunk_size`` at a time and sent
+    as they are serialized, so memory stays flat whatever the row count.
+    """
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=['get'], url_path='export/csv', renderer_classes=[CSVStreamRenderer, ORJSONRenderer])
+    def export_csv(self, request, *args, **kwargs):
+        return self._export_response(self._csv_chunks(self._export_rows()), 'text/csv', 'csv')
+
+    @action(detail=False, methods=['get'], url_path='export/ndjson',
+            renderer_classes=[NDJSONStreamRenderer, ORJSONRenderer])
+    def export_ndjson(self, request, *args, **kwargs):
+        return self._export_response(self._ndjson_chunks(self._export_rows()), 'application/x-ndjson', 'ndjson')
+
+    def _export_rows(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        if getattr(self, 'compiled_reads', False):
+            compiled = self.get_compiled_serializer()
+            for row in compiled.queryset(queryset).iterator(chunk_size=self.export_chunk_size):
+                yield compiled.represent(row)
+            return
+        serializer = self.get_serializer()
+        for instance in queryset.iterator(chunk_size=self.export_chunk_size):
+            yield serializer.to_representation(instance)
+
+    def _export_response(self, chunks, content_type, extension):
+        tenant = get_current_tenant() or connection.tenant
+
+        def tenant_chunks():
+            # Rows are read after the view returns: make sure they still come from this request's schema.
+            connection.set_tenant(tenant)
+            yield from chunks
+
+        response = StreamingHttpResponse(tenant_chunks(), content_type=f'{content_type}; charset=utf-8')
+        filename = f'{self.get_queryset().model._meta.model_name}.{extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    def _csv_chunks(self, rows):
+        writer = csv.writer(_Echo())
+        header, lines = None, []
+        for row in rows:
+            if header is None:
+                header = list(row)
+                lines.append(writer.writerow(header))
+            lines.append(writer.writerow([self._csv_value(row.get(column)) for column in header]))
+            if len(lines) >= self.export_chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
+
+    @staticmethod
+    def _csv_value(value):
+        if isinstance(value, (dict, list)):
+            return fast_json.dumps(value).decode()
+        return value
+
+    def _ndjson_chunks(self, rows):
+        lines = []
+        for row in rows:
+            lines.append(fast_json.dumps(row) + b'\n')
+            if len(lines) >= self.export_chunk_size:
+                yield b''.join(lines)
+                lines = []
+        if lines:
+            yield b''.join(lines)
+
+
+class ImportActionsMixin:
+    """
+    CSV import for controllers that declare ``import_columns`` (CSV header -> model field). The uploaded ``file`` is
+    parsed as a stream and written ``import_chunk_size`` rows at a time by ``CsvImporter``.
+    ``<list url>/import_stream/`` answers with server-sent events (one ``progress`` event per chunk, then
+    ``complete``); ``<list url>/import-csv/`` answers once with the summary and ``<list url>/import-job/`` queues the
+    import as a background job and answers with its id right away.
+    """
+    import_columns = None
+    import_parsers = {}
+    import_chunk_size = 1000
+
+    @action(detail=False, methods=['post'], url_path='import_stream')
+    def import_stream(self, request, *args, **kwargs):
+        importer, text_stream, error_response = self._start_import(request)
+        if error_response is not None:
+            return error_response
+        tenant = get_current_tenant() or connection.tenant
+
+        def events():
+            # The body is produced after the view returns: make sure rows still land in this request's schema.
+            connection.set_tenant(tenant)
+            for event in importer.run(text_stream):
+                yield b'data: ' + fast_json.dumps(event) + b'\n\n'
+
+        response = StreamingHttpResponse(events(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import-csv')
+    def import_csv(self, request, *args, **kwargs):
+        importer, text_stream, error_response = self._start_import(request)
+        if error_response is not None:
+            return error_response
+        summary = None
+        for summary in importer.run(text_stream):
+            pass
+        if summary['type'] == 'error':
+            return Response({'error': summary['message']}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary)
+
+    @action(detail=False, methods=['post'], url_path='import-job')
+    def import_job(self, request, *args, **kwargs):
+        error_response = self._import_error_response(request)
+        if error_response is not None:
+            return error_response
+        tenant = get_current_tenant()
+        if not isinstance(tenant, get_tenant_model()):
+            # The job row keeps its tenant as a foreign key: the public schema's ``FakeTenant`` has no row to point at.
+            return Response({'error': 'Import jobs need a tenant'}, status=status.HTTP_400_BAD_REQUEST)
+        path = default_storage.save(f'imports/{uuid.uuid4().hex}.csv', request.FILES['file'])
+        controller = f'{type(self).__module__}.{type(self).__qualname__}'
+        # Chunks commit as they go, so a retry would import the first rows twice.
+        job = enqueue(CSV_IMPORT_JOB, {'controller': controller, 'model': self.get_queryset().model._meta.label,
+                                       'path': path}, tenant=tenant, max_attempts=1)
+        return Response({'job_id': job.pk, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+
+    def _start_import(self, request):
+        error_response = self._import_error_response(request)
+        if error_response is not None:
+            return None, None, error_response
+        importer = CsvImporter(self.get_queryset().model, self.import_columns, parsers=self.import_parsers,
+                               chunk_size=self.import_chunk_size)
+        return importer, io.TextIOWrapper(request.FILES['file'].file, encoding='utf-8-sig', newline=''), None
+
+    def _import_error_response(self, request):
+        if not self.import_columns:
+            return Response({'error': 'Import is not supported here'}, status=status.HTTP_400_BAD_REQUEST)
+        if 'file' not in request.FILES:
+            return Response({'error': 'Expected a CSV file in "file"'}, status=status.HTTP_400_BAD_REQUEST)
+        return None
+
+
+class CompiledReadMixin:
+    """
+    Opt-in (``compiled_reads = True``) fast path for ``list`` and the exports: ``readable_serializer`` is compiled once
+    into a ``values()`` projection (see ``compile_serializer``), so rows come back as dicts with the joins they need
+    and are assembled into the serializer's output without building model instances. Serializers that need instances
+    (method fields, properties, to-many relations...) fail with ``ImproperlyConfigured`` on the first request.
+    """
+    compiled_reads = False
+
+    def list(self, request, *args, **kwargs):
+        if not self.compiled_reads:
+            return super().list(request, *args, **kwargs)
+        return self._compiled_list()
+
+    def get_compiled_serializer(self):
+        try:
+            return compile_serializer(self.readable_serializer)
+        except NotCompilable as error:
+            raise ImproperlyConfigured(f'{self.__class__.__name__}.compiled_reads: {error}') from error
+
+    def _compiled_list(self):
+        compiled = self.get_compiled_serializer()
+        queryset = compiled.queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        with measure('serialize'):
+            data = compiled.represent_many(rows)
+        return Response(data) if page is None else self.get_paginated_response(data)
+
+
+class ReadableWritableModelController(QueryBudgetMixin, BulkActionsMixin, ExportActionsMixin, ImportActionsMixin,
+                                      ConditionalReadMixin, CompiledReadMixin, AsyncActionsMixin, ModelViewSet, ABC):
     writable_serializer = None
     readable_serializer = None
-    filterset_fields = '__all__'
+    filterset_fields = INDEXED_FIELDS
+    ordering_fields = INDEXED_FIELDS
+    async_actions = ('list', 'retrieve')
+    auto_related_lookups = True
+    read_actions = ('list', 'retrieve', 'export_csv', 'export_ndjson')
 
     def get_serializer_class(self):
-        if self.action == 'list' or self.action == 'retrieve':
-            return self.readable_serializer
-        return self.writable_serializer
+        if self.action in self.read_actions:
+            return timed_serializer(self.readable_serializer)
+        return timed_serializer(self.writable_serializer)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.auto_related_lookups or self.action not in self.read_actions or not self.readable_serializer:
+            return queryset
+        select, prefetch = self.get_related_lookups()
+        return queryset.select_related(*select).prefetch_related(*prefetch)
+
+    def get_related_lookups(self):
+        """Derived once per controller class (not inherited) from the relations nested in ``readable_serializer``."""
+        cls = type(self)
+        if '_related_lookups' not in cls.__dict__:
+            cls._related_lookups = related_lookups(self.readable_serializer())
+        return cls._related_lookups
+
+    async def alist(self, request, *args, **kwargs):
+        if not self.uses_conditional_reads():
+            return await self._alist()
+        if self.cache_list_pages:
+            return await sync_to_async(self.list)(request, *args, **kwargs)
+        etag, last_modified = await sync_to_async(self.get_read_validators)(request)
+        not_modified = self._not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self._with_validators(await self._alist(), etag, last_modified)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        if not self.uses_conditional_reads():
+            return await self._aretrieve()
+        etag, last_modified = await sync_to_async(self.get_read_validators)(request)
+        not_modified = self._not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self._with_validators(await self._aretrieve(), etag, last_modified)
+
+    async def _alist(self):
+        if self.compiled_reads:
+            return await sync_to_async(self._compiled_list)()
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(await self._aserialize(page, many=True))
+        return Response(await self._aserialize([item async for item in queryset], many=True))
+
+    async def _aretrieve(self):
+        instance = await self.aget_object()
+        return Response(await self._aserialize(instance))
+
+    async def aget_object(self):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filter_kwargs = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await aget_object_or_404(queryset, **filter_kwargs)
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, instance)
+        return instance
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        return await sync_to_async(self.paginator.paginate_queryset)(queryset, self.request, view=self)
+
+    async def _aserialize(self, instance, many=False):
+        # Nested readable serializers may still lazy-load relations, which is only allowed from sync code.
+        return await sync_to_async(lambda: self.get_serializer(instance, many=many).data)()
@@ -0,0 +1,180 @@
+import binascii
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """``DjangoJSONEncoder`` keeping microseconds: a cursor truncated to milliseconds skips or repeats rows."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    """``LimitOffsetPagination`` that can also paginate with the async ORM."""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [item async for item in queryset[self.offset:self.offset + self.limit]]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination on the queryset's ordering, so page N costs the same as page 1 and no ``COUNT(*)`` runs.
+    The ordering (from ``OrderingFilter``, the queryset or the model) gets ``pk`` appended as tie breaker, and the
+    cursor is the opaque encoding of the last row's ordering values. Ordering fields must not be nullable.
+
+    Enable it per controller with ``pagination_class = KeysetPagination``. The view can set ``keyset_count`` to
+    ``'none'`` (default), ``'estimated'`` (planner row estimate, no scan) or ``'exact'``.
+    """
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, reverse = self._prepare(queryset, request, view)
+        if self.count_mode != 'none':
+            self.count = self._count(self.filtered_queryset)
+        return self._finish_page(list(queryset[:self.page_size + 1]), reverse)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, reverse = self._prepare(queryset, request, view)
+        if self.count_mode != 'none':
+            self.count = await sync_to_async(self._count)(self.filtered_queryset)
+        return self._finish_page([item async for item in queryset[:self.page_size + 1]], reverse)
+
+    def get_paginated_response(self, data):
+        response = {'next': self.get_next_link(), 'previous': self.get_previous_link(), 'results': data}
+        if self.count_mode != 'none':
+            response['count'] = self.count
+            response['count_is_estimate'] = self.count_mode == 'estimated'
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {'type': 'object', 'required': ['results'],
+                'properties': {'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                               'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                               'count': {'type': 'integer', 'nullable': True},
+                               'count_is_estimate': {'type': 'boolean'},
+                               'results': schema}}
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def _prepare(self, queryset, request, view):
+        self.request = request
+        self.page_size = self._get_page_size(request)
+        self.count_mode = getattr(view, 'keyset_count', 'none')
+        self.ordering = self._get_ordering(queryset)
+        self.filtered_queryset = queryset
+        cursor = self._decode_cursor(request)
+        reverse = bool(cursor and cursor['r'])
+        self.has_cursor = cursor is not None
+        annotations = {f'_keyset_{index}': F(field.lstrip('-')) for index, field in enumerate(self.ordering)}
+        ordering = [self._flip(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.annotate(**annotations).order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self._seek_condition(cursor['v'], reverse))
+        return queryset, reverse
+
+    def _finish_page(self, rows, reverse):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = self.has_cursor, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.has_cursor
+        self.page = rows
+        return rows
+
+    def _seek_condition(self, values, reverse):
+        # (a, b, c) after (va, vb, vc) == a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND c > vc)
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            condition |= equal_so_far & Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+            equal_so_far &= Q(**{name: value})
+        return condition
+
+    def _count(self, queryset):
+        if self.count_mode == 'exact':
+            return queryset.count()
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @staticmethod
+    def _get_ordering(queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering or ['-pk'])
+        ordering = [field for field in ordering if isinstance(field, str) and field != '?']
+        pk_names = {'pk', '-pk', queryset.model._meta.pk.name, f'-{queryset.model._meta.pk.name}'}
+        if not pk_names & set(ordering):
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def _get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True,
+                                 cutoff=self.max_page_size)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def _decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            if len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            return cursor
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound('Invalid cursor')
+
+    def _link(self, item, reverse):
+        # Compiled reads paginate ``values()`` rows, where the annotations are keys instead of attributes.
+        get = item.get if isinstance(item, dict) else lambda name: getattr(item, name)
+        values = [get(f'_keyset_{index}') for index in range(len(self.ordering))]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self._encode_cursor(values, reverse))
+
+    @staticmethod
+    def _encode_cursor(values, reverse):
+        payload = json.dumps({'v': values, 'r': reverse}, cls=CursorEncoder)
+        return urlsafe_b64encode(payload.encode()).decode('ascii')
@@ -0,0 +1,57 @@
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+from applications.core.services import fast_json
+from applications.core.services.request_timing import measure
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Drop-in for DRF's ``JSONRenderer`` built on orjson (see ``fast_json.dumps``); ``; indent=N`` in the accepted media
+    type pretty prints. Its work is reported as the ``render`` phase of the request.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        with measure('render'):
+            return fast_json.dumps(data, indent=self._indent_requested(accepted_media_type))
+
+    @staticmethod
+    def _indent_requested(accepted_media_type):
+        parameters = (accepted_media_type or '').split(';')[1:]
+        return any(parameter.strip().startswith('indent=') for parameter in parameters)
+
+
+class ORJSONParser(BaseParser):
+    """Drop-in for DRF's ``JSONParser`` built on orjson."""
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return fast_json.loads(stream.read())
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f'JSON parse error - {e}')
+
+
+class StreamRenderer(BaseRenderer):
+    """Lets content negotiation accept the media type of actions that stream their own body."""
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return data
+
+
+class CSVStreamRenderer(StreamRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONStreamRenderer(StreamRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
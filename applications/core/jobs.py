@@ -0,0 +1,29 @@
+import io
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.utils.module_loading import import_string
+
+from applications.core.services.csv_import import CsvImporter
+from applications.tenants.services.jobs import job_handler, report_progress
+
+CSV_IMPORT_JOB = 'core.csv_import'
+
+
+@job_handler(CSV_IMPORT_JOB)
+def csv_import_job(job):
+    """Imports the upload stored at ``payload['path']`` with the columns and parsers of ``payload['controller']``."""
+    controller = import_string(job.payload['controller'])
+    importer = CsvImporter(apps.get_model(job.payload['model']), controller.import_columns,
+                           parsers=controller.import_parsers, chunk_size=controller.import_chunk_size)
+    summary = None
+    try:
+        with default_storage.open(job.payload['path'], 'rb') as upload:
+            for summary in importer.run(io.TextIOWrapper(upload, encoding='utf-8-sig', newline='')):
+                report_progress(job, summary)
+    finally:
+        default_storage.delete(job.payload['path'])
+    if summary['type'] == 'error':
+        # Raised so the job ends up failed rather than succeeded with an error as its result.
+        raise ValueError(summary['message'])
+    return summary
@@ -0,0 +1,121 @@
+import os
+import subprocess
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from applications.core.services.load_benchmark import (DEFAULT_SCENARIOS, compare, is_regression, latest_results_path,
+                                                       load_results, run_load, save_results, summarize)
+from applications.tenants.context import activate_tenant
+from applications.tenants.models import Job, Tenant
+from applications.tenants.tokens import TenantRefreshToken
+
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+
+class Command(BaseCommand):
+    help = ('Load-tests a running server (e.g. `production_main.py` against the local Postgres): provisions --tenants '
+            'tenants with --rows rows each through BENCHMARK["FACTORIES"], replays BENCHMARK["SCENARIOS"] from '
+            'concurrent clients and reports p50/p95/p99 latency, throughput and queries per request. Results are '
+            'stored per commit and compared with the previous run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--tenants', type=int, default=3)
+        parser.add_argument('--rows', type=int, default=200, help='Rows created per factory and tenant.')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--warmup', type=int, default=100)
+        parser.add_argument('--schema-prefix', default='bench_')
+        parser.add_argument('--reseed', action='store_true', help='Seed again tenants that already exist.')
+        parser.add_argument('--drop', action='store_true', help='Drop the benchmark tenants when done.')
+        parser.add_argument('--results-dir', default=os.path.join(settings.BASE_DIR, 'benchmark_results'))
+        parser.add_argument('--compare', help='Results file to compare with (default: the latest one stored).')
+        parser.add_argument('--max-regression', type=float,
+                            help='Fail when a metric of the "all" row worsens by more than this percentage.')
+
+    def handle(self, *args, **options):
+        users = self._provision(options)
+        try:
+            scenarios = getattr(settings, 'BENCHMARK', {}).get('SCENARIOS', DEFAULT_SCENARIOS)
+            samples, wall_seconds = run_load(options['base_url'], scenarios, users, options['requests'],
+                                             options['concurrency'], warmup=options['warmup'])
+        finally:
+            if options['drop']:
+                self._drop(options['schema_prefix'])
+        summary = summarize(samples, wall_seconds)
+        self._write_summary(summary)
+        run = {'metadata': self._metadata(options), 'summary': summary}
+        path = save_results(options['results_dir'], run)
+        self.stdout.write(f'Results stored in {path}')
+        baseline_path = options['compare'] or latest_results_path(options['results_dir'], exclude=path)
+        if baseline_path is not None:
+            self._compare(summary, load_results(baseline_path), baseline_path, options['max_regression'])
+
+    def _provision(self, options):
+        factories = [import_string(path) for path in getattr(settings, 'BENCHMARK', {}).get('FACTORIES', [])]
+        users = []
+        for index in range(options['tenants']):
+            schema_name = f"{options['schema_prefix']}{index}"
+            tenant, created = Tenant.objects.get_or_create(schema_name=schema_name)
+            if created or options['reseed']:
+                self._seed(tenant, factories, options['rows'])
+            user, _ = get_user_model().objects.get_or_create(username=f'{schema_name}-user',
+                                                             defaults={'tenant': tenant})
+            user.set_password(BENCHMARK_PASSWORD)
+            user.save(update_fields=['password'])
+            job, _ = Job.objects.get_or_create(tenant=tenant, name='benchmark', defaults={'status': Job.SUCCEEDED})
+            refresh = TenantRefreshToken.for_user(user)
+            users.append({'token': str(refresh.access_token), 'refresh_token': str(refresh), 'username': user.username,
+                          'password': BENCHMARK_PASSWORD, 'schema_name': schema_name, 'job_id': job.pk})
+            self.stdout.write(f"{schema_name}: {'provisioned' if created else 'reused'}")
+        return users
+
+    def _seed(self, tenant, factories, rows):
+        activate_tenant(tenant)
+        try:
+            for factory in factories:
+                factory.create_batch(rows)
+        finally:
+            connection.set_schema_to_public()
+
+    @staticmethod
+    def _drop(schema_prefix):
+        tenants = Tenant.objects.filter(schema_name__startswith=schema_prefix)
+        get_user_model().objects.filter(tenant__in=tenants).delete()
+        for tenant in tenants:
+            tenant.delete(force_drop=True)
+
+    def _write_summary(self, summary):
+        self.stdout.write(f"{'scenario':<20}{'requests':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+                          f"{'req/s':>9}{'queries':>9}")
+        for name, metrics in summary.items():
+            self.stdout.write(f"{name:<20}{metrics['requests']:>9}{metrics['errors']:>8}{metrics['p50_ms']:>9}"
+                              f"{metrics['p95_ms']:>9}{metrics['p99_ms']:>9}{metrics['throughput_rps']!s:>9}"
+                              f"{metrics['queries_per_request']!s:>9}")
+
+    def _compare(self, summary, baseline, baseline_path, max_regression):
+        self.stdout.write(f"Compared with {baseline_path} ({baseline['metadata']['commit']}):")
+        regressions = []
+        for scenario, metric, before, after, change in compare(summary, baseline['summary']):
+            line = f'  {scenario:<20}{metric:<22}{before:>10} -> {after:<10}{change:+.1f}%'
+            if max_regression is not None and scenario == 'all' and is_regression(metric, change, max_regression):
+                regressions.append(line)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'{len(regressions)} metrics regressed more than {max_regression}%')
+
+    @staticmethod
+    def _metadata(options):
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                    check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = 'unknown'
+        return {'commit': commit, 'base_url': options['base_url'], 'tenants': options['tenants'],
+                'rows': options['rows'], 'requests': options['requests'], 'concurrency': options['concurrency'],
+                'server_model': os.getenv('SERVER_MODEL')}
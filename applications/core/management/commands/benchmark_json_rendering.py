@@ -0,0 +1,53 @@
+import io
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from applications.core.controllers.renderers import ORJSONParser, ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = ("Compares DRF's stdlib JSON renderer/parser with the orjson ones on pages shaped like the transaction list "
+            "(Decimal amounts, nested account/concept/month).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[20, 100, 1000],
+                            help='Rows per page; 20 is the default PAGE_SIZE.')
+        parser.add_argument('--repeat', type=int, default=200, help='Renders/parses timed per page size.')
+
+    def handle(self, *args, **options):
+        for page_size in options['page_sizes']:
+            page = self._transactions_page(page_size)
+            body = JSONRenderer().render(page)
+            results = {
+                'render stdlib': self._per_call(lambda: JSONRenderer().render(page), options['repeat']),
+                'render orjson': self._per_call(lambda: ORJSONRenderer().render(page), options['repeat']),
+                'parse stdlib': self._per_call(lambda: JSONParser().parse(io.BytesIO(body)), options['repeat']),
+                'parse orjson': self._per_call(lambda: ORJSONParser().parse(io.BytesIO(body)), options['repeat']),
+            }
+            self.stdout.write(f'{page_size} rows ({len(body)} bytes): ' +
+                              ', '.join(f'{name} {seconds * 1e6:.0f} us' for name, seconds in results.items()))
+            self.stdout.write(self.style.SUCCESS(
+                f"  render x{results['render stdlib'] / results['render orjson']:.1f}, "
+                f"parse x{results['parse stdlib'] / results['parse orjson']:.1f}"))
+
+    @staticmethod
+    def _per_call(function, repeat):
+        return min(timeit.repeat(function, number=repeat, repeat=3)) / repeat
+
+    @staticmethod
+    def _transactions_page(page_size):
+        first_month = date(2020, 1, 1)
+        results = [{'id': n,
+                    'amount': Decimal(n * 37 % 100000) / 100 - 250,
+                    'detail': f'Transaction number {n}',
+                    'account': {'id': n % 7, 'name': f'Account {n % 7}', 'currency': 'UYU'},
+                    'concept': {'id': n % 40, 'name': f'Concept {n % 40}', 'is_income': n % 3 == 0},
+                    'month': {'id': n % 60, 'starting_date': (first_month + timedelta(days=31 * (n % 60))).isoformat()}}
+                   for n in range(page_size)]
+        return {'count': page_size * 50, 'next': 'https://example.com/api/v1/transactions/?limit=20&offset=40',
+                'previous': 'https://example.com/api/v1/transactions/?limit=20', 'results': results}
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django_tenants.utils import get_public_schema_name, get_tenant_model
+
+from applications.core.services.aggregations import rebuild_aggregations
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the precomputed aggregate totals from the source rows, in every tenant schema or in --schema.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help='Only rebuild this tenant schema.')
+        parser.add_argument('--aggregation', action='append', dest='aggregations',
+                            help='Only rebuild this aggregation; can be repeated.')
+
+    def handle(self, *args, **options):
+        tenants = get_tenant_model().objects.exclude(schema_name=get_public_schema_name())
+        if options['schema']:
+            tenants = tenants.filter(schema_name=options['schema'])
+        for tenant in tenants:
+            connection.set_tenant(tenant)
+            rebuild_aggregations(names=options['aggregations'])
+            self.stdout.write(f'{tenant.schema_name}: rebuilt')
+        connection.set_schema_to_public()
+        self.stdout.write(self.style.SUCCESS(f'Aggregates rebuilt in {len(tenants)} schemas.'))
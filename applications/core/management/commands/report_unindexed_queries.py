@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.urls import get_resolver
+
+from applications.core.controllers.mixins import ReadableWritableModelController
+from applications.core.services.query_usage import USAGE_KINDS, get_query_usage
+
+
+class Command(BaseCommand):
+    help = ('Lists the fields clients filter, order or search on (as sampled in production, see '
+            'QUERY_USAGE_SAMPLE_RATE) that no database index leads.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schema', help='Schema whose tables are introspected, e.g. a representative tenant.')
+
+    def handle(self, *args, **options):
+        if options['schema']:
+            connection.set_schema(options['schema'])
+        get_resolver().url_patterns  # Imports every controller module.
+        findings = 0
+        for model in sorted(self._controller_models(), key=lambda model: model._meta.label):
+            indexed_columns = self._indexed_columns(model)
+            field_names = [field.name for field in model._meta.concrete_fields]
+            for kind in USAGE_KINDS:
+                for field_name, count in sorted(get_query_usage(model, kind, field_names).items()):
+                    if model._meta.get_field(field_name).column not in indexed_columns:
+                        findings += 1
+                        self.stdout.write(f'{model._meta.label}.{field_name}: used for {kind} {count} times '
+                                          f'(sampled) without an index')
+        self.stdout.write(self.style.SUCCESS('No unindexed usage found.') if not findings else
+                          self.style.WARNING(f'{findings} unindexed filter/ordering/search fields.'))
+
+    @staticmethod
+    def _controller_models():
+        models = set()
+        pending = list(ReadableWritableModelController.__subclasses__())
+        while pending:
+            controller = pending.pop()
+            pending.extend(controller.__subclasses__())
+            if getattr(controller, 'queryset', None) is not None:
+                models.add(controller.queryset.model)
+        return models
+
+    @staticmethod
+    def _indexed_columns(model):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        return {constraint['columns'][0] for constraint in constraints.values()
+                if constraint['columns'] and (constraint['index'] or constraint['unique'] or constraint['primary_key'])}
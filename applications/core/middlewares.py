@@ -0,0 +1,149 @@
+import logging
+import os
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import JsonResponse
+
+from applications.core.services.health import check_deep, check_liveness, check_readiness, is_deep_check_allowed
+from applications.core.services.query_budget import QueryCounter, count_context_queries
+from applications.core.services.request_metrics import get_request_metrics
+from applications.core.services.request_timing import (get_instrumentation_options, server_timing_header,
+                                                       start_request_timings, stop_request_timings)
+from applications.core.services.sampling_profiler import SamplingProfiler, write_folded_stacks
+from applications.tenants.context import get_current_schema_name
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBES = {'/health/live/': check_liveness,
+                 '/health/ready/': check_readiness,
+                 '/health/deep/': check_deep,
+                 '/healthcheck/': check_readiness}
+
+
+class HealthCheckMiddleware:
+    """
+    Answers orchestrator probes before any other middleware (no session, locale, tenant resolution or auth):
+    ``/health/live/`` does no I/O, ``/health/ready/`` (and the older ``/healthcheck/``) runs a pooled ``SELECT 1``
+    whose result is briefly reused, ``/health/deep/`` checks every dependency and needs
+    ``HEALTH_CHECKS['DEEP_TOKEN']`` (403 otherwise). Unhealthy answers are 503s.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        probe = HEALTH_PROBES.get(request.path)
+        if probe is None:
+            return self.get_response(request)
+        if probe is check_deep and not is_deep_check_allowed(request):
+            return self._forbidden_response()
+        return self._probe_response(*probe())
+
+    async def __acall__(self, request):
+        probe = HEALTH_PROBES.get(request.path)
+        if probe is None:
+            return await self.get_response(request)
+        if probe is check_deep and not is_deep_check_allowed(request):
+            return self._forbidden_response()
+        if probe is check_liveness:
+            return self._probe_response(*probe())
+        return self._probe_response(*await sync_to_async(probe)())
+
+    @staticmethod
+    def _probe_response(healthy, body):
+        response = JsonResponse(body, status=200 if healthy else 503)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    @staticmethod
+    def _forbidden_response():
+        response = JsonResponse({'status': 'forbidden'}, status=403)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+
+class InstrumentationMiddleware:
+    """
+    Splits every request's wall time into the phases measured downstream (tenant resolution, auth, serialization,
+    rendering) plus database time and query count. Results go to the ``Server-Timing`` header and to the worker's
+    Prometheus metrics, tagged with view name and tenant schema. Slow requests are logged, and a sampled share of
+    sync requests is profiled, keeping flame-graph-ready stacks of those that turn out slow. See ``INSTRUMENTATION``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_instrumentation_options()
+        self.profiler = SamplingProfiler(self.options['PROFILE_INTERVAL_MS'] / 1000)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token, counter, profile = self._start(profile=True)
+        try:
+            with count_context_queries(counter):
+                response = self.get_response(request)
+        except BaseException:
+            self._discard_profile(profile)
+            raise
+        finally:
+            stop_request_timings(token)
+        return self._finish(request, response, timings, counter, profile)
+
+    async def __acall__(self, request):
+        # Coroutines of concurrent requests share the event loop thread, so their stacks cannot be told apart.
+        timings, token, counter, profile = self._start(profile=False)
+        try:
+            # Queries run in sync_to_async threads, on their connections: they are counted through the context.
+            with count_context_queries(counter):
+                response = await self.get_response(request)
+        finally:
+            stop_request_timings(token)
+        return self._finish(request, response, timings, counter, profile)
+
+    def _start(self, profile):
+        timings, token = start_request_timings()
+        profiled = profile and random.random() < self.options['PROFILE_SAMPLE_RATE']
+        return timings, token, QueryCounter(), self.profiler.start() if profiled else None
+
+    def _discard_profile(self, profile):
+        if profile is not None:
+            self.profiler.stop(profile)
+
+    def _finish(self, request, response, timings, counter, profile):
+        elapsed = timings.elapsed
+        phases = {**timings.phases, 'db': counter.duration}
+        view_name = getattr(request.resolver_match, 'view_name', None) or 'unresolved'
+        schema_name = get_current_schema_name() if self.options['TENANT_LABEL'] else ''
+        get_request_metrics().observe(view_name, request.method, response.status_code, schema_name, elapsed, phases,
+                                      counter.count)
+        if self.options['SERVER_TIMING']:
+            response['Server-Timing'] = server_timing_header(phases, elapsed, counter.count)
+        slow_ms = self.options['SLOW_REQUEST_MS']
+        is_slow = slow_ms is not None and elapsed * 1000 >= slow_ms
+        if is_slow:
+            logger.warning('Slow request %s %s (%s, %s): %s', request.method, request.path, view_name, schema_name,
+                           server_timing_header(phases, elapsed, counter.count))
+        if profile is not None:
+            stacks = self.profiler.stop(profile)
+            if is_slow and stacks:
+                self._dump_profile(view_name, stacks)
+        return response
+
+    def _dump_profile(self, view_name, stacks):
+        filename = f'{int(time.time() * 1000)}-{re.sub(r"[^A-Za-z0-9_.-]", "_", view_name)}.folded'
+        path = os.path.join(self.options['PROFILE_DIR'], filename)
+        write_folded_stacks(stacks, path)
+        logger.warning('Profile of slow request written to %s', path)
@@ -0,0 +1,27 @@
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggregateTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aggregation', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=255)),
+                ('dimensions', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('aggregation', 'key'), name='core_aggregatetotal_unique_key')],
+            },
+        ),
+    ]
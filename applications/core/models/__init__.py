@@ -0,0 +1 @@
+from applications.core.models.aggregates import AggregateTotal  # noqa: F401
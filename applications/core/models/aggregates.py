@@ -0,0 +1,20 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import BigIntegerField, CharField, DecimalField, JSONField, Model, UniqueConstraint
+
+
+class AggregateTotal(Model):
+    """
+    Running sum and row count of one group of an aggregation registered in ``applications.core.services.aggregations``
+    (e.g. the transactions of one month and concept). Maintained incrementally, so reads are index lookups.
+    """
+    aggregation = CharField(max_length=100)
+    key = CharField(max_length=255)
+    dimensions = JSONField(encoder=DjangoJSONEncoder)
+    total = DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [UniqueConstraint(fields=['aggregation', 'key'], name='core_aggregatetotal_unique_key')]
+
+    def __str__(self):
+        return f'{self.aggregation}[{self.key}]: {self.total}'
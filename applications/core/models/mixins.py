@@ -1,13 +1,89 @@
-from django.db.models import Model, CharField
+import time
+from functools import lru_cache
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Model, CharField, UniqueConstraint
+
+from applications.core.services.timing_stats import timing_stats
 
 
 class CleanModelMixin(Model):
+    """
+    Validates on save. Set ``validate_unique_in_db = False`` to skip the uniqueness ``SELECT`` that precedes every
+    write and rely on the database constraint instead; its violation is still reported as a ``ValidationError`` on the
+    offending field. ``full_clean_batch`` validates many instances with one uniqueness query per unique field and
+    ``unique_together`` set.
+    """
+    validate_unique_in_db = True
+
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs):
-        self.full_clean()
-        super().save(**kwargs)
+        started = time.perf_counter()
+        self.full_clean(validate_unique=self.validate_unique_in_db)
+        validated = time.perf_counter()
+        timing_stats.record(f'{self._meta.label}.validation', validated - started)
+        if self.validate_unique_in_db:
+            super().save(**kwargs)
+        else:
+            self._save_mapping_unique_violations(**kwargs)
+        timing_stats.record(f'{self._meta.label}.write', time.perf_counter() - validated)
+
+    def _save_mapping_unique_violations(self, **kwargs):
+        try:
+            with transaction.atomic():
+                super().save(**kwargs)
+        except IntegrityError as e:
+            field = unique_field_for_constraint(self.__class__, _constraint_name(e))
+            if field is None:
+                raise
+            raise ValidationError({field.name: self.unique_error_message(self.__class__, (field.name,)).messages})
+
+    @classmethod
+    def full_clean_batch(cls, instances, exclude=None, validate_unique=True):
+        """Validates ``instances`` as ``full_clean`` would; returns {index: message_dict} for the invalid ones."""
+        started = time.perf_counter()
+        errors = {}
+        for index, instance in enumerate(instances):
+            try:
+                instance.full_clean(exclude=exclude, validate_unique=False)
+            except ValidationError as e:
+                errors[index] = e.message_dict
+        if validate_unique:
+            for index, field_errors in cls._validate_unique_batch(instances, exclude or ()).items():
+                for key, messages in field_errors.items():
+                    errors.setdefault(index, {}).setdefault(key, []).extend(messages)
+        timing_stats.record(f'{cls._meta.label}.batch_validation', time.perf_counter() - started)
+        return errors
+
+    @classmethod
+    def _validate_unique_batch(cls, instances, exclude):
+        errors = {}
+        for fields in _unique_field_sets(cls):
+            if any(field.name in exclude for field in fields):
+                continue
+            attnames = [field.attname for field in fields]
+            indexes_by_value = {}
+            for index, instance in enumerate(instances):
+                value = tuple(getattr(instance, attname) for attname in attnames)
+                if None not in value:
+                    indexes_by_value.setdefault(value, []).append(index)
+            if not indexes_by_value:
+                continue
+            first_values = list({value[0] for value in indexes_by_value})
+            taken = {row[:-1]: row[-1] for row in cls._default_manager.filter(**{f'{attnames[0]}__in': first_values})
+                     .values_list(*attnames, 'pk')}
+            names = tuple(field.name for field in fields)
+            key = names[0] if len(names) == 1 else NON_FIELD_ERRORS
+            for value, indexes in indexes_by_value.items():
+                if len(indexes) == 1 and taken.get(value, instances[indexes[0]].pk) == instances[indexes[0]].pk:
+                    continue
+                for index in indexes:
+                    message = instances[index].unique_error_message(cls, names).messages
+                    errors.setdefault(index, {}).setdefault(key, []).extend(message)
+        return errors
 
 
 class UniqueNameMixin(CleanModelMixin):
@@ -15,3 +91,51 @@ class UniqueNameMixin(CleanModelMixin):
         abstract = True
 
     name = CharField(max_length=75, unique=True)
+
+
+def unique_field_for_constraint(model, constraint_name):
+    """Field of ``model`` guarded by the Postgres unique constraint/index ``constraint_name`` (e.g. ``x_name_key``)."""
+    if not constraint_name:
+        return None
+    return _single_field_unique_constraints(model).get(constraint_name)
+
+
+@lru_cache(maxsize=None)
+def _unique_field_sets(model):
+    """Field tuples ``model`` declares unique: each unique field, then each ``unique_together`` set."""
+    sets = [(field,) for field in model._meta.concrete_fields if field.unique and not field.primary_key]
+    sets += [tuple(model._meta.get_field(name) for name in names) for names in model._meta.unique_together]
+    return tuple(sets)
+
+
+@lru_cache(maxsize=None)
+def _single_field_unique_constraints(model):
+    """Name of every single-field unique constraint of ``model`` -> its field, as named in the database."""
+    table = model._meta.db_table
+    schema_editor = connection.schema_editor()
+    constraints = {}
+    for field in model._meta.concrete_fields:
+        if field.unique and not field.primary_key:
+            # Postgres names the UNIQUE of CREATE TABLE, Django the constraint an AlterField adds.
+            constraints[_postgres_object_name(table, field.column, 'key')] = field
+            constraints[schema_editor._create_index_name(table, [field.column], suffix='_uniq')] = field
+    for constraint in model._meta.constraints:
+        if isinstance(constraint, UniqueConstraint) and len(constraint.fields) == 1 and constraint.condition is None:
+            constraints[constraint.name] = model._meta.get_field(constraint.fields[0])
+    return constraints
+
+
+def _postgres_object_name(table, column, label, max_length=63):
+    """``<table>_<column>_<label>`` shortened the way Postgres does: trimming the longer part first."""
+    available = max_length - len(label) - 2
+    while len(table) + len(column) > available:
+        if len(table) > len(column):
+            table = table[:-1]
+        else:
+            column = column[:-1]
+    return f'{table}_{column}_{label}'
+
+
+def _constraint_name(integrity_error):
+    diagnostics = getattr(integrity_error.__cause__, 'diag', None)
+    return getattr(diagnostics, 'constraint_name', None)
@@ -0,0 +1,102 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.fields import Field
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer, Serializer
+
+
+class NotCompilable(Exception):
+    """The serializer needs model instances: method fields, custom ``to_representation``, to-many relations..."""
+
+
+class CompiledSerializer:
+    """
+    Flat projection of a ``ModelSerializer``: ``columns`` are the ``values()`` lookups it reads (joins included) and
+    ``represent(row)`` turns one such row into the same dict the serializer produces from the model instance.
+    """
+
+    def __init__(self, columns, build):
+        self.columns = columns
+        self._build = build
+
+    def queryset(self, queryset):
+        return queryset.prefetch_related(None).values(*self.columns)
+
+    def represent(self, row):
+        return self._build(row)
+
+    def represent_many(self, rows):
+        build = self._build
+        return [build(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    """Compiles ``serializer_class`` once per process; raises ``NotCompilable`` saying which field prevents it."""
+    serializer = serializer_class()
+    columns = []
+    build = _compile(serializer, serializer.Meta.model, '', columns)
+    return CompiledSerializer(tuple(dict.fromkeys(columns)), build)
+
+
+def _compile(serializer, model, prefix, columns):
+    if type(serializer).to_representation is not Serializer.to_representation:
+        raise NotCompilable(f'{type(serializer).__name__} overrides to_representation')
+    getters = [(field.field_name, _compile_field(field, model, prefix, columns))
+               for field in serializer._readable_fields]
+
+    def build(row):
+        return {name: getter(row) for name, getter in getters}
+
+    return build
+
+
+def _compile_field(field, model, prefix, columns):
+    name = f'{type(field.parent).__name__}.{field.field_name}'
+    if isinstance(field, (ListSerializer, ManyRelatedField)):
+        raise NotCompilable(f'{name} is a to-many relation')
+    if field.source == '*':
+        raise NotCompilable(f"{name} has source='*'")
+    model_field, path = _resolve(model, field.source_attrs, name)
+    column = f'{prefix}{path}'
+    columns.append(column)
+    if isinstance(field, BaseSerializer):
+        if not model_field.is_relation:
+            raise NotCompilable(f'{name} is not backed by a relation')
+        nested = _compile(field, model_field.related_model, f'{column}__', columns)
+        return lambda row: None if row[column] is None else nested(row)
+    if type(field).get_attribute not in (Field.get_attribute, RelatedField.get_attribute):
+        raise NotCompilable(f'{name} overrides get_attribute')
+    if isinstance(field, RelatedField):
+        if not isinstance(field, PrimaryKeyRelatedField) or not model_field.is_relation:
+            raise NotCompilable(f'{name} needs the related instance')
+        represent = field.pk_field.to_representation if field.pk_field is not None else _identity
+    elif model_field.is_relation:
+        raise NotCompilable(f'{name} needs the related instance')
+    else:
+        represent = field.to_representation
+    return lambda row: None if (value := row[column]) is None else represent(value)
+
+
+def _resolve(model, source_attrs, name):
+    """Model field behind ``source_attrs`` and its ``values()`` path, following forward, non null relations only."""
+    for index, attribute in enumerate(source_attrs):
+        try:
+            model_field = model._meta.get_field(attribute)
+        except FieldDoesNotExist:
+            raise NotCompilable(f'{name} reads "{attribute}", which is not a model field')
+        if not model_field.concrete or model_field.many_to_many:
+            raise NotCompilable(f'{name} reads "{attribute}", which is not a forward relation or column')
+        if index < len(source_attrs) - 1:
+            if not model_field.is_relation:
+                raise NotCompilable(f'{name} follows "{attribute}", which is not a relation')
+            if model_field.null:
+                # The serializer would skip the field when the relation is empty; a join yields None instead.
+                raise NotCompilable(f'{name} follows the nullable relation "{attribute}"')
+            model = model_field.related_model
+    return model_field, '__'.join(source_attrs)
+
+
+def _identity(value):
+    return value
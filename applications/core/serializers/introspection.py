@@ -0,0 +1,49 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.serializers import ListSerializer, ModelSerializer
+
+
+def iter_nested_serializers(serializer, model=None, prefix='', seen=None):
+    """
+    Yields ``(lookup_path, nested_serializer, is_many)`` for every ``ModelSerializer`` nested (at any depth) in
+    ``serializer``. ``lookup_path`` is the ORM path from ``model`` (``account``, ``month__year``...) or None when the
+    nested field is not backed by a model relation (custom ``source``, method fields...).
+    """
+    model = model or serializer.Meta.model
+    seen = seen if seen is not None else set()
+    for field in serializer.fields.values():
+        many = isinstance(field, ListSerializer)
+        nested = field.child if many else field
+        if not isinstance(nested, ModelSerializer) or id(nested) in seen:
+            continue
+        seen.add(id(nested))
+        relation = _get_relation(model, field.source)
+        path = f'{prefix}{field.source}' if relation is not None and prefix is not None else None
+        yield path, nested, many or (relation is not None and (relation.many_to_many or relation.one_to_many))
+        yield from iter_nested_serializers(nested, nested.Meta.model, f'{path}__' if path else None, seen)
+
+
+def related_lookups(serializer):
+    """``select_related`` and ``prefetch_related`` lookups needed to serialize without lazy loads."""
+    select, prefetch = set(), set()
+    to_many_paths = []
+    for path, _, many in iter_nested_serializers(serializer):
+        if path is None:
+            continue
+        under_to_many = any(path.startswith(f'{to_many_path}__') for to_many_path in to_many_paths)
+        if many:
+            to_many_paths.append(path)
+        if many or under_to_many:
+            prefetch.add(path)
+        else:
+            select.add(path)
+    return sorted(select), sorted(prefetch)
+
+
+def _get_relation(model, source):
+    if not source or source == '*' or '.' in source:
+        return None
+    try:
+        field = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
@@ -0,0 +1,20 @@
+from functools import lru_cache
+
+from applications.core.services.request_timing import measure
+
+
+class TimedSerializerMixin:
+    """Reports ``to_representation`` as the ``serialize`` phase of the request (lazy relation loads included)."""
+
+    def to_representation(self, instance):
+        with measure('serialize'):
+            return super().to_representation(instance)
+
+
+@lru_cache(maxsize=None)
+def timed_serializer(serializer_class):
+    """Subclass of ``serializer_class`` (same name, so API schemas do not change) that reports its serialization."""
+    if serializer_class is None or issubclass(serializer_class, TimedSerializerMixin):
+        return serializer_class
+    return type(serializer_class.__name__, (TimedSerializerMixin, serializer_class),
+                {'__module__': serializer_class.__module__, '__qualname__': serializer_class.__qualname__})
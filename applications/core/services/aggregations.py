@@ -0,0 +1,214 @@
+import json
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.signals import post_delete, post_init, post_save
+
+from applications.core.models import AggregateTotal
+
+SNAPSHOT_ATTRIBUTE = '_aggregation_snapshots'
+
+logger = logging.getLogger(__name__)
+
+_aggregations = {}
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    """Sum of ``sum_field`` and row count of ``model`` (an ``app_label.ModelName``) per distinct ``group_by`` values."""
+    name: str
+    model: str
+    group_by: tuple
+    sum_field: str
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def attnames(self):
+        options = self.get_model()._meta
+        return [options.get_field(field_name).attname for field_name in self.group_by]
+
+    def sum_attname(self):
+        return self.get_model()._meta.get_field(self.sum_field).attname
+
+    def snapshot(self, instance):
+        """Group values and amount of ``instance``, or None when one of them was deferred and is not loaded."""
+        attnames = self.attnames() + [self.sum_attname()]
+        if any(attname not in instance.__dict__ for attname in attnames):
+            return None
+        values = tuple(instance.__dict__[attname] for attname in attnames)
+        return values[:-1], values[-1] or Decimal(0)
+
+    @staticmethod
+    def key(values):
+        return '|'.join('' if value is None else str(value) for value in values)
+
+    def dimensions(self, values):
+        return dict(zip(self.group_by, values))
+
+
+def register_aggregation(name, model, group_by, sum_field):
+    """
+    Maintains ``name`` from now on: every save/delete of a ``model`` row moves its amount between groups, e.g.
+    ``register_aggregation('transactions-by-month-concept', 'core.Transaction', ('month', 'concept'), 'amount')``
+    from the app's ``ready()``. ``bulk_create``/``bulk_update`` send no signals: call
+    ``apply_bulk_aggregations(model, created=..., updated=...)`` after them. ``update()`` and raw SQL bypass both;
+    ``manage.py rebuild_aggregates`` recomputes the totals from scratch after such writes.
+    """
+    aggregation = Aggregation(name=name, model=model, group_by=tuple(group_by), sum_field=sum_field)
+    _aggregations[name] = aggregation
+    post_init.connect(_remember_snapshot(aggregation), sender=model, weak=False, dispatch_uid=f'{name}-init')
+    post_save.connect(_apply_save(aggregation), sender=model, weak=False, dispatch_uid=f'{name}-save')
+    post_delete.connect(_apply_delete(aggregation), sender=model, weak=False, dispatch_uid=f'{name}-delete')
+    return aggregation
+
+
+def get_aggregation(name):
+    return _aggregations[name]
+
+
+def get_totals(name, **dimension_filters):
+    """Groups of ``name`` matching ``dimension_filters`` (``month=3``, ``concept__in=[1, 2]``): dimensions + totals."""
+    filters = {f'dimensions__{lookup}': value for lookup, value in dimension_filters.items()}
+    rows = AggregateTotal.objects.filter(aggregation=name, **filters).values_list('dimensions', 'total', 'count')
+    return [{**dimensions, 'total': total, 'count': count} for dimensions, total, count in rows]
+
+
+def rebuild_aggregations(model=None, names=None):
+    """Recomputes the aggregations of ``model`` (all when None) from the source rows with one GROUP BY each."""
+    label = model._meta.label if isinstance(model, type) else model
+    for aggregation in list(_aggregations.values()):
+        if (label is None or aggregation.model == label) and (names is None or aggregation.name in names):
+            _rebuild(aggregation)
+
+
+def apply_bulk_aggregations(model, created=(), updated=()):
+    """
+    Moves the amounts of rows written with ``bulk_create`` (``created``) or ``bulk_update`` (``updated``, loaded
+    before they were changed) between groups, as the save signals do for single rows, with one upsert per touched
+    group. Call it in the transaction of the write.
+    """
+    for aggregation in list(_aggregations.values()):
+        if aggregation.model == model._meta.label:
+            _add_many(aggregation, _bulk_deltas(aggregation, created, updated).values())
+
+
+def _bulk_deltas(aggregation, created, updated):
+    """{key: [values, amount, count]} to add for the given rows; their snapshots become the current values."""
+    deltas = {}
+
+    def add(values, amount, count):
+        delta = deltas.setdefault(aggregation.key(values), [values, 0, 0])
+        delta[1] += amount
+        delta[2] += count
+
+    for instance in created:
+        current = aggregation.snapshot(instance)
+        if current is None:
+            _warn_unknown_delta(aggregation, instance)
+            continue
+        add(current[0], current[1], 1)
+        _snapshots(instance)[aggregation.name] = current
+    for instance in updated:
+        previous, current = _snapshots(instance).get(aggregation.name), aggregation.snapshot(instance)
+        if previous is None or current is None:
+            _warn_unknown_delta(aggregation, instance)
+            continue
+        if previous != current:
+            add(previous[0], -previous[1], -1)
+            add(current[0], current[1], 1)
+        _snapshots(instance)[aggregation.name] = current
+    return {key: delta for key, delta in deltas.items() if delta[1] or delta[2]}
+
+
+def _rebuild(aggregation):
+    attnames = aggregation.attnames()
+    rows = (aggregation.get_model()._default_manager.order_by().values(*attnames)
+            .annotate(aggregate_total=Sum(aggregation.sum_attname()), aggregate_count=Count('pk')))
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {connection.ops.quote_name(AggregateTotal._meta.db_table)} '
+                           f'WHERE aggregation = %s', [aggregation.name])
+        AggregateTotal.objects.bulk_create(
+            [AggregateTotal(aggregation=aggregation.name, key=aggregation.key(values),
+                            dimensions=aggregation.dimensions(values), total=row['aggregate_total'] or 0,
+                            count=row['aggregate_count'])
+             for row in rows.iterator() for values in [tuple(row[attname] for attname in attnames)]],
+            batch_size=1000)
+
+
+def _add(aggregation, values, amount, count):
+    _add_many(aggregation, [(values, amount, count)])
+
+
+def _add_many(aggregation, deltas):
+    deltas = list(deltas)
+    if not deltas:
+        return
+    table = connection.ops.quote_name(AggregateTotal._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (aggregation, key, dimensions, total, count) VALUES (%s, %s, %s::jsonb, %s, %s) '
+            f'ON CONFLICT (aggregation, key) DO UPDATE '
+            f'SET total = {table}.total + EXCLUDED.total, count = {table}.count + EXCLUDED.count',
+            [[aggregation.name, aggregation.key(values),
+              json.dumps(aggregation.dimensions(values), cls=DjangoJSONEncoder), amount, count]
+             for values, amount, count in deltas])
+        emptied = [aggregation.key(values) for values, _, count in deltas if count < 0]
+        if emptied:
+            cursor.execute(f'DELETE FROM {table} WHERE aggregation = %s AND key = ANY(%s) AND count <= 0',
+                           [aggregation.name, emptied])
+
+
+def _warn_unknown_delta(aggregation, instance):
+    logger.warning('%s: the previous values of %r are unknown (deferred fields or loaded before registration); '
+                   'its totals stay off until `manage.py rebuild_aggregates --aggregation %s`',
+                   aggregation.name, instance, aggregation.name)
+
+
+def _snapshots(instance):
+    return instance.__dict__.setdefault(SNAPSHOT_ATTRIBUTE, {})
+
+
+def _remember_snapshot(aggregation):
+    def receiver(sender, instance, **kwargs):
+        _snapshots(instance)[aggregation.name] = aggregation.snapshot(instance)
+    return receiver
+
+
+def _apply_save(aggregation):
+    def receiver(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        previous = None if created else _snapshots(instance).get(aggregation.name)
+        current = aggregation.snapshot(instance) or _stored_snapshot(aggregation, instance)
+        if not created and previous is None:
+            _warn_unknown_delta(aggregation, instance)
+        elif previous != current:
+            if previous is not None:
+                _add(aggregation, previous[0], -previous[1], -1)
+            _add(aggregation, current[0], current[1], 1)
+        _snapshots(instance)[aggregation.name] = current
+    return receiver
+
+
+def _apply_delete(aggregation):
+    def receiver(sender, instance, **kwargs):
+        snapshot = _snapshots(instance).get(aggregation.name) or aggregation.snapshot(instance)
+        if snapshot is None:
+            _warn_unknown_delta(aggregation, instance)
+        else:
+            _add(aggregation, snapshot[0], -snapshot[1], -1)
+    return receiver
+
+
+def _stored_snapshot(aggregation, instance):
+    """Snapshot of the saved row, read back when some of its group or amount fields are deferred on ``instance``."""
+    attnames = aggregation.attnames() + [aggregation.sum_attname()]
+    values = aggregation.get_model()._default_manager.filter(pk=instance.pk).values_list(*attnames).get()
+    return values[:-1], values[-1] or Decimal(0)
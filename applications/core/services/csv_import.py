@@ -0,0 +1,182 @@
+import csv
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import BooleanField, ForeignKey
+
+from applications.core.services.aggregations import apply_bulk_aggregations
+from applications.core.services.model_versions import bump_model_version
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_MAX_REPORTED_ERRORS = 500
+BOOLEAN_VALUES = {'true': True, 'yes': True, 't': True, 'y': True, '1': True,
+                  'false': False, 'no': False, 'f': False, 'n': False, '0': False}
+
+
+def parse_decimal_comma(value):
+    """``"1.234,56"`` -> ``Decimal('1234.56')``: amounts as spreadsheets export them in comma-decimal locales."""
+    try:
+        return Decimal(value.replace('.', '').replace(',', '.'))
+    except InvalidOperation:
+        raise ValidationError(f'"{value}" is not a valid amount.')
+
+
+def parse_boolean(value):
+    """``"TRUE"``, ``"yes"``, ``"0"``... -> bool, case-insensitively, as spreadsheets and other exports write them."""
+    try:
+        return BOOLEAN_VALUES[value.lower()]
+    except KeyError:
+        raise ValidationError(f'"{value}" is not a valid boolean.')
+
+
+class NameLookupCache:
+    """Resolves related rows by name for one import: every chunk only queries the names it has not seen yet."""
+
+    def __init__(self, model, field_name='name'):
+        self.model = model
+        self.field_name = field_name
+        self._ids = {}
+
+    def prefetch(self, names):
+        missing = {name for name in names if name and name not in self._ids}
+        if not missing:
+            return
+        found = dict(self.model._default_manager.filter(**{f'{self.field_name}__in': missing})
+                     .values_list(self.field_name, 'pk'))
+        for name in missing:
+            self._ids[name] = found.get(name)
+
+    def get(self, name):
+        return self._ids.get(name)
+
+
+class CsvImporter:
+    """
+    Imports a CSV text stream into ``model`` ``chunk_size`` rows at a time, so memory depends on the chunk and not on
+    the file. ``columns`` maps CSV headers to model fields; foreign keys are given by the related row's name and
+    resolved through a ``NameLookupCache``, other values go through ``parsers[field]`` or the field's ``to_python``.
+    Valid rows of a chunk are written with ``COPY`` (``bulk_create`` on other backends) in one transaction into the
+    current tenant's schema; invalid rows are skipped and reported with their line number.
+    """
+
+    def __init__(self, model, columns, parsers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 max_reported_errors=DEFAULT_MAX_REPORTED_ERRORS):
+        self.model = model
+        self.columns = columns
+        self.parsers = parsers or {}
+        self.chunk_size = chunk_size
+        self.max_reported_errors = max_reported_errors
+        self.fields = {header: model._meta.get_field(field_name) for header, field_name in columns.items()}
+        self.lookups = {field.name: NameLookupCache(field.related_model)
+                        for field in self.fields.values() if isinstance(field, ForeignKey)}
+
+    def run(self, text_stream):
+        """Yields a ``progress`` event per chunk, then a ``complete`` (or ``error``) event with the summary."""
+        reader = csv.DictReader(text_stream)
+        missing_headers = [header for header in self.columns if header not in (reader.fieldnames or [])]
+        if missing_headers:
+            yield {'type': 'error', 'message': f'Missing columns: {", ".join(missing_headers)}'}
+            return
+        processed, created, failed, errors = 0, 0, 0, []
+        numbered_rows = enumerate(reader, start=2)
+        while chunk := list(islice(numbered_rows, self.chunk_size)):
+            instances, chunk_errors = self._build_chunk(chunk)
+            self._write(instances)
+            processed += len(chunk)
+            created += len(instances)
+            failed += len(chunk_errors)
+            errors.extend(chunk_errors[:self.max_reported_errors - len(errors)])
+            yield {'type': 'progress', 'progress': processed, 'created': created, 'failed': failed,
+                   'message': f'{processed} rows processed'}
+        if created:
+            bump_model_version(self.model)
+        yield {'type': 'complete', 'processed': processed, 'created': created, 'failed': failed, 'errors': errors}
+
+    def _build_chunk(self, chunk):
+        for field_name, lookup in self.lookups.items():
+            header = self._header_for(field_name)
+            lookup.prefetch({(row.get(header) or '').strip() for _, row in chunk})
+        parsed, errors = [], []
+        for line, row in chunk:
+            attributes, row_errors = self._parse_row(row)
+            if row_errors:
+                errors.append({'row': line, 'errors': row_errors})
+            else:
+                parsed.append((line, self.model(**attributes)))
+        instances = [instance for _, instance in parsed]
+        invalid = self._validate(instances)
+        for position, row_errors in invalid.items():
+            errors.append({'row': parsed[position][0], 'errors': row_errors})
+        errors.sort(key=lambda error: error['row'])
+        return [instance for position, instance in enumerate(instances) if position not in invalid], errors
+
+    def _parse_row(self, row):
+        attributes, errors = {}, {}
+        for header, field in self.fields.items():
+            raw = (row.get(header) or '').strip()
+            try:
+                if field.name in self.lookups:
+                    attributes[field.attname] = self._resolve(field, raw)
+                elif raw == '' and not field.empty_strings_allowed:
+                    attributes[field.attname] = None
+                else:
+                    attributes[field.attname] = self.parsers.get(field.name, self._default_parser(field))(raw)
+            except ValidationError as e:
+                errors[field.name] = e.messages
+        return attributes, errors
+
+    @staticmethod
+    def _default_parser(field):
+        return parse_boolean if isinstance(field, BooleanField) else field.to_python
+
+    def _resolve(self, field, name):
+        if not name:
+            # Foreign keys are excluded from full_clean, so a missing required one is reported here, not by COPY.
+            if not field.null:
+                raise ValidationError({field.name: field.error_messages['null']})
+            return None
+        related_id = self.lookups[field.name].get(name)
+        if related_id is None:
+            raise ValidationError(f'Unknown {field.related_model._meta.verbose_name} "{name}".')
+        return related_id
+
+    def _validate(self, instances):
+        # Foreign keys were already resolved by name, so their per row existence queries are skipped.
+        exclude = list(self.lookups)
+        if hasattr(self.model, 'full_clean_batch'):
+            errors = self.model.full_clean_batch(instances, exclude=exclude)
+        else:
+            errors = {}
+            for position, instance in enumerate(instances):
+                try:
+                    instance.full_clean(exclude=exclude)
+                except ValidationError as e:
+                    errors[position] = e.message_dict
+        return errors
+
+    def _header_for(self, field_name):
+        return next(header for header, field in self.fields.items() if field.name == field_name)
+
+    def _write(self, instances):
+        if not instances:
+            return
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                self._copy(instances)
+            else:
+                self.model._default_manager.bulk_create(instances, batch_size=self.chunk_size)
+            apply_bulk_aggregations(self.model, created=instances)
+
+    def _copy(self, instances):
+        fields = [field for field in self.model._meta.concrete_fields
+                  if field is not self.model._meta.auto_field and not getattr(field, 'generated', False)]
+        quote_name = connection.ops.quote_name
+        sql = (f'COPY {quote_name(self.model._meta.db_table)} '
+               f'({", ".join(quote_name(field.column) for field in fields)}) FROM STDIN')
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(sql) as copy:
+                for instance in instances:
+                    copy.write_row([field.get_db_prep_save(field.pre_save(instance, True), connection)
+                                    for field in fields])
@@ -0,0 +1,41 @@
+import datetime
+import decimal
+
+import orjson
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+_fallback_encoder = JSONEncoder()
+
+
+def dumps(data, indent=False):
+    """
+    orjson encoding with DRF's output: ``Decimal`` is written as the exact JSON number (no float round trip),
+    datetimes, dates and times follow ``REST_FRAMEWORK``'s formats and anything else goes through DRF's encoder.
+    """
+    return orjson.dumps(data, default=_default, option=(_OPTIONS | orjson.OPT_INDENT_2) if indent else _OPTIONS)
+
+
+def loads(data):
+    return orjson.loads(data)
+
+
+def _default(value):
+    if isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            raise TypeError(f'{value} is not JSON compliant')
+        return orjson.Fragment(str(value))
+    if isinstance(value, datetime.datetime):
+        return _format(value, api_settings.DATETIME_FORMAT)
+    if isinstance(value, datetime.date):
+        return _format(value, api_settings.DATE_FORMAT)
+    if isinstance(value, datetime.time):
+        return _format(value, api_settings.TIME_FORMAT)
+    return _fallback_encoder.default(value)
+
+
+def _format(value, output_format):
+    if output_format is None or output_format.lower() == 'iso-8601':
+        return _fallback_encoder.default(value)
+    return value.strftime(output_format)
@@ -0,0 +1,93 @@
+import hmac
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+DEFAULT_READY_CACHE_SECONDS = 2
+
+logger = logging.getLogger(__name__)
+
+_ready_lock = threading.Lock()
+_ready_result = None
+_ready_expires_at = 0.0
+
+
+def check_liveness():
+    """The process is up and serving: no I/O at all."""
+    return True, {'status': 'ok'}
+
+
+def check_readiness():
+    """One pooled ``SELECT 1``, its result reused for ``HEALTH_CHECKS['READY_CACHE_SECONDS']`` across probes."""
+    global _ready_result, _ready_expires_at
+    with _ready_lock:
+        if _ready_result is not None and time.monotonic() < _ready_expires_at:
+            return _ready_result
+    database = _timed('database', _check_database)
+    result = _summary({'database': database})
+    with _ready_lock:
+        _ready_result = result
+        _ready_expires_at = time.monotonic() + _ready_cache_seconds()
+    return result
+
+
+def check_deep():
+    """Every dependency, uncached: the database and each configured cache, with their latency."""
+    checks = {'database': _timed('database', _check_database)}
+    for alias in settings.CACHES:
+        checks[f'cache:{alias}'] = _timed(f'cache:{alias}', lambda: _check_cache(alias))
+    return _summary(checks)
+
+
+def is_deep_check_allowed(request):
+    """``/health/deep/`` reveals the topology: only for ``Authorization: Bearer <HEALTH_CHECKS['DEEP_TOKEN']>``."""
+    token = getattr(settings, 'HEALTH_CHECKS', {}).get('DEEP_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+def forget_readiness():
+    global _ready_result
+    with _ready_lock:
+        _ready_result = None
+
+
+def _ready_cache_seconds():
+    return getattr(settings, 'HEALTH_CHECKS', {}).get('READY_CACHE_SECONDS', DEFAULT_READY_CACHE_SECONDS)
+
+
+def _check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def _check_cache(alias):
+    cache = caches[alias]
+    cache.set('health-check', 1, 5)
+    if cache.get('health-check') != 1:
+        raise RuntimeError('value written was not read back')
+
+
+def _timed(name, check):
+    started = time.perf_counter()
+    try:
+        check()
+    except Exception:
+        # Probes are public: the details go to the log only.
+        logger.exception('Health check %s failed', name)
+        result = {'status': 'error'}
+    else:
+        result = {'status': 'ok'}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def _summary(checks):
+    healthy = all(check['status'] == 'ok' for check in checks.values())
+    return healthy, {'status': 'ok' if healthy else 'error', 'checks': checks}
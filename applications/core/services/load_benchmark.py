@@ -0,0 +1,155 @@
+import json
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+DEFAULT_SCENARIOS = [
+    {'name': 'job status', 'method': 'GET', 'path': '/api/v1/tenants/jobs/{job_id}/', 'weight': 8},
+    {'name': 'readiness', 'method': 'GET', 'path': '/health/ready/', 'weight': 1, 'auth': False},
+    {'name': 'login', 'method': 'POST', 'path': '/api/v1/core/sessions/', 'weight': 1, 'auth': False,
+     'body': {'username': '{username}', 'password': '{password}'}},
+    {'name': 'token refresh', 'method': 'POST', 'path': '/api/v1/tenants/auth/google/refresh/', 'weight': 1,
+     'auth': False, 'body': {'refresh_token': '{refresh_token}'}},
+]
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request')
+_QUERY_COUNT = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+@dataclass(frozen=True)
+class Sample:
+    scenario: str
+    status: int
+    elapsed: float
+    queries: Optional[int]
+
+    @property
+    def failed(self):
+        return self.status == 0 or self.status >= 400
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of already sorted values (None when there are none)."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def parse_query_count(server_timing):
+    """Query count that ``InstrumentationMiddleware`` reports in the ``db`` entry of ``Server-Timing``."""
+    match = _QUERY_COUNT.search(server_timing or '')
+    return int(match.group(1)) if match else None
+
+
+def build_schedule(scenarios, users, total_requests):
+    """``total_requests`` (scenario, user) pairs: scenarios interleaved by weight, virtual users taken round robin."""
+    weighted = [scenario for scenario in scenarios for _ in range(scenario.get('weight', 1))]
+    return list(zip(islice(cycle(weighted), total_requests), islice(cycle(users), total_requests)))
+
+
+def run_load(base_url, scenarios, users, total_requests, concurrency, warmup=0, timeout=30):
+    """
+    Sends the schedule from ``concurrency`` threads, each with its own keep-alive session, and returns the samples
+    and the wall time of the measured part. ``warmup`` requests go first and are not recorded. Placeholders such as
+    ``{job_id}`` in paths and bodies are filled from the virtual user.
+    """
+    sessions = threading.local()
+
+    def send(scenario, user):
+        session = getattr(sessions, 'session', None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        headers = {'Authorization': f"Bearer {user['token']}"} if scenario.get('auth', True) else {}
+        body = _fill(scenario.get('body'), user)
+        started = time.perf_counter()
+        url = base_url.rstrip('/') + _fill(scenario['path'], user)
+        try:
+            response = session.request(scenario.get('method', 'GET'), url, json=body, headers=headers, timeout=timeout)
+        except requests.RequestException:
+            return Sample(scenario['name'], 0, time.perf_counter() - started, None)
+        elapsed = time.perf_counter() - started
+        return Sample(scenario['name'], response.status_code, elapsed,
+                      parse_query_count(response.headers.get('Server-Timing')))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda pair: send(*pair), build_schedule(scenarios, users, warmup)))
+        started = time.perf_counter()
+        samples = list(executor.map(lambda pair: send(*pair), build_schedule(scenarios, users, total_requests)))
+        return samples, time.perf_counter() - started
+
+
+def summarize(samples, wall_seconds):
+    """Per scenario and overall (``all``) latency percentiles, throughput, error count and queries per request."""
+    groups = defaultdict(list)
+    for sample in samples:
+        groups[sample.scenario].append(sample)
+        groups['all'].append(sample)
+    return {name: _summarize_group(group, wall_seconds) for name, group in groups.items()}
+
+
+def _summarize_group(samples, wall_seconds):
+    durations = sorted(sample.elapsed * 1000 for sample in samples)
+    query_counts = [sample.queries for sample in samples if sample.queries is not None]
+    return {'requests': len(samples),
+            'errors': sum(sample.failed for sample in samples),
+            'p50_ms': round(percentile(durations, 0.50), 2),
+            'p95_ms': round(percentile(durations, 0.95), 2),
+            'p99_ms': round(percentile(durations, 0.99), 2),
+            'throughput_rps': round(len(samples) / wall_seconds, 1) if wall_seconds else None,
+            'queries_per_request': round(sum(query_counts) / len(query_counts), 2) if query_counts else None}
+
+
+def compare(current, baseline):
+    """``(scenario, metric, before, after, change_percent)`` for every metric present in both runs."""
+    changes = []
+    for scenario, metrics in current.items():
+        before_metrics = baseline.get(scenario)
+        if before_metrics is None:
+            continue
+        for metric in METRICS:
+            before, after = before_metrics.get(metric), metrics.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            changes.append((scenario, metric, before, after, round(change, 1)))
+    return changes
+
+
+def is_regression(metric, change_percent, tolerance_percent):
+    """Latencies and query counts must not grow, throughput must not drop, beyond ``tolerance_percent``."""
+    if metric == 'throughput_rps':
+        return change_percent < -tolerance_percent
+    return change_percent > tolerance_percent
+
+
+def save_results(directory, run):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{run['metadata']['commit']}.json"
+    path.write_text(json.dumps(run, indent=2))
+    return path
+
+
+def load_results(path):
+    return json.loads(Path(path).read_text())
+
+
+def latest_results_path(directory, exclude=None):
+    paths = sorted(path for path in Path(directory).glob('*.json') if path != exclude)
+    return paths[-1] if paths else None
+
+
+def _fill(value, user):
+    if isinstance(value, str):
+        return value.format_map(user)
+    if isinstance(value, dict):
+        return {key: _fill(item, user) for key, item in value.items()}
+    return value
@@ -0,0 +1,79 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+OFF_MODE = 'off'
+LOG_MODE = 'log'
+RAISE_MODE = 'raise'
+DEFAULT_OPTIONS = {'MODE': OFF_MODE, 'N_PLUS_ONE_THRESHOLD': 5}
+
+_context_counters = ContextVar('query_counters', default=())
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` that counts queries, their time and how often the same SQL repeats."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - started)
+
+    def record(self, sql, seconds):
+        self.duration += seconds
+        self.count += 1
+        self.statements[sql] += 1
+
+    def repeated_statements(self, threshold):
+        # Session statements (django-tenants' SET search_path, savepoints) legitimately repeat.
+        return {sql: times for sql, times in self.statements.items()
+                if times >= threshold and not sql.lstrip().upper().startswith(('SET ', 'SAVEPOINT', 'RELEASE'))}
+
+
+@contextmanager
+def count_context_queries(counter):
+    """
+    Feeds ``counter`` every query run in the current context, on whichever thread's connection runs it: unlike
+    ``connection.execute_wrapper``, this also sees the queries async views send through ``sync_to_async``, which
+    copies the context into the worker thread. Needs ``install_context_query_counter`` on every connection.
+    """
+    token = _context_counters.set(_context_counters.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _context_counters.reset(token)
+
+
+def install_context_query_counter(connection):
+    if _count_context_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_context_query)
+
+
+def _count_context_query(execute, sql, params, many, context):
+    counters = _context_counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        seconds = time.perf_counter() - started
+        for counter in counters:
+            counter.record(sql, seconds)
+
+
+def get_query_budget_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'QUERY_BUDGET', {})}
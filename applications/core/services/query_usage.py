@@ -0,0 +1,30 @@
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+
+FILTER_USAGE = 'filter'
+ORDERING_USAGE = 'ordering'
+SEARCH_USAGE = 'search'
+USAGE_KINDS = (FILTER_USAGE, ORDERING_USAGE, SEARCH_USAGE)
+
+
+def record_query_usage(model, kind, field_names):
+    """Counts (sampled by ``QUERY_USAGE_SAMPLE_RATE``) which fields clients filter, order or search on."""
+    sample_rate = getattr(settings, 'QUERY_USAGE_SAMPLE_RATE', 0)
+    if not field_names or sample_rate <= 0 or random.random() >= sample_rate:
+        return
+    cache = caches['default']
+    for field_name in set(field_names):
+        key = usage_key(model, kind, field_name)
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def get_query_usage(model, kind, field_names):
+    keys = {usage_key(model, kind, field_name): field_name for field_name in field_names}
+    return {keys[key]: count for key, count in caches['default'].get_many(list(keys)).items()}
+
+
+def usage_key(model, kind, field_name):
+    return f'query-usage:{model._meta.label}:{kind}:{field_name}'
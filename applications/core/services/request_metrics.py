@@ -0,0 +1,73 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class RequestMetrics:
+    """
+    Request counters and latency histograms of this worker, labelled by view, method and tenant schema, rendered in
+    the Prometheus text exposition format.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._statuses = defaultdict(int)
+        self._phases = defaultdict(float)
+        self._queries = defaultdict(int)
+
+    def observe(self, view, method, status_code, schema, elapsed, phases, query_count):
+        labels = (('view', view), ('method', method), ('schema', schema))
+        with self._lock:
+            histogram = self._durations.setdefault(labels, [[0] * len(self.buckets), 0, 0.0])
+            bucket = bisect_left(self.buckets, elapsed)
+            if bucket < len(self.buckets):
+                histogram[0][bucket] += 1
+            histogram[1] += 1
+            histogram[2] += elapsed
+            self._statuses[labels + (('status', str(status_code)),)] += 1
+            for phase, seconds in phases.items():
+                self._phases[labels + (('phase', phase),)] += seconds
+            self._queries[labels] += query_count
+
+    def render(self):
+        with self._lock:
+            lines = ['# HELP http_request_duration_seconds Time to produce the response.',
+                     '# TYPE http_request_duration_seconds histogram']
+            for labels, (bucket_counts, count, total) in self._durations.items():
+                cumulative = 0
+                for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'http_request_duration_seconds_bucket{_labels(labels, le=upper_bound)} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{_labels(labels, le="+Inf")} {count}')
+                lines.append(f'http_request_duration_seconds_count{_labels(labels)} {count}')
+                lines.append(f'http_request_duration_seconds_sum{_labels(labels)} {total}')
+            lines += ['# HELP http_requests_total Responses by status code.', '# TYPE http_requests_total counter']
+            lines += [f'http_requests_total{_labels(labels)} {count}' for labels, count in self._statuses.items()]
+            lines += ['# HELP http_request_phase_seconds_total Time spent per request phase.',
+                      '# TYPE http_request_phase_seconds_total counter']
+            lines += [f'http_request_phase_seconds_total{_labels(labels)} {seconds}'
+                      for labels, seconds in self._phases.items()]
+            lines += ['# HELP db_queries_total Database queries run while serving requests.',
+                      '# TYPE db_queries_total counter']
+            lines += [f'db_queries_total{_labels(labels)} {count}' for labels, count in self._queries.items()]
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_request_metrics = RequestMetrics()
+
+
+def get_request_metrics():
+    return _request_metrics
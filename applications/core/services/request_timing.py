@@ -0,0 +1,67 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DEFAULT_OPTIONS = {'SERVER_TIMING': True, 'TENANT_LABEL': False, 'METRICS_TOKEN': None, 'SLOW_REQUEST_MS': None,
+                   'PROFILE_SAMPLE_RATE': 0, 'PROFILE_INTERVAL_MS': 5, 'PROFILE_DIR': 'profiles'}
+
+_current_timings = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Seconds spent per phase (``tenant``, ``auth``, ``serialize``, ``render``...) of the request being served."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def get_instrumentation_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'INSTRUMENTATION', {})}
+
+
+def start_request_timings():
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def stop_request_timings(token):
+    _current_timings.reset(token)
+
+
+def get_request_timings():
+    return _current_timings.get()
+
+
+@contextmanager
+def measure(phase):
+    """Adds the time spent in the block to ``phase`` of the current request; a no-op outside instrumented requests."""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def server_timing_header(phases, elapsed, query_count):
+    """``Server-Timing`` value with every phase in milliseconds, e.g. ``db;dur=3.2;desc="7 queries", total;dur=12``."""
+    metrics = []
+    for phase, seconds in phases.items():
+        description = f';desc="{query_count} queries"' if phase == 'db' else ''
+        metrics.append(f'{phase};dur={seconds * 1000:.2f}{description}')
+    metrics.append(f'total;dur={elapsed * 1000:.2f}')
+    return ', '.join(metrics)
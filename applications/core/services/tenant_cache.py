@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from applications.tenants.context import get_current_schema_name
+
+DEFAULT_OPTIONS = {'L1_ALIAS': 'local', 'L2_ALIAS': 'default', 'L1_TIMEOUT': 5, 'TIMEOUT': 300, 'LOCK_TIMEOUT': 10,
+                   'LOCK_WAIT': 2}
+KEY_LOCK_STRIPES = 64
+_MISSING = object()
+
+
+class TenantCache:
+    """
+    Two level cache whose keys are namespaced by the current tenant schema: a short lived per-process L1 in front of
+    the shared L2 every worker sees. A stale L1 entry lives at most ``L1_TIMEOUT`` seconds after a change elsewhere.
+    ``get_or_set`` recomputes a missing value only once: threads of the process wait on a lock, other processes wait
+    on an ``add``-based lock in L2 and only compute themselves if the holder does not deliver in ``LOCK_WAIT`` seconds.
+    """
+
+    def __init__(self, options=None):
+        self.options = {**DEFAULT_OPTIONS, **(options or {})}
+        self._counters = defaultdict(Counter)
+        self._counters_lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(KEY_LOCK_STRIPES)]
+
+    @classmethod
+    def from_settings(cls):
+        return cls(getattr(settings, 'TENANT_CACHE', None))
+
+    @property
+    def l1(self):
+        return caches[self.options['L1_ALIAS']]
+
+    @property
+    def l2(self):
+        return caches[self.options['L2_ALIAS']]
+
+    @property
+    def is_shared(self):
+        """Whether L2 is seen by every worker (not a per-process locmem or dummy cache)."""
+        return not isinstance(self.l2, (LocMemCache, DummyCache))
+
+    def get(self, namespace, key, default=None):
+        value = self._get(namespace, self.make_key(namespace, key))
+        return default if value is _MISSING else value
+
+    def set(self, namespace, key, value, timeout=None):
+        full_key = self.make_key(namespace, key)
+        self.l2.set(full_key, value, self._timeout(timeout))
+        self.l1.set(full_key, value, self.options['L1_TIMEOUT'])
+
+    def delete(self, namespace, key):
+        full_key = self.make_key(namespace, key)
+        self.l2.delete(full_key)
+        self.l1.delete(full_key)
+
+    def get_or_set(self, namespace, key, compute, timeout=None):
+        full_key = self.make_key(namespace, key)
+        value = self._get(namespace, full_key)
+        if value is not _MISSING:
+            return value
+        with self._key_lock(full_key):
+            value = self._get(namespace, full_key, count=False)
+            if value is not _MISSING:
+                return value
+            return self._compute_once_across_processes(full_key, compute, self._timeout(timeout))
+
+    def make_key(self, namespace, key):
+        return f'{get_current_schema_name()}:{namespace}:{key}'
+
+    def stats(self):
+        with self._counters_lock:
+            return {namespace: dict(counter) for namespace, counter in self._counters.items()}
+
+    def _get(self, namespace, full_key, count=True):
+        value = self.l1.get(full_key, _MISSING)
+        level = 'l1_hits'
+        if value is _MISSING:
+            value = self.l2.get(full_key, _MISSING)
+            level = 'l2_hits'
+            if value is not _MISSING:
+                self.l1.set(full_key, value, self.options['L1_TIMEOUT'])
+        if count:
+            self._count(namespace, 'misses' if value is _MISSING else level)
+        return value
+
+    def _compute_once_across_processes(self, full_key, compute, timeout):
+        lock_key = f'{full_key}:lock'
+        lock_acquired = self.l2.add(lock_key, 1, self.options['LOCK_TIMEOUT'])
+        if not lock_acquired:
+            value = self._wait_for_value(full_key)
+            if value is not _MISSING:
+                return value
+        try:
+            value = compute()
+            self.l2.set(full_key, value, timeout)
+            self.l1.set(full_key, value, self.options['L1_TIMEOUT'])
+            return value
+        finally:
+            if lock_acquired:
+                self.l2.delete(lock_key)
+
+    def _wait_for_value(self, full_key):
+        deadline = time.monotonic() + self.options['LOCK_WAIT']
+        while time.monotonic() < deadline:
+            value = self.l2.get(full_key, _MISSING)
+            if value is not _MISSING:
+                self.l1.set(full_key, value, self.options['L1_TIMEOUT'])
+                return value
+            time.sleep(0.05)
+        return _MISSING
+
+    def _key_lock(self, full_key):
+        return self._key_locks[hash(full_key) % KEY_LOCK_STRIPES]
+
+    def _count(self, namespace, counter_name):
+        with self._counters_lock:
+            self._counters[namespace][counter_name] += 1
+
+    def _timeout(self, timeout):
+        return self.options['TIMEOUT'] if timeout is None else timeout
+
+
+_tenant_cache = None
+
+
+def get_tenant_cache():
+    global _tenant_cache
+    if _tenant_cache is None:
+        _tenant_cache = TenantCache.from_settings()
+    return _tenant_cache
@@ -0,0 +1,38 @@
+import threading
+from collections import defaultdict
+
+
+class TimingStats:
+    """
+    Process-wide count and total seconds per named operation (e.g. ``core.Account.validation``), rendered for
+    Prometheus next to the request metrics.
+    """
+
+    def __init__(self):
+        self._totals = defaultdict(lambda: [0, 0.0])
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            total = self._totals[name]
+            total[0] += 1
+            total[1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {'count': count, 'seconds': seconds} for name, (count, seconds) in self._totals.items()}
+
+    def render(self):
+        lines = ['# HELP model_operation_seconds_total Time spent validating and writing model instances.',
+                 '# TYPE model_operation_seconds_total counter']
+        counts = ['# HELP model_operations_total Model validations and writes.',
+                  '# TYPE model_operations_total counter']
+        for name, totals in sorted(self.snapshot().items()):
+            model, operation = name.rsplit('.', 1)
+            labels = f'{{model="{model}",operation="{operation}"}}'
+            lines.append(f'model_operation_seconds_total{labels} {totals["seconds"]}')
+            counts.append(f'model_operations_total{labels} {totals["count"]}')
+        return '\n'.join(lines + counts) + '\n'
+
+
+timing_stats = TimingStats()
@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+DEFAULT_OPTIONS = {'MAX_SIZE': 10000, 'MAX_TTL': 300, 'STATELESS_READS': False}
+_REQUEST_ATTRIBUTE = '_token_verification'
+
+
+def get_token_verification_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'TOKEN_VERIFICATION', {})}
+
+
+class VerifiedTokenCache:
+    """
+    Per-process LRU of access tokens that already passed signature and claim validation. Entries are keyed on the
+    SHA-256 of the raw token and dropped at the token's ``exp`` or after ``max_ttl`` seconds, whichever comes first.
+    """
+
+    def __init__(self, max_size=DEFAULT_OPTIONS['MAX_SIZE'], max_ttl=DEFAULT_OPTIONS['MAX_TTL']):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = get_token_verification_options()
+        return cls(max_size=options['MAX_SIZE'], max_ttl=options['MAX_TTL'])
+
+    def get(self, raw_token):
+        key = self._key(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            token, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token
+
+    def set(self, raw_token, token):
+        now = time.time()
+        expires_at = min(token.get('exp') or now + self.max_ttl, now + self.max_ttl)
+        if self.max_size <= 0 or expires_at <= now:
+            return
+        key = self._key(raw_token)
+        with self._lock:
+            self._entries[key] = (token, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _key(raw_token):
+        return hashlib.sha256(raw_token.encode() if isinstance(raw_token, str) else raw_token).digest()
+
+
+_cache = None
+
+
+def get_verified_token_cache():
+    global _cache
+    if _cache is None:
+        _cache = VerifiedTokenCache.from_settings()
+    return _cache
+
+
+def validate_request_token(request, raw_token, validate):
+    """
+    Validated token for ``raw_token`` through ``validate`` (``JWTAuthentication.get_validated_token``), run at most
+    once per request: the outcome is kept on the underlying ``HttpRequest``, so the tenant middleware and DRF
+    authentication share it, and a valid token is also remembered by the process until it expires. Validation errors
+    are raised to every caller.
+    """
+    http_request = getattr(request, '_request', request)
+    verification = getattr(http_request, _REQUEST_ATTRIBUTE, None)
+    if verification is None or verification[0] != raw_token:
+        verification = (raw_token, _verify(raw_token, validate))
+        setattr(http_request, _REQUEST_ATTRIBUTE, verification)
+    outcome = verification[1]
+    if isinstance(outcome, Exception):
+        raise outcome
+    return outcome
+
+
+def _verify(raw_token, validate):
+    cache = get_verified_token_cache()
+    token = cache.get(raw_token)
+    if token is not None:
+        return token
+    try:
+        token = validate(raw_token)
+    except (InvalidToken, TokenError) as error:
+        return error
+    cache.set(raw_token, token)
+    return token
@@ -0,0 +1,9 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from applications.core.services.query_budget import install_context_query_counter
+
+
+@receiver(connection_created)
+def count_queries_per_context(sender, connection, **kwargs):
+    install_context_query_counter(connection)
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from applications.core.services.aggregations import SNAPSHOT_ATTRIBUTE, Aggregation, _bulk_deltas
+from applications.tenants.models import User
+
+
+class AggregationTests(SimpleTestCase):
+    def setUp(self):
+        self.aggregation = Aggregation(name='users-by-tenant', model='tenants.User', group_by=('tenant', 'is_staff'),
+                                       sum_field='id')
+
+    def test_snapshot_reads_loaded_values(self):
+        user = User(tenant_id=3, is_staff=True, id=7)
+
+        self.assertEqual(self.aggregation.snapshot(user), ((3, True), 7))
+
+    def test_snapshot_of_deferred_fields_is_unknown(self):
+        user = User(tenant_id=3, is_staff=True, id=7)
+        del user.__dict__['is_staff']
+
+        self.assertIsNone(self.aggregation.snapshot(user))
+
+    def test_key_and_dimensions(self):
+        self.assertEqual(self.aggregation.key((None, False)), '|False')
+        self.assertEqual(self.aggregation.dimensions((3, True)), {'tenant': 3, 'is_staff': True})
+
+    def test_missing_amount_counts_as_zero(self):
+        user = User(tenant_id=None, is_staff=False, id=None)
+
+        self.assertEqual(self.aggregation.snapshot(user), ((None, False), Decimal(0)))
+
+    def test_bulk_deltas_per_group(self):
+        created = [User(tenant_id=3, is_staff=True, id=7), User(tenant_id=3, is_staff=True, id=8)]
+        moved = User(tenant_id=3, is_staff=True, id=9)
+        moved.__dict__[SNAPSHOT_ATTRIBUTE] = {self.aggregation.name: ((3, False), 9)}
+        unchanged = User(tenant_id=4, is_staff=False, id=10)
+        unchanged.__dict__[SNAPSHOT_ATTRIBUTE] = {self.aggregation.name: ((4, False), 10)}
+
+        deltas = _bulk_deltas(self.aggregation, created, [moved, unchanged])
+
+        self.assertEqual(deltas, {'3|True': [(3, True), 24, 3], '3|False': [(3, False), -9, -1]})
+        self.assertEqual(moved.__dict__[SNAPSHOT_ATTRIBUTE][self.aggregation.name], ((3, True), 9))
+
+    def test_bulk_deltas_skip_updates_without_snapshot(self):
+        with self.assertLogs('applications.core.services.aggregations', 'WARNING'):
+            deltas = _bulk_deltas(self.aggregation, [], [User(tenant_id=3, is_staff=True, id=7)])
+
+        self.assertEqual(deltas, {})
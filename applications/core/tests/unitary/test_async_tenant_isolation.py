@@ -0,0 +1,39 @@
+import asyncio
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase
+
+from applications.tenants.middlewares import AsyncUserTenantMiddleware
+from applications.tenants.services.tenant_resolution_cache import TenantResolution
+
+
+def schema_seen_by_query():
+    """Schema a query issued from this thread would run in, without touching the database."""
+    connection._apply_current_tenant()
+    return connection.schema_name
+
+
+class AsyncTenantIsolationTests(SimpleTestCase):
+    def test_concurrent_requests_query_their_own_schema(self):
+        async def view(request):
+            # Let the other request activate its tenant before this one queries.
+            await asyncio.sleep(0.01)
+            return await sync_to_async(schema_seen_by_query)()
+
+        async def resolve(request):
+            schema_name = request.headers['X-Schema']
+            return TenantResolution(tenant_id=len(schema_name), schema_name=schema_name)
+
+        middleware = AsyncUserTenantMiddleware(view)
+        factory = RequestFactory()
+
+        async def requests():
+            return await asyncio.gather(*(middleware(factory.get('/api/v1/core/', HTTP_X_SCHEMA=schema_name))
+                                          for schema_name in ('tenant_a', 'tenant_b', 'tenant_a', 'tenant_b')))
+
+        with mock.patch.object(AsyncUserTenantMiddleware, '_aresolve_tenant', side_effect=resolve):
+            schemas = asyncio.run(requests())
+
+        self.assertEqual(schemas, ['tenant_a', 'tenant_b', 'tenant_a', 'tenant_b'])
@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+
+from applications.core.models.mixins import _postgres_object_name, unique_field_for_constraint
+from applications.tenants.models import User
+
+
+class UniqueFieldForConstraintTests(SimpleTestCase):
+    def test_postgres_default_unique_constraint_name(self):
+        field = unique_field_for_constraint(User, f'{User._meta.db_table}_username_key')
+
+        self.assertEqual(field.name, 'username')
+
+    def test_unknown_constraint(self):
+        self.assertIsNone(unique_field_for_constraint(User, 'some_other_constraint'))
+        self.assertIsNone(unique_field_for_constraint(User, None))
+
+    def test_constraint_of_another_field_with_same_prefix(self):
+        self.assertIsNone(unique_field_for_constraint(User, f'{User._meta.db_table}_username_lower_idx'))
+
+    def test_long_names_are_truncated_like_postgres(self):
+        name = _postgres_object_name('t' * 60, 'column', 'key')
+
+        self.assertEqual(len(name), 63)
+        self.assertTrue(name.endswith('_column_key'))
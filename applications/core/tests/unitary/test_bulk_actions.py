@@ -0,0 +1,31 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from applications.core.controllers.mixins import BulkActionsMixin
+from applications.tenants.models import User
+
+
+class BulkPrimaryKeyTests(SimpleTestCase):
+    def test_ids_converted_to_primary_key_type(self):
+        self.assertEqual(BulkActionsMixin._bulk_pk(User, {'id': '7'}), 7)
+        self.assertEqual(BulkActionsMixin._bulk_pk(User, {'id': 7}), 7)
+
+    def test_missing_or_invalid_ids(self):
+        self.assertIsNone(BulkActionsMixin._bulk_pk(User, {'name': 'x'}))
+        self.assertIsNone(BulkActionsMixin._bulk_pk(User, {'id': 'abc'}))
+        self.assertIsNone(BulkActionsMixin._bulk_pk(User, ['7']))
+
+
+class BulkDestroyTests(SimpleTestCase):
+    def test_invalid_ids_rejected_before_querying(self):
+        controller = BulkActionsMixin()
+        controller.get_queryset = mock.Mock(return_value=User.objects.none())
+        controller.filter_queryset = mock.Mock()
+        request = mock.Mock(data={'ids': [7, 'abc', None, {'id': 1}]})
+
+        response = controller.bulk_destroy(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2, 3])
+        controller.filter_queryset.assert_not_called()
@@ -0,0 +1,149 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from applications.core.serializers.compiled import NotCompilable, compile_serializer
+from applications.tenants.models import Domain, Job, Tenant, User
+
+
+class TenantReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tenant
+        fields = ['id', 'schema_name']
+
+
+class JobReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'status', 'attempts', 'payload', 'progress', 'run_after', 'finished_at', 'tenant']
+
+
+class UserReadSerializer(serializers.ModelSerializer):
+    tenant = TenantReadSerializer()
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'email', 'is_staff', 'date_joined', 'tenant', 'password']
+        extra_kwargs = {'password': {'write_only': True}}
+
+
+class DomainReadSerializer(serializers.ModelSerializer):
+    schema_name = serializers.CharField(source='tenant.schema_name')
+
+    class Meta:
+        model = Domain
+        fields = ['id', 'domain', 'is_primary', 'schema_name']
+
+
+def values_row(instance, columns):
+    """What ``queryset.values(*columns)`` returns for ``instance``: relations give their id, nulls stay None."""
+    row = {}
+    for column in columns:
+        *relations, name = column.split('__')
+        target = instance
+        for relation in relations:
+            target = getattr(target, relation) if target is not None else None
+        row[column] = None if target is None else getattr(target, target._meta.get_field(name).attname)
+    return row
+
+
+class CompiledSerializerParityTests(SimpleTestCase):
+    def setUp(self):
+        self.tenant = Tenant(id=4, schema_name='acme')
+        self.moment = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+    def assert_parity(self, serializer_class, instance):
+        compiled = compile_serializer(serializer_class)
+
+        represented = compiled.represent(values_row(instance, compiled.columns))
+
+        self.assertEqual(represented, serializer_class(instance).data)
+
+    def test_flat_fields_and_primary_key_relation(self):
+        job = Job(id=1, name='core.csv_import', status=Job.RUNNING, attempts=2, payload={'rows': [1, 2]},
+                  progress=None, run_after=self.moment, tenant=self.tenant)
+
+        self.assert_parity(JobReadSerializer, job)
+
+    def test_null_relation_and_values(self):
+        job = Job(id=2, name='tenants.provision', run_after=self.moment, finished_at=self.moment, tenant=None)
+
+        self.assert_parity(JobReadSerializer, job)
+
+    def test_nested_serializer(self):
+        user = User(id=3, username='ana', email='ana@example.com', date_joined=self.moment, tenant=self.tenant)
+
+        self.assert_parity(UserReadSerializer, user)
+
+    def test_nested_serializer_on_null_relation(self):
+        user = User(id=5, username='admin', is_staff=True, date_joined=self.moment, tenant=None)
+
+        self.assert_parity(UserReadSerializer, user)
+
+    def test_dotted_source_through_required_relation(self):
+        domain = Domain(id=6, domain='acme.example.com', is_primary=True, tenant=self.tenant)
+
+        self.assert_parity(DomainReadSerializer, domain)
+
+    def test_columns_include_joins_and_skip_write_only_fields(self):
+        compiled = compile_serializer(UserReadSerializer)
+
+        self.assertEqual(compiled.columns, ('id', 'username', 'email', 'is_staff', 'date_joined', 'tenant',
+                                            'tenant__id', 'tenant__schema_name'))
+
+
+class NotCompilableTests(SimpleTestCase):
+    def assert_not_compilable(self, serializer_class):
+        with self.assertRaises(NotCompilable):
+            compile_serializer(serializer_class)
+
+    def test_method_field(self):
+        class JobLabelSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Job
+                fields = ['id', 'label']
+
+            def get_label(self, job):
+                return str(job)
+
+        self.assert_not_compilable(JobLabelSerializer)
+
+    def test_to_many_relation(self):
+        class TenantJobsSerializer(serializers.ModelSerializer):
+            jobs = JobReadSerializer(many=True)
+
+            class Meta:
+                model = Tenant
+                fields = ['id', 'jobs']
+
+        self.assert_not_compilable(TenantJobsSerializer)
+
+    def test_custom_to_representation(self):
+        class UpperJobSerializer(JobReadSerializer):
+            def to_representation(self, instance):
+                return {'name': instance.name.upper()}
+
+        self.assert_not_compilable(UpperJobSerializer)
+
+    def test_dotted_source_through_nullable_relation(self):
+        class UserSchemaSerializer(serializers.ModelSerializer):
+            schema_name = serializers.CharField(source='tenant.schema_name')
+
+            class Meta:
+                model = User
+                fields = ['id', 'schema_name']
+
+        self.assert_not_compilable(UserSchemaSerializer)
+
+    def test_property_source(self):
+        class DomainLabelSerializer(serializers.ModelSerializer):
+            label = serializers.CharField(source='__str__')
+
+            class Meta:
+                model = Domain
+                fields = ['id', 'label']
+
+        self.assert_not_compilable(DomainLabelSerializer)
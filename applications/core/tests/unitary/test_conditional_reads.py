@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase
+from django.utils.http import http_date
+
+from applications.core.controllers.mixins import ConditionalReadMixin
+from applications.core.services import model_versions
+from applications.core.services.tenant_cache import TenantCache
+from applications.tenants.models import Job, User
+
+
+class ConditionalReadsTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_matching_etag_answers_not_modified(self):
+        request = self.factory.get('/', HTTP_IF_NONE_MATCH='"abc"')
+
+        response = ConditionalReadMixin._not_modified_response(request, '"abc"', 100)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        request = self.factory.get('/', HTTP_IF_MODIFIED_SINCE=http_date(200))
+
+        self.assertIsNone(ConditionalReadMixin._not_modified_response(request, '"abc"', 100))
+
+    def test_off_by_default_without_a_shared_cache(self):
+        controller = ConditionalReadMixin()
+        local_cache = TenantCache({'L2_ALIAS': 'local'})
+
+        with mock.patch('applications.core.controllers.mixins.get_tenant_cache', return_value=local_cache):
+            self.assertFalse(controller.uses_conditional_reads())
+        controller.conditional_reads = True
+        self.assertTrue(controller.uses_conditional_reads())
+
+    def test_dependency_models_cached_per_class(self):
+        class UsersController(ConditionalReadMixin):
+            readable_serializer = None
+
+            def get_queryset(self):
+                return User.objects.none()
+
+            def get_serializer_class(self):
+                return None
+
+        class JobsController(UsersController):
+            def get_queryset(self):
+                return Job.objects.none()
+
+        self.assertEqual(UsersController().get_dependency_models(), (User,))
+        self.assertEqual(JobsController().get_dependency_models(), (Job,))
+
+    def test_versions_read_in_one_round_trip(self):
+        cache = mock.Mock()
+        cache.make_key.side_effect = lambda namespace, key: key
+        cache.l2.get_many.return_value = {'tenants.User': 10.0, 'tenants.Job': 20.0}
+
+        with mock.patch.object(model_versions, 'get_tenant_cache', return_value=cache):
+            versions = model_versions.get_model_versions([User, Job])
+
+        self.assertEqual(versions, [10.0, 20.0])
+        cache.l2.get_many.assert_called_once_with(['tenants.User', 'tenants.Job'])
+        cache.l2.get.assert_not_called()
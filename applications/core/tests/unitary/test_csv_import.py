@@ -0,0 +1,71 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from django_tenants.postgresql_backend.base import FakeTenant
+from django_tenants.utils import get_public_schema_name
+
+from applications.core.controllers.mixins import ImportActionsMixin
+from applications.core.services.csv_import import CsvImporter, parse_boolean, parse_decimal_comma
+from applications.tenants.models import Domain, User
+
+
+class CsvImportTests(SimpleTestCase):
+    def setUp(self):
+        self.importer = CsvImporter(User, {'Usuario': 'username', 'Staff': 'is_staff', 'Alta': 'date_joined'})
+
+    def test_parse_decimal_comma(self):
+        self.assertEqual(parse_decimal_comma('46,02'), Decimal('46.02'))
+        self.assertEqual(parse_decimal_comma('-1.234,5'), Decimal('-1234.5'))
+        with self.assertRaises(ValidationError):
+            parse_decimal_comma('abc')
+
+    def test_parse_boolean(self):
+        self.assertEqual([parse_boolean(value) for value in ('true', 'FALSE', 'Yes', 'no', '1')],
+                         [True, False, True, False, True])
+        with self.assertRaises(ValidationError):
+            parse_boolean('maybe')
+
+    def test_parse_row(self):
+        attributes, errors = self.importer._parse_row({'Usuario': ' ana ', 'Staff': 'true', 'Alta': ''})
+
+        self.assertEqual(errors, {})
+        self.assertEqual(attributes, {'username': 'ana', 'is_staff': True, 'date_joined': None})
+
+    def test_parse_row_errors_per_field(self):
+        _, errors = self.importer._parse_row({'Usuario': 'ana', 'Staff': 'maybe', 'Alta': 'yesterday'})
+
+        self.assertEqual(set(errors), {'is_staff', 'date_joined'})
+
+    def test_empty_foreign_key_name(self):
+        required = CsvImporter(Domain, {'Dominio': 'domain', 'Empresa': 'tenant'})
+        optional = CsvImporter(User, {'Usuario': 'username', 'Empresa': 'tenant'})
+
+        _, required_errors = required._parse_row({'Dominio': 'acme.example.com', 'Empresa': ''})
+        attributes, optional_errors = optional._parse_row({'Usuario': 'ana', 'Empresa': ''})
+
+        self.assertEqual(required_errors, {'tenant': [Domain._meta.get_field('tenant').error_messages['null']]})
+        self.assertEqual(optional_errors, {})
+        self.assertIsNone(attributes['tenant_id'])
+
+    def test_missing_columns_reported_before_reading_rows(self):
+        events = list(self.importer.run(iter(['Usuario,Staff\n', 'ana,true\n'])))
+
+        self.assertEqual(events, [{'type': 'error', 'message': 'Missing columns: Alta'}])
+
+
+class ImportJobTests(SimpleTestCase):
+    def test_public_schema_cannot_queue_imports(self):
+        controller = ImportActionsMixin()
+        controller.import_columns = {'Usuario': 'username'}
+        request = mock.Mock(FILES={'file': SimpleUploadedFile('users.csv', b'Usuario\nana\n')})
+
+        with mock.patch('applications.core.controllers.mixins.get_current_tenant',
+                        return_value=FakeTenant(get_public_schema_name())), \
+                mock.patch('applications.core.controllers.mixins.default_storage') as storage:
+            response = controller.import_job(request)
+
+        self.assertEqual(response.status_code, 400)
+        storage.save.assert_not_called()
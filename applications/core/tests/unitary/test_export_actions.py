@@ -0,0 +1,31 @@
+import json
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from applications.core.controllers.mixins import ExportActionsMixin
+
+
+class ExportActionsTests(SimpleTestCase):
+    def setUp(self):
+        self.exporter = ExportActionsMixin()
+        self.exporter.export_chunk_size = 2
+        self.rows = [{'id': 1, 'amount': Decimal('1.50'), 'concept': {'name': 'Food'}},
+                     {'id': 2, 'amount': Decimal('2'), 'concept': None},
+                     {'id': 3, 'amount': Decimal('-3.25'), 'concept': {'name': 'Rent'}}]
+
+    def test_csv_header_and_nested_values(self):
+        chunks = list(self.exporter._csv_chunks(iter(self.rows)))
+
+        lines = ''.join(chunks).splitlines()
+        self.assertEqual(lines[0], 'id,amount,concept')
+        self.assertEqual(lines[1], '1,1.50,"{""name"":""Food""}"')
+        self.assertEqual(lines[2], '2,2,')
+        self.assertEqual(len(chunks), 2)
+
+    def test_ndjson_one_object_per_line(self):
+        chunks = list(self.exporter._ndjson_chunks(iter(self.rows)))
+
+        lines = b''.join(chunks).splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [1, 2, 3])
+        self.assertEqual(json.loads(lines[2], parse_float=Decimal)['amount'], Decimal('-3.25'))
@@ -0,0 +1,34 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+
+from applications.core.controllers.renderers import ORJSONParser, ORJSONRenderer
+from applications.core.services import fast_json
+
+
+class FastJsonTests(SimpleTestCase):
+    def test_decimal_is_the_exact_number(self):
+        self.assertEqual(fast_json.dumps({'amount': Decimal('46.10')}), b'{"amount":46.10}')
+        self.assertEqual(fast_json.dumps([Decimal('0.1') + Decimal('0.2')]), b'[0.3]')
+
+    def test_datetimes_follow_rest_framework_formats(self):
+        data = {'at': datetime(2024, 5, 6, 7, 8, 9, 10), 'on': date(2024, 5, 6)}
+
+        self.assertEqual(fast_json.dumps(data), b'{"at":"2024-05-06 07:08:09.000010","on":"2024-05-06"}')
+
+    def test_non_string_keys(self):
+        self.assertEqual(fast_json.dumps({1: 'a'}), b'{"1":"a"}')
+
+    def test_renderer_indent_and_empty_body(self):
+        renderer = ORJSONRenderer()
+
+        self.assertEqual(renderer.render(None), b'')
+        self.assertEqual(renderer.render({'a': 1}, 'application/json; indent=4'), b'{\n  "a": 1\n}')
+
+    def test_parser(self):
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(b'{"amount": 46.02}')), {'amount': 46.02})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{'))
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.test import SimpleTestCase
+
+from applications.tenants.services.google_auth_service import GoogleAuth, GoogleAuthException
+
+CLIENT_ID = 'demo_client_id'
+ISSUER = 'https://accounts.google.com'
+
+
+class GoogleStub(BaseHTTPRequestHandler):
+    """Token, userinfo and JWKS endpoints; ``server.script`` maps a path to a list of planned answers."""
+
+    def do_GET(self):
+        self._answer()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._answer()
+
+    def _answer(self):
+        self.server.hits[self.path] += 1
+        planned = self.server.script[self.path]
+        status, body, delay = planned.pop(0) if len(planned) > 1 else planned[0]
+        time.sleep(delay)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if self.path == '/certs':
+            self.send_header('Cache-Control', 'public, max-age=600')
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleAuthStubServerTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        public_jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(cls.private_key.public_key()))
+        cls.jwks = {'keys': [{**public_jwk, 'kid': 'key-1', 'alg': 'RS256', 'use': 'sig'}]}
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), GoogleStub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.hits = Counter()
+        self.server.script = {'/token': [(200, {'access_token': 'access', 'id_token': self.id_token()}, 0)],
+                              '/userinfo': [(200, {'email': 'ana@example.com', 'name': 'Ana'}, 0)],
+                              '/certs': [(200, self.jwks, 0)]}
+        self.google_auth = GoogleAuth({'TOKEN_ENDPOINT': f'{self.base_url}/token',
+                                       'USERINFO_ENDPOINT': f'{self.base_url}/userinfo',
+                                       'JWKS_URI': f'{self.base_url}/certs',
+                                       'CONNECT_TIMEOUT': 1, 'READ_TIMEOUT': 0.5, 'BACKOFF_FACTOR': 0})
+        self.google_auth.client_id = CLIENT_ID
+
+    def id_token(self, **claims):
+        now = int(time.time())
+        payload = {'iss': ISSUER, 'aud': CLIENT_ID, 'iat': now, 'exp': now + 3600, 'email': 'ana@example.com',
+                   'email_verified': True, 'name': 'Ana', 'picture': 'https://example.com/ana.png', **claims}
+        return jwt.encode(payload, self.private_key, algorithm='RS256', headers={'kid': 'key-1'})
+
+    def test_id_token_is_verified_locally_and_signing_keys_are_cached(self):
+        first = self.google_auth.get_user_info('code', 'http://localhost/callback')
+        second = self.google_auth.get_user_info('code', 'http://localhost/callback')
+
+        self.assertEqual(first, {'email': 'ana@example.com', 'name': 'Ana', 'picture': 'https://example.com/ana.png'})
+        self.assertEqual(second, first)
+        self.assertEqual(self.server.hits, Counter({'/token': 2, '/certs': 1}))
+
+    def test_async_id_token_path(self):
+        user_info = asyncio.run(self.google_auth.aget_user_info('code', 'http://localhost/callback'))
+
+        self.assertEqual(user_info['email'], 'ana@example.com')
+        self.assertEqual(self.server.hits['/userinfo'], 0)
+
+    def test_falls_back_to_userinfo_without_id_token(self):
+        self.server.script['/token'] = [(200, {'access_token': 'access'}, 0)]
+
+        user_info = self.google_auth.get_user_info('code', 'http://localhost/callback')
+
+        self.assertEqual(user_info, {'email': 'ana@example.com', 'name': 'Ana', 'picture': ''})
+
+    def test_id_token_for_another_client_is_rejected(self):
+        self.server.script['/token'] = [(200, {'access_token': 'access', 'id_token': self.id_token(aud='other')}, 0)]
+
+        with self.assertRaises(GoogleAuthException):
+            self.google_auth.get_user_info('code', 'http://localhost/callback')
+
+    def test_unverified_email_is_rejected(self):
+        id_token = self.id_token(email_verified=False)
+        self.server.script['/token'] = [(200, {'access_token': 'access', 'id_token': id_token}, 0)]
+
+        with self.assertRaises(GoogleAuthException):
+            self.google_auth.get_user_info('code', 'http://localhost/callback')
+
+    def test_slow_code_exchange_times_out_without_retrying(self):
+        self.server.script['/token'] = [(200, {'access_token': 'access'}, 1)]
+        started = time.monotonic()
+
+        with self.assertRaises(GoogleAuthException) as context:
+            self.google_auth.get_user_info('code', 'http://localhost/callback')
+
+        self.assertEqual(context.exception.status_code, 502)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.server.hits['/token'], 1)
+
+    def test_userinfo_server_errors_are_retried(self):
+        self.server.script['/token'] = [(200, {'access_token': 'access'}, 0)]
+        self.server.script['/userinfo'] = [(503, {}, 0), (200, {'email': 'ana@example.com'}, 0)]
+
+        user_info = self.google_auth.get_user_info('code', 'http://localhost/callback')
+
+        self.assertEqual(user_info['email'], 'ana@example.com')
+        self.assertEqual(self.server.hits['/userinfo'], 2)
+
+    def test_async_userinfo_server_errors_are_retried(self):
+        self.server.script['/token'] = [(200, {'access_token': 'access'}, 0)]
+        self.server.script['/userinfo'] = [(503, {}, 0), (502, {}, 0), (200, {'email': 'ana@example.com'}, 0)]
+
+        user_info = asyncio.run(self.google_auth.aget_user_info('code', 'http://localhost/callback'))
+
+        self.assertEqual(user_info['email'], 'ana@example.com')
+        self.assertEqual(self.server.hits['/userinfo'], 3)
+
+    def test_async_code_exchange_server_errors_are_not_retried(self):
+        self.server.script['/token'] = [(503, {}, 0), (200, {'access_token': 'access'}, 0)]
+
+        with self.assertRaises(GoogleAuthException):
+            asyncio.run(self.google_auth.aget_user_info('code', 'http://localhost/callback'))
+
+        self.assertEqual(self.server.hits['/token'], 1)
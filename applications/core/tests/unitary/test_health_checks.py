@@ -0,0 +1,65 @@
+import json
+from unittest.mock import patch
+
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from applications.core.middlewares import HealthCheckMiddleware
+from applications.core.services import health
+
+
+class HealthCheckTests(SimpleTestCase):
+    def setUp(self):
+        health.forget_readiness()
+        self.middleware = HealthCheckMiddleware(self._unexpected_get_response)
+
+    @staticmethod
+    def _unexpected_get_response(_):
+        raise AssertionError('Probes must not reach the rest of the stack')
+
+    def test_liveness_without_io(self):
+        with patch.object(health, '_check_database') as check_database:
+            response = self.middleware(RequestFactory().get('/health/live/'))
+
+        self.assertEqual(response.status_code, 200)
+        check_database.assert_not_called()
+
+    def test_readiness_result_is_reused(self):
+        with patch.object(health, '_check_database') as check_database:
+            self.middleware(RequestFactory().get('/health/ready/'))
+            response = self.middleware(RequestFactory().get('/healthcheck/'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(check_database.call_count, 1)
+        self.assertIn('latency_ms', json.loads(response.content)['checks']['database'])
+
+    def test_unhealthy_database_is_503(self):
+        with (patch.object(health, '_check_database', side_effect=OSError('connection refused')),
+              self.assertLogs('applications.core.services.health', 'ERROR')):
+            response = self.middleware(RequestFactory().get('/health/ready/'))
+
+        body = json.loads(response.content)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(body['checks']['database']['status'], 'error')
+        self.assertNotIn('connection refused', response.content.decode())
+
+    @override_settings(HEALTH_CHECKS={'DEEP_TOKEN': 'probe-token'})
+    def test_deep_check_needs_token(self):
+        with patch.object(health, '_check_database') as check_database:
+            anonymous = self.middleware(RequestFactory().get('/health/deep/'))
+            wrong = self.middleware(RequestFactory().get('/health/deep/', HTTP_AUTHORIZATION='Bearer nope'))
+
+        self.assertEqual(anonymous.status_code, 403)
+        self.assertEqual(wrong.status_code, 403)
+        check_database.assert_not_called()
+
+    @override_settings(HEALTH_CHECKS={'DEEP_TOKEN': 'probe-token'}, CACHES={})
+    def test_deep_check_with_token(self):
+        with patch.object(health, '_check_database'):
+            response = self.middleware(RequestFactory().get('/health/deep/', HTTP_AUTHORIZATION='Bearer probe-token'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_other_paths_go_through(self):
+        middleware = HealthCheckMiddleware(lambda request: 'response')
+
+        self.assertEqual(middleware(RequestFactory().get('/api/v1/core/sessions/')), 'response')
@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from applications.core.controllers.filters import (INDEXED_FIELDS, IndexedOrderingFilter, indexed_fields,
+                                                  indexed_filterset_fields)
+from applications.tenants.models import User
+
+
+class IndexedFiltersTests(SimpleTestCase):
+    def test_indexed_fields_only_indexed_columns(self):
+        fields = indexed_fields(User)
+
+        self.assertIn('id', fields)
+        self.assertIn('username', fields)
+        self.assertIn('tenant', fields)
+        self.assertNotIn('first_name', fields)
+
+    def test_indexed_filterset_fields_range_lookups(self):
+        fields = indexed_filterset_fields(User)
+
+        self.assertEqual(fields['id'], ['exact', 'in', 'lt', 'lte', 'gt', 'gte'])
+        self.assertEqual(fields['tenant'], ['exact', 'in'])
+
+
+class IndexedOrderingFilterTests(SimpleTestCase):
+    def valid_fields(self, **view_attributes):
+        view = type('View', (), view_attributes)()
+        return [name for name, _ in IndexedOrderingFilter().get_valid_fields(User.objects.none(), view)]
+
+    def test_defaults_to_indexed_fields(self):
+        self.assertEqual(self.valid_fields(), list(indexed_fields(User)))
+        self.assertEqual(self.valid_fields(ordering_fields=INDEXED_FIELDS), list(indexed_fields(User)))
+        self.assertNotIn('first_name', self.valid_fields())
+
+    def test_explicit_ordering_fields_win(self):
+        self.assertEqual(self.valid_fields(ordering_fields=['first_name']), ['first_name'])
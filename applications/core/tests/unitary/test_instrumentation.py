@@ -0,0 +1,83 @@
+import sys
+
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from applications.core.serializers.timing import timed_serializer
+from applications.core.services.request_metrics import RequestMetrics
+from applications.core.services.request_timing import (get_request_timings, measure, server_timing_header,
+                                                       start_request_timings, stop_request_timings)
+from applications.core.services.sampling_profiler import fold_stack
+from applications.core.services.timing_stats import TimingStats
+
+
+class NameSerializer(serializers.Serializer):
+    name = serializers.CharField()
+
+
+class InstrumentationTests(SimpleTestCase):
+    def test_measure_adds_to_current_request(self):
+        timings, token = start_request_timings()
+        try:
+            with measure('auth'):
+                pass
+            with measure('auth'):
+                pass
+        finally:
+            stop_request_timings(token)
+
+        self.assertEqual(list(timings.phases), ['auth'])
+        self.assertIsNone(get_request_timings())
+
+    def test_measure_outside_requests_is_a_no_op(self):
+        with measure('auth'):
+            pass
+
+        self.assertIsNone(get_request_timings())
+
+    def test_server_timing_header(self):
+        header = server_timing_header({'tenant': 0.0005, 'db': 0.0032}, 0.012, 7)
+
+        self.assertEqual(header, 'tenant;dur=0.50, db;dur=3.20;desc="7 queries", total;dur=12.00')
+
+    def test_prometheus_histogram_is_cumulative(self):
+        metrics = RequestMetrics(buckets=(0.1, 1))
+        metrics.observe('users-list', 'GET', 200, 'tenant_1', 0.05, {'db': 0.01}, 3)
+        metrics.observe('users-list', 'GET', 200, 'tenant_1', 0.5, {'db': 0.02}, 4)
+
+        text = metrics.render()
+
+        labels = 'view="users-list",method="GET",schema="tenant_1"'
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 1', text)
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="1"}} 2', text)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 2', text)
+        self.assertIn(f'http_requests_total{{{labels},status="200"}} 2', text)
+        self.assertIn(f'db_queries_total{{{labels}}} 7', text)
+
+    def test_timing_stats_rendered_for_prometheus(self):
+        stats = TimingStats()
+        stats.record('core.Account.validation', 0.25)
+        stats.record('core.Account.validation', 0.5)
+
+        text = stats.render()
+
+        self.assertIn('model_operation_seconds_total{model="core.Account",operation="validation"} 0.75', text)
+        self.assertIn('model_operations_total{model="core.Account",operation="validation"} 2', text)
+
+    def test_fold_stack_outermost_first(self):
+        folded = fold_stack(sys._getframe())
+
+        self.assertTrue(folded.split(';')[-1].startswith('test_fold_stack_outermost_first (test_instrumentation.py:'))
+
+    def test_timed_serializer_keeps_name_and_output(self):
+        serializer_class = timed_serializer(NameSerializer)
+        timings, token = start_request_timings()
+        try:
+            data = serializer_class({'name': 'ana'}).data
+        finally:
+            stop_request_timings(token)
+
+        self.assertEqual(serializer_class.__name__, 'NameSerializer')
+        self.assertEqual(data, {'name': 'ana'})
+        self.assertIn('serialize', timings.phases)
+        self.assertIs(timed_serializer(NameSerializer), serializer_class)
@@ -0,0 +1,49 @@
+import io
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from applications.core.controllers.mixins import ImportActionsMixin
+from applications.core.jobs import csv_import_job
+from applications.tenants.services.jobs import _handlers, enqueue, get_jobs_options, job_handler
+
+
+class UserImportController(ImportActionsMixin):
+    import_columns = {'Usuario': 'username', 'Alta': 'date_joined'}
+
+
+class JobsTests(SimpleTestCase):
+    def tearDown(self):
+        _handlers.pop('tests.noop', None)
+
+    def test_job_handler_registers_by_name(self):
+        @job_handler('tests.noop')
+        def noop(job):
+            return None
+
+        self.assertIs(_handlers['tests.noop'], noop)
+
+    def test_enqueue_unknown_job(self):
+        with self.assertRaisesMessage(ValueError, 'Unknown job "tests.missing"'):
+            enqueue('tests.missing')
+
+    @override_settings(JOBS={'MAX_CONCURRENT_PER_TENANT': 5})
+    def test_options_default_what_is_not_set(self):
+        options = get_jobs_options()
+
+        self.assertEqual(options['MAX_CONCURRENT_PER_TENANT'], 5)
+        self.assertEqual(options['MAX_ATTEMPTS'], 3)
+
+
+class CsvImportJobTests(SimpleTestCase):
+    def test_import_errors_fail_the_job(self):
+        job = mock.Mock(payload={'controller': f'{__name__}.UserImportController', 'model': 'tenants.User',
+                                 'path': 'imports/users.csv'})
+
+        with mock.patch('applications.core.jobs.default_storage') as storage, \
+                mock.patch('applications.core.jobs.report_progress'):
+            storage.open.return_value = io.BytesIO(b'Usuario\nana\n')
+            with self.assertRaisesMessage(ValueError, 'Missing columns: Alta'):
+                csv_import_job(job)
+
+        storage.delete.assert_called_once_with('imports/users.csv')
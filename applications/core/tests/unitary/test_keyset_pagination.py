@@ -0,0 +1,47 @@
+import json
+from base64 import urlsafe_b64decode
+from datetime import datetime, timezone
+
+from django.db.models import Q
+from django.test import SimpleTestCase
+
+from applications.core.controllers.paginations import KeysetPagination
+
+
+class KeysetPaginationTests(SimpleTestCase):
+    def setUp(self):
+        self.pagination = KeysetPagination()
+        self.pagination.ordering = ['-month__starting_date', '-id']
+
+    def test_seek_condition_forward(self):
+        condition = self.pagination._seek_condition(['2024-01-01', 7], reverse=False)
+
+        expected = Q(month__starting_date__lt='2024-01-01') | (Q(month__starting_date='2024-01-01') & Q(id__lt=7))
+        self.assertEqual(condition, expected)
+
+    def test_seek_condition_backwards(self):
+        condition = self.pagination._seek_condition(['2024-01-01', 7], reverse=True)
+
+        expected = Q(month__starting_date__gt='2024-01-01') | (Q(month__starting_date='2024-01-01') & Q(id__gt=7))
+        self.assertEqual(condition, expected)
+
+    def test_finish_page_detects_next_page(self):
+        self.pagination.page_size = 2
+        self.pagination.has_cursor = False
+
+        page = self.pagination._finish_page([1, 2, 3], reverse=False)
+
+        self.assertEqual(page, [1, 2])
+        self.assertTrue(self.pagination.has_next)
+        self.assertFalse(self.pagination.has_previous)
+
+    def test_cursor_keeps_microseconds(self):
+        first = datetime(2024, 5, 1, 12, 30, 0, 123401, tzinfo=timezone.utc)
+        second = first.replace(microsecond=123999)
+
+        values = [json.loads(urlsafe_b64decode(KeysetPagination._encode_cursor([moment, 7], False)))['v'][0]
+                  for moment in (first, second)]
+
+        self.assertEqual(values, ['2024-05-01T12:30:00.123401+00:00', '2024-05-01T12:30:00.123999+00:00'])
+        self.assertEqual(self.pagination._seek_condition([values[0], 7], reverse=False),
+                         Q(month__starting_date__lt=values[0]) | (Q(month__starting_date=values[0]) & Q(id__lt=7)))
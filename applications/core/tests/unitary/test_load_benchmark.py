@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from applications.core.services.load_benchmark import (DEFAULT_SCENARIOS, Sample, _fill, build_schedule, compare,
+                                                       is_regression, parse_query_count, percentile, run_load,
+                                                       summarize)
+
+
+class EchoStub(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.paths.append((self.path, self.headers.get('Authorization')))
+        self.send_response(404 if self.path == '/missing/' else 200)
+        self.send_header('Server-Timing', 'tenant;dur=0.10, db;dur=1.20;desc="3 queries", total;dur=2.00')
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+class LoadBenchmarkTests(SimpleTestCase):
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+
+        self.assertEqual([percentile(values, 0.5), percentile(values, 0.95), percentile(values, 0.99)], [50, 95, 99])
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_parse_query_count(self):
+        self.assertEqual(parse_query_count('db;dur=3.20;desc="7 queries", total;dur=12.00'), 7)
+        self.assertIsNone(parse_query_count('total;dur=12.00'))
+        self.assertIsNone(parse_query_count(None))
+
+    def test_default_scenarios_filled_from_provisioned_user(self):
+        user = {'token': 'access', 'refresh_token': 'refresh', 'username': 'bench_0-user', 'password': 'secret',
+                'schema_name': 'bench_0', 'job_id': 3}
+
+        filled = {scenario['name']: (_fill(scenario['path'], user), _fill(scenario.get('body'), user))
+                  for scenario in DEFAULT_SCENARIOS}
+
+        self.assertEqual(filled['token refresh'],
+                         ('/api/v1/tenants/auth/google/refresh/', {'refresh_token': 'refresh'}))
+        self.assertEqual(filled['job status'][0], '/api/v1/tenants/jobs/3/')
+
+    def test_schedule_interleaves_scenarios_by_weight(self):
+        scenarios = [{'name': 'list', 'weight': 2}, {'name': 'login'}]
+
+        schedule = build_schedule(scenarios, ['ana', 'bob'], 5)
+
+        self.assertEqual([(scenario['name'], user) for scenario, user in schedule],
+                         [('list', 'ana'), ('list', 'bob'), ('login', 'ana'), ('list', 'bob'), ('list', 'ana')])
+
+    def test_summarize(self):
+        samples = [Sample('list', 200, 0.010, 3), Sample('list', 500, 0.030, 5), Sample('login', 200, 0.100, None)]
+
+        summary = summarize(samples, wall_seconds=0.5)
+
+        self.assertEqual(summary['list'], {'requests': 2, 'errors': 1, 'p50_ms': 10.0, 'p95_ms': 30.0, 'p99_ms': 30.0,
+                                           'throughput_rps': 4.0, 'queries_per_request': 4.0})
+        self.assertEqual(summary['all']['requests'], 3)
+        self.assertIsNone(summary['login']['queries_per_request'])
+
+    def test_compare_and_regressions(self):
+        baseline = {'all': {'p95_ms': 20.0, 'throughput_rps': 100.0, 'queries_per_request': None}}
+        current = {'all': {'p95_ms': 25.0, 'throughput_rps': 95.0, 'queries_per_request': 3.0}}
+
+        changes = compare(current, baseline)
+
+        self.assertEqual(changes, [('all', 'p95_ms', 20.0, 25.0, 25.0), ('all', 'throughput_rps', 100.0, 95.0, -5.0)])
+        self.assertTrue(is_regression('p95_ms', 25.0, tolerance_percent=10))
+        self.assertFalse(is_regression('throughput_rps', -5.0, tolerance_percent=10))
+
+    def test_run_load_against_stub_server(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), EchoStub)
+        server.paths = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        scenarios = [{'name': 'job', 'path': '/jobs/{job_id}/'},
+                     {'name': 'missing', 'path': '/missing/', 'auth': False}]
+        users = [{'token': 'a', 'job_id': 1}, {'token': 'b', 'job_id': 2}]
+
+        samples, wall_seconds = run_load(f'http://127.0.0.1:{server.server_port}', scenarios, users,
+                                         total_requests=8, concurrency=3, warmup=2)
+
+        self.assertEqual(len(samples), 8)
+        self.assertEqual(len(server.paths), 10)
+        self.assertIn(('/jobs/1/', 'Bearer a'), server.paths)
+        self.assertIn(('/missing/', None), server.paths)
+        summary = summarize(samples, wall_seconds)
+        self.assertEqual(summary['missing']['errors'], 4)
+        self.assertEqual(summary['job']['queries_per_request'], 3.0)
+        json.dumps(summary)
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+from applications.tenants.management.commands import migrate_tenants
+from applications.tenants.management.commands.migrate_tenants import Command, _migrate_schema
+
+
+@mock.patch.object(migrate_tenants, '_close_connections')
+@mock.patch.object(migrate_tenants, 'call_command')
+@mock.patch.object(migrate_tenants, 'MigrationExecutor')
+@mock.patch.object(migrate_tenants, 'connection')
+class MigrateSchemaTests(SimpleTestCase):
+    def test_up_to_date_schema_skipped(self, connection, executor, call_command, _):
+        executor.return_value.migration_plan.return_value = []
+
+        result = _migrate_schema('acme')
+
+        self.assertEqual(result[:2], ('acme', 'up to date'))
+        connection.set_schema.assert_called_once_with('acme', include_public=False)
+        call_command.assert_not_called()
+
+    def test_pending_migrations_applied(self, connection, executor, call_command, _):
+        executor.return_value.migration_plan.return_value = [('migration', False)]
+
+        result = _migrate_schema('acme')
+
+        self.assertEqual(result[:2], ('acme', 'migrated'))
+        call_command.assert_called_once_with('migrate_schemas', schema_name='acme', interactive=False, verbosity=0)
+
+    def test_failure_reported_instead_of_raised(self, connection, executor, call_command, close_connections):
+        executor.side_effect = RuntimeError('boom')
+
+        result = _migrate_schema('acme')
+
+        self.assertEqual((result[0], result[1], result[3]), ('acme', 'failed', 'boom'))
+        close_connections.assert_called_once_with()
+
+
+@mock.patch.object(migrate_tenants, '_close_connections')
+@mock.patch.object(migrate_tenants, 'ProcessPoolExecutor', ThreadPoolExecutor)
+class MigrateConcurrentlyTests(SimpleTestCase):
+    def test_every_schema_migrated_and_failures_raise(self, _):
+        outcomes = {'big': 'migrated', 'medium': 'up to date', 'small': 'failed'}
+        command = Command(stdout=mock.Mock(), stderr=mock.Mock())
+
+        with mock.patch.object(migrate_tenants, '_migrate_schema',
+                               side_effect=lambda schema_name: (schema_name, outcomes[schema_name], 0.1,
+                                                                'boom' if outcomes[schema_name] == 'failed' else None)):
+            results = command._migrate_concurrently(['big', 'medium', 'small'], processes=2)
+
+        self.assertEqual({schema_name: status for schema_name, status, _, _ in results}, outcomes)
+        with self.assertRaisesMessage(CommandError, 'Migrations failed for: small'):
+            command._report(results, total_duration=0.3)
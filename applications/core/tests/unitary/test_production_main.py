@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+import production_main
+
+
+class GunicornCommandTests(SimpleTestCase):
+    def test_auto_worker_count_limited_by_memory(self):
+        workers = production_main._auto_worker_count(cpu_count=8, memory_mb=512, worker_memory_mb=256, threads=1)
+
+        self.assertEqual(workers, 2)
+
+    def test_auto_worker_count_by_cpu(self):
+        workers = production_main._auto_worker_count(cpu_count=2, memory_mb=None, worker_memory_mb=256, threads=1)
+
+        self.assertEqual(workers, 5)
+
+    @mock.patch('production_main._memory_mb', return_value=None)
+    @mock.patch('production_main._cpu_count', return_value=2)
+    def test_build_gunicorn_command_uvicorn(self, *_):
+        command = production_main._build_gunicorn_command({'SERVER_MODEL': 'uvicorn'})
+
+        self.assertIn('config.asgi:application', command)
+        self.assertIn('uvicorn.workers.UvicornWorker', command)
+        self.assertIn('--preload', command)
+        self.assertNotIn('--threads', command)
+
+    def test_build_gunicorn_command_unknown_model(self):
+        with self.assertRaises(ValueError):
+            production_main._build_gunicorn_command({'SERVER_MODEL': 'eventlet'})
+
+
+@mock.patch('production_main.load_dotenv')
+@mock.patch('production_main.django.setup')
+@mock.patch('production_main._start_web')
+@mock.patch('production_main._release')
+class MainTests(SimpleTestCase):
+    def test_release_argument_runs_release_only(self, release, start_web, *_):
+        production_main.main(['release'])
+
+        release.assert_called_once_with()
+        start_web.assert_not_called()
+
+    def test_no_argument_starts_web(self, release, start_web, *_):
+        production_main.main([])
+
+        start_web.assert_called_once_with()
+        release.assert_not_called()
+
+
+@mock.patch('production_main._execute_run_command')
+@mock.patch('production_main._collect_static_if_changed')
+@mock.patch('production_main._release')
+class StartWebTests(SimpleTestCase):
+    @mock.patch('production_main._migrations_applied', return_value=True)
+    def test_migrated_database_boots_without_release(self, _, release, collect_static, run_command):
+        production_main._start_web()
+
+        release.assert_not_called()
+        collect_static.assert_called_once_with()
+        run_command.assert_called_once_with()
+
+    @mock.patch('production_main._migrations_applied', return_value=False)
+    def test_pending_migrations_run_release_on_boot(self, _, release, collect_static, run_command):
+        with mock.patch.dict('os.environ', {'MIGRATE_ON_BOOT': 'True'}):
+            production_main._start_web()
+
+        release.assert_called_once_with()
+        run_command.assert_called_once_with()
+
+    @mock.patch('production_main._migrations_applied', return_value=False)
+    def test_pending_migrations_refused_without_migrate_on_boot(self, _, release, collect_static, run_command):
+        with mock.patch.dict('os.environ', {'MIGRATE_ON_BOOT': 'False'}), self.assertRaises(SystemExit):
+            production_main._start_web()
+
+        release.assert_not_called()
+        run_command.assert_not_called()
+
+
+@mock.patch('production_main._migrations_hash', return_value='abc')
+@mock.patch('production_main.MigrationExecutor')
+@mock.patch('production_main.cache')
+class MigrationsAppliedTests(SimpleTestCase):
+    def test_remembered_hash_skips_the_plan(self, cache, executor, _):
+        cache.get.return_value = True
+
+        self.assertTrue(production_main._migrations_applied())
+        executor.assert_not_called()
+
+    def test_pending_plan_not_remembered(self, cache, executor, _):
+        cache.get.return_value = None
+        executor.return_value.migration_plan.return_value = [('migration', False)]
+
+        self.assertFalse(production_main._migrations_applied())
+        cache.set.assert_not_called()
+
+    def test_empty_plan_remembered(self, cache, executor, _):
+        cache.get.return_value = None
+        executor.return_value.migration_plan.return_value = []
+
+        self.assertTrue(production_main._migrations_applied())
+        cache.set.assert_called_once_with('release:migrations-applied:abc', True, None)
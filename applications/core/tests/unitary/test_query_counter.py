@@ -0,0 +1,36 @@
+import asyncio
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase
+
+from applications.core.services.query_budget import QueryCounter, count_context_queries, install_context_query_counter
+
+
+class QueryCounterTests(SimpleTestCase):
+    def test_counts_and_detects_repeated_statements(self):
+        counter = QueryCounter()
+        execute = lambda sql, params, many, context: None
+        for account_id in range(5):
+            counter(execute, 'SELECT * FROM account WHERE id = %s', [account_id], False, {})
+            counter(execute, 'SET search_path = tenant1', None, False, {})
+        counter(execute, 'SELECT * FROM month', None, False, {})
+
+        self.assertEqual(counter.count, 11)
+        self.assertEqual(counter.repeated_statements(5), {'SELECT * FROM account WHERE id = %s': 5})
+
+    def test_context_counter_sees_queries_of_sync_to_async_threads(self):
+        connection = SimpleNamespace(execute_wrappers=[])
+        install_context_query_counter(connection)
+        install_context_query_counter(connection)
+        wrapper, = connection.execute_wrappers
+        execute = lambda sql, params, many, context: None
+
+        async def view():
+            await sync_to_async(wrapper)(execute, 'SELECT 1', None, False, {})
+
+        with count_context_queries(QueryCounter()) as counter:
+            asyncio.run(view())
+        wrapper(execute, 'SELECT 2', None, False, {})
+
+        self.assertEqual(counter.count, 1)
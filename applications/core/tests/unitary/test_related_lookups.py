@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+from rest_framework import serializers
+
+from applications.core.controllers.mixins import ReadableWritableModelController
+from applications.tenants.models import Tenant, User
+
+
+class TenantReadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tenant
+        fields = ['id', 'schema_name']
+
+
+class UserWithTenantSerializer(serializers.ModelSerializer):
+    tenant = TenantReadSerializer()
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'tenant']
+
+
+class UserSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username']
+
+
+class RelatedLookupsTests(SimpleTestCase):
+    def test_lookups_cached_per_controller_class(self):
+        class UsersController(ReadableWritableModelController):
+            readable_serializer = UserWithTenantSerializer
+
+        class PlainUsersController(UsersController):
+            readable_serializer = UserSerializer
+
+        self.assertEqual(UsersController().get_related_lookups(), (['tenant'], []))
+        self.assertEqual(PlainUsersController().get_related_lookups(), ([], []))
+        self.assertEqual(UsersController().get_related_lookups(), (['tenant'], []))
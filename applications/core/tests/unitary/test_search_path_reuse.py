@@ -0,0 +1,77 @@
+import copy
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django_tenants.postgresql_backend.base import DatabaseWrapper as TenantDatabaseWrapper
+
+from applications.tenants.context import _current_tenant
+from applications.tenants.postgresql_backend.base import DatabaseWrapper
+
+
+class _RawConnection:
+    """Stands in for a pooled psycopg connection: identity is what the backend keys the applied path on."""
+
+    def rollback(self):
+        pass
+
+
+class SearchPathReuseTests(SimpleTestCase):
+    def setUp(self):
+        self.token = _current_tenant.set(None)
+        self.search_path_sets = []
+        patcher = mock.patch.object(TenantDatabaseWrapper, '_cursor', autospec=True, side_effect=self._parent_cursor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(_current_tenant.reset, self.token)
+
+    def _parent_cursor(self, wrapper, name=None):
+        # What django-tenants does with TENANT_LIMIT_SET_CALLS: SET only when the wrapper has no path recorded.
+        if not wrapper.search_path_set_schemas:
+            wrapper.search_path_set_schemas = wrapper._get_cursor_search_paths()
+            self.search_path_sets.append(wrapper.search_path_set_schemas)
+        return mock.Mock()
+
+    @staticmethod
+    def _wrapper(raw_connection, schema_name):
+        wrapper = DatabaseWrapper(copy.deepcopy(connection.settings_dict), alias='search_path_tests')
+        wrapper.connection = raw_connection
+        wrapper.ensure_connection = lambda: None
+        wrapper.set_schema(schema_name)
+        return wrapper
+
+    def test_pooled_connection_keeps_its_search_path(self):
+        raw_connection = _RawConnection()
+
+        self._wrapper(raw_connection, 'acme')._cursor()
+        self._wrapper(raw_connection, 'acme')._cursor()
+
+        self.assertEqual(self.search_path_sets, [['acme', 'public']])
+
+    def test_tenant_change_sets_search_path(self):
+        raw_connection = _RawConnection()
+
+        self._wrapper(raw_connection, 'acme')._cursor()
+        self._wrapper(raw_connection, 'globex')._cursor()
+
+        self.assertEqual(self.search_path_sets, [['acme', 'public'], ['globex', 'public']])
+
+    def test_rollback_forgets_search_path(self):
+        raw_connection = _RawConnection()
+        wrapper = self._wrapper(raw_connection, 'acme')
+        wrapper._cursor()
+
+        wrapper._rollback()
+        wrapper._cursor()
+
+        self.assertEqual(len(self.search_path_sets), 2)
+
+    def test_search_path_set_in_atomic_block_not_trusted_later(self):
+        raw_connection = _RawConnection()
+        wrapper = self._wrapper(raw_connection, 'acme')
+        wrapper.in_atomic_block = True
+        wrapper._cursor()
+
+        self._wrapper(raw_connection, 'acme')._cursor()
+
+        self.assertEqual(len(self.search_path_sets), 2)
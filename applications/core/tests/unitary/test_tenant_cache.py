@@ -0,0 +1,44 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from applications.core.services.tenant_cache import TenantCache
+
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l2'},
+                 'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'l1'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch('applications.core.services.tenant_cache.get_current_schema_name', return_value='tenant1')
+class TenantCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TenantCache()
+        self.cache.l1.clear()
+        self.cache.l2.clear()
+
+    def test_make_key_namespaced_by_schema(self, _):
+        self.assertEqual(self.cache.make_key('accounts', 'list'), 'tenant1:accounts:list')
+
+    def test_get_or_set_computes_once(self, _):
+        compute = mock.Mock(return_value=[1, 2])
+
+        self.cache.get_or_set('accounts', 'list', compute)
+        result = self.cache.get_or_set('accounts', 'list', compute)
+
+        self.assertEqual(result, [1, 2])
+        compute.assert_called_once()
+
+    def test_stats_counts_per_namespace(self, _):
+        self.cache.get('accounts', 'list')
+        self.cache.set('accounts', 'list', 1)
+        self.cache.get('accounts', 'list')
+        self.cache.l1.clear()
+        self.cache.get('accounts', 'list')
+
+        self.assertEqual(self.cache.stats(), {'accounts': {'misses': 1, 'l1_hits': 1, 'l2_hits': 1}})
+
+    def test_schemas_do_not_share_entries(self, get_current_schema_name):
+        self.cache.set('accounts', 'list', 1)
+        get_current_schema_name.return_value = 'tenant2'
+
+        self.assertIsNone(self.cache.get('accounts', 'list'))
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from applications.tenants.models import Tenant
+from applications.tenants.services import tenant_provisioning
+from applications.tenants.services.tenant_provisioning import (CLONE_MODE, MIGRATE_MODE, create_tenant_schema,
+                                                                get_provisioning_mode, provision_tenants)
+
+
+class ProvisioningModeTests(SimpleTestCase):
+    @override_settings(TENANT_CREATION_FAKES_MIGRATIONS=True, TENANT_BASE_SCHEMA='tenant_template')
+    def test_clone_when_creation_fakes_migrations(self):
+        self.assertEqual(get_provisioning_mode(), CLONE_MODE)
+
+    @override_settings(TENANT_CREATION_FAKES_MIGRATIONS=False)
+    def test_migrate_otherwise(self):
+        self.assertEqual(get_provisioning_mode(), MIGRATE_MODE)
+
+
+@override_settings(TENANT_CREATION_FAKES_MIGRATIONS=True, TENANT_BASE_SCHEMA='tenant_template')
+@mock.patch.object(tenant_provisioning, 'build_template_schema')
+class CreateTenantSchemaTests(SimpleTestCase):
+    def test_missing_template_built_before_cloning(self, build_template_schema):
+        tenant = mock.Mock(schema_name='acme')
+
+        with mock.patch.object(tenant_provisioning, 'schema_exists', return_value=False):
+            create_tenant_schema(tenant, verbosity=0)
+
+        build_template_schema.assert_called_once_with()
+        tenant.create_schema.assert_called_once_with(check_if_exists=True, verbosity=0)
+
+    def test_existing_template_reused(self, build_template_schema):
+        tenant = mock.Mock(schema_name='acme')
+
+        with mock.patch.object(tenant_provisioning, 'schema_exists', return_value=True):
+            create_tenant_schema(tenant, verbosity=0)
+
+        build_template_schema.assert_not_called()
+        tenant.create_schema.assert_called_once_with(check_if_exists=True, verbosity=0)
+
+
+@mock.patch.object(tenant_provisioning, 'transaction')
+@mock.patch.object(tenant_provisioning, 'create_tenant_schema', return_value=0.5)
+class ProvisionTenantsTests(SimpleTestCase):
+    def test_repeated_schema_names_provisioned_once(self, create_tenant_schema, _):
+        objects = mock.Mock()
+        objects.filter.return_value = []
+        objects.bulk_create.side_effect = lambda tenants: tenants
+
+        with mock.patch.object(Tenant, 'objects', objects):
+            tenants, durations = provision_tenants(['acme', 'globex', 'acme'])
+
+        self.assertEqual([tenant.schema_name for tenant in tenants], ['acme', 'globex'])
+        self.assertEqual(durations, {'acme': 0.5, 'globex': 0.5})
+        self.assertEqual(create_tenant_schema.call_count, 2)
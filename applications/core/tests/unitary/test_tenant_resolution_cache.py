@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from applications.tenants.middlewares import UserTenantMiddleware
+from applications.tenants.services.tenant_resolution_cache import TenantResolution, TenantResolutionCache
+
+
+class TenantResolutionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TenantResolutionCache(ttl=60, max_size=2)
+        self.resolution = TenantResolution(tenant_id=1, schema_name='tenant1')
+
+    def test_get_ok(self):
+        self.cache.set(10, self.resolution)
+
+        self.assertEqual(self.cache.get(10), self.resolution)
+
+    def test_get_expired_returns_none(self):
+        with mock.patch('time.monotonic', return_value=0):
+            self.cache.set(10, self.resolution)
+        with mock.patch('time.monotonic', return_value=61):
+            self.assertIsNone(self.cache.get(10))
+
+    def test_set_evicts_least_recently_used(self):
+        self.cache.set(10, self.resolution)
+        self.cache.set(11, self.resolution)
+        self.cache.get(10)
+
+        self.cache.set(12, self.resolution)
+
+        self.assertIsNone(self.cache.get(11))
+        self.assertEqual(self.cache.get(10), self.resolution)
+
+    def test_delete_tenant_ok(self):
+        self.cache.set(10, self.resolution)
+        self.cache.set(11, TenantResolution(tenant_id=2, schema_name='tenant2'))
+
+        self.cache.delete_tenant(1)
+
+        self.assertIsNone(self.cache.get(10))
+        self.assertIsNotNone(self.cache.get(11))
+
+
+class ClaimsResolutionTests(SimpleTestCase):
+    def setUp(self):
+        self.middleware = UserTenantMiddleware(lambda request: None)
+        self.token = {'user_id': 10, 'tenant_id': 1, 'schema_name': 'tenant1'}
+
+    def resolve(self, cache):
+        with mock.patch.object(UserTenantMiddleware, '_get_validated_token', return_value=self.token), \
+                mock.patch('applications.tenants.middlewares.get_tenant_resolution_cache', return_value=cache):
+            return self.middleware._resolve_tenant_without_queries(request=None)
+
+    def test_claims_are_trusted_with_a_shared_cache(self):
+        cache = TenantResolutionCache(shared_cache_alias='default')
+
+        with mock.patch.object(cache, '_get_shared', return_value=None):
+            user_id, resolution = self.resolve(cache)
+
+        self.assertEqual((user_id, resolution), (10, TenantResolution(tenant_id=1, schema_name='tenant1')))
+
+    def test_claims_are_ignored_without_a_shared_cache(self):
+        user_id, resolution = self.resolve(TenantResolutionCache())
+
+        self.assertEqual((user_id, resolution), (10, None))
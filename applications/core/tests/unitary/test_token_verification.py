@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from applications.core.services import token_verification
+from applications.core.services.token_verification import VerifiedTokenCache, validate_request_token
+
+
+class VerifiedTokenCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = VerifiedTokenCache(max_size=2, max_ttl=60)
+
+    def test_get_ok(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.set(b'raw', {'exp': 2000})
+
+            self.assertEqual(self.cache.get(b'raw'), {'exp': 2000})
+
+    def test_entry_expires_with_the_token(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.set(b'raw', {'exp': 1010})
+        with mock.patch('time.time', return_value=1010):
+            self.assertIsNone(self.cache.get(b'raw'))
+
+    def test_entry_lives_at_most_max_ttl(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.set(b'raw', {'exp': 5000})
+        with mock.patch('time.time', return_value=1060):
+            self.assertIsNone(self.cache.get(b'raw'))
+
+    def test_expired_token_is_not_stored(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.set(b'raw', {'exp': 900})
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_set_evicts_least_recently_used(self):
+        with mock.patch('time.time', return_value=1000):
+            self.cache.set(b'a', {'exp': 2000})
+            self.cache.set(b'b', {'exp': 2000})
+            self.cache.get(b'a')
+            self.cache.set(b'c', {'exp': 2000})
+
+            self.assertIsNone(self.cache.get(b'b'))
+            self.assertIsNotNone(self.cache.get(b'a'))
+
+
+class ValidateRequestTokenTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(token_verification, '_cache', VerifiedTokenCache(max_size=10, max_ttl=60))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.http_request = SimpleNamespace()
+        self.drf_request = SimpleNamespace(_request=self.http_request)
+
+    def test_middleware_and_drf_share_one_validation(self):
+        validate = mock.Mock(return_value={'user_id': 1})
+
+        validate_request_token(self.http_request, b'raw', validate)
+        token = validate_request_token(self.drf_request, b'raw', validate)
+
+        self.assertEqual(token, {'user_id': 1})
+        validate.assert_called_once_with(b'raw')
+
+    def test_valid_token_is_reused_by_later_requests(self):
+        validate = mock.Mock(return_value={'user_id': 1})
+
+        validate_request_token(self.http_request, b'raw', validate)
+        validate_request_token(SimpleNamespace(), b'raw', validate)
+
+        validate.assert_called_once_with(b'raw')
+
+    def test_invalid_token_raises_for_every_caller(self):
+        validate = mock.Mock(side_effect=InvalidToken('expired'))
+
+        with self.assertRaises(InvalidToken):
+            validate_request_token(self.http_request, b'raw', validate)
+        with self.assertRaises(InvalidToken):
+            validate_request_token(self.drf_request, b'raw', validate)
+        validate.assert_called_once_with(b'raw')
@@ -1,4 +1,9 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from applications.core.controllers.metrics import (DatabasePoolMetricsController, PrometheusMetricsController,
+                                                   TenantCacheMetricsController)
 
 router = DefaultRouter()
 # TODO: complete
@@ -6,4 +11,7 @@ urlpatterns = router.urls
 
 urlpatterns += [
     path('sessions/', TokenObtainPairView.as_view(), name='sessions'),
+    path('metrics/db-pool/', DatabasePoolMetricsController.as_view(), name='db-pool-metrics'),
+    path('metrics/cache/', TenantCacheMetricsController.as_view(), name='cache-metrics'),
+    path('metrics/prometheus/', PrometheusMetricsController.as_view(), name='prometheus-metrics'),
 ]
@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django_tenants.admin import TenantAdminMixin
 
-from applications.tenants.models import Tenant, User
+from applications.tenants.models import Job, Tenant, User
 
 
 @admin.register(Tenant)
@@ -22,3 +22,9 @@ class UserAdmin(BaseUserAdmin):
     )
     list_display = BaseUserAdmin.list_display + ('tenant', 'birthdate', 'life_expectancy', 'age')
     list_filter = BaseUserAdmin.list_filter + ('tenant',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'tenant', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
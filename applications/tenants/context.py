@@ -0,0 +1,25 @@
+from contextvars import ContextVar
+
+from django.db import connection
+
+_current_tenant = ContextVar('current_tenant', default=None)
+
+
+def activate_tenant(tenant):
+    """
+    Makes ``tenant`` the schema of the current task or thread. The database backend re-applies it to the connection of
+    any thread that queries on the task's behalf (``sync_to_async`` executors, streaming response iterators).
+    """
+    _current_tenant.set(tenant)
+    connection.set_tenant(tenant)
+
+
+def get_current_tenant():
+    return _current_tenant.get()
+
+
+def get_current_schema_name():
+    tenant = _current_tenant.get()
+    if tenant is not None:
+        return tenant.schema_name
+    return connection.schema_name
@@ -5,21 +5,32 @@ from django.contrib.auth import get_user_model
 from django.shortcuts import redirect
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.mixins import RetrieveModelMixin
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from rest_framework.viewsets import ViewSet
+from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet, ViewSet
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from applications.tenants.services.google_auth_service import GoogleAuth
+from applications.core.controllers.mixins import AsyncActionsMixin
+from applications.tenants.jobs import PROVISION_TENANTS_JOB
+from applications.tenants.models import Job
+from applications.tenants.serializers import JobSerializer
+from applications.tenants.services.google_auth_service import get_google_auth
+from applications.tenants.services.jobs import enqueue
+from applications.tenants.services.tenant_provisioning import validate_schema_names
+from applications.tenants.tokens import TenantRefreshToken
 
 
-class GoogleAuthController(ViewSet):
+class GoogleAuthController(AsyncActionsMixin, ViewSet):
     authentication_classes = []
     permission_classes = []
+    async_actions = ('callback',)
+
+    @property
+    def google_auth(self):
+        return get_google_auth()
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        self.google_auth = GoogleAuth()
-    
     @action(detail=False, methods=['get'], url_path='login')
     def login(self, _):
         """Generate Google OAuth authorization URL"""
@@ -31,55 +42,66 @@ class GoogleAuthController(ViewSet):
     def callback(self, request):
         code = request.GET.get('code')
         if not code:
-            # Check if this is an API request (has Accept: application/json header)
-            if request.headers.get('Accept') == 'application/json':
-                return Response({'error': 'Authorization code not provided'}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Redirect to frontend with error (for browser OAuth flow)
-                error_params = urlencode({'error': 'Authorization code not provided'})
-                return redirect(f'/?{error_params}')
-        
-        redirect_uri = settings.OAUTH_REDIRECT_URL
-        
+            return self._error_response(request, 'Authorization code not provided', status.HTTP_400_BAD_REQUEST)
         try:
-            user_info = self.google_auth.get_user_info(code, redirect_uri)
+            user_info = self.google_auth.get_user_info(code, settings.OAUTH_REDIRECT_URL)
             email = user_info['email']
-            
             User = get_user_model()
             try:
-                user = User.objects.get(email=email)
+                user = User.objects.select_related('tenant').get(email=email)
             except User.DoesNotExist:
-                error_message = f"User with email {email} is not authorized. Please contact your administrator."
-                if request.headers.get('Accept') == 'application/json':
-                    return Response({'error': error_message}, status=status.HTTP_403_FORBIDDEN)
-                else:
-                    error_params = urlencode({'error': error_message})
-                    return redirect(f'/?{error_params}')
-            
-            # Create Simple JWT tokens
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
-            refresh_token = str(refresh)
-            # Redirect to frontend with success data (for browser OAuth flow)
-            success_params = urlencode({
-                'access_token': access_token,
-                'refresh_token': refresh_token,
-                'token_type': 'bearer',
-                'user_id': user.pk,
-                'email': email,
-                'username': user.username
-            })
-            return redirect(f'/?{success_params}')
-            
+                return self._unauthorized_email_response(request, email)
+            return self._login_redirect(user, email)
         except Exception as e:
-            # Check if this is an API request
-            if request.headers.get('Accept') == 'application/json':
-                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-            else:
-                # Redirect to frontend with error (for browser OAuth flow)
-                error_params = urlencode({'error': str(e)})
-                return redirect(f'/?{error_params}')
-    
+            return self._error_response(request, str(e), status.HTTP_400_BAD_REQUEST)
+
+    async def acallback(self, request):
+        """Async twin of ``callback``: the worker is released while waiting for Google."""
+        code = request.GET.get('code')
+        if not code:
+            return self._error_response(request, 'Authorization code not provided', status.HTTP_400_BAD_REQUEST)
+        try:
+            user_info = await self.google_auth.aget_user_info(code, settings.OAUTH_REDIRECT_URL)
+            email = user_info['email']
+            User = get_user_model()
+            try:
+                user = await User.objects.select_related('tenant').aget(email=email)
+            except User.DoesNotExist:
+                return self._unauthorized_email_response(request, email)
+            return self._login_redirect(user, email)
+        except Exception as e:
+            return self._error_response(request, str(e), status.HTTP_400_BAD_REQUEST)
+
+    @staticmethod
+    def _error_response(request, message, status_code):
+        # Check if this is an API request (has Accept: application/json header)
+        if request.headers.get('Accept') == 'application/json':
+            return Response({'error': message}, status=status_code)
+        # Redirect to frontend with error (for browser OAuth flow)
+        error_params = urlencode({'error': message})
+        return redirect(f'/?{error_params}')
+
+    def _unauthorized_email_response(self, request, email):
+        error_message = f"User with email {email} is not authorized. Please contact your administrator."
+        return self._error_response(request, error_message, status.HTTP_403_FORBIDDEN)
+
+    @staticmethod
+    def _login_redirect(user, email):
+        # Create Simple JWT tokens
+        refresh = TenantRefreshToken.for_user(user)
+        access_token = str(refresh.access_token)
+        refresh_token = str(refresh)
+        # Redirect to frontend with success data (for browser OAuth flow)
+        success_params = urlencode({
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'token_type': 'bearer',
+            'user_id': user.pk,
+            'email': email,
+            'username': user.username
+        })
+        return redirect(f'/?{success_params}')
+
     @action(detail=False, methods=['post'], url_path='refresh')
     def refresh_token(self, request):
         """Refresh JWT access token using refresh token"""
@@ -110,3 +132,30 @@ class GoogleAuthController(ViewSet):
             
         except Exception as e:
             return Response({'error': 'Invalid refresh token'}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+class TenantProvisioningController(APIView):
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """Queue the creation of many tenants: {"schema_names": [...]} -> job id"""
+        schema_names = request.data.get('schema_names')
+        if not schema_names or not isinstance(schema_names, list):
+            return Response({'error': 'schema_names must be a non empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            validate_schema_names(schema_names)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        job = enqueue(PROVISION_TENANTS_JOB, {'schema_names': schema_names})
+        return Response({'job_id': job.pk, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+class JobController(RetrieveModelMixin, GenericViewSet):
+    """Status polling for background jobs: users see their tenant's jobs, admins every job."""
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(tenant_id=user.tenant_id, tenant__isnull=False)
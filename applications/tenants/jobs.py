@@ -0,0 +1,19 @@
+from applications.tenants.services.jobs import job_handler, report_progress
+from applications.tenants.services.tenant_provisioning import provision_tenants
+
+PROVISION_TENANTS_JOB = 'tenants.provision'
+
+
+@job_handler(PROVISION_TENANTS_JOB)
+def provision_tenants_job(job):
+    schema_names = list(dict.fromkeys(job.payload['schema_names']))
+    provisioned = []
+
+    def on_provisioned(tenant, seconds):
+        provisioned.append(tenant.schema_name)
+        report_progress(job, {'provisioned': len(provisioned), 'total': len(schema_names)})
+
+    # A retry after a failed attempt skips the tenants that attempt already built.
+    tenants, durations = provision_tenants(schema_names, on_provisioned=on_provisioned)
+    return {'tenants': [{'id': tenant.pk, 'schema_name': tenant.schema_name,
+                         'seconds': durations.get(tenant.schema_name)} for tenant in tenants]}
@@ -0,0 +1,36 @@
+from statistics import mean, median
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from applications.tenants.models import Tenant
+from applications.tenants.services.tenant_provisioning import (CLONE_MODE, MIGRATE_MODE, build_template_schema,
+                                                                provision_tenants)
+
+
+class Command(BaseCommand):
+    help = 'Compares tenant provisioning time when cloning the template schema versus replaying migrations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=5, help='Tenants provisioned per mode.')
+        parser.add_argument('--prefix', default='bench_provisioning_', help='Schema name prefix of the throwaway tenants.')
+
+    def handle(self, *args, **options):
+        build_template_schema()
+        for mode in (CLONE_MODE, MIGRATE_MODE):
+            schema_names = [f"{options['prefix']}{mode}_{n}" for n in range(options['count'])]
+            # Single threaded command: switching the setting django-tenants reads is safe here.
+            with override_settings(TENANT_CREATION_FAKES_MIGRATIONS=mode == CLONE_MODE):
+                tenants, durations = provision_tenants(schema_names)
+            try:
+                timings = list(durations.values())
+                self.stdout.write(f'{mode}: {len(timings)} tenants, mean {mean(timings):.3f} s, '
+                                  f'median {median(timings):.3f} s, max {max(timings):.3f} s')
+            finally:
+                self._drop(tenants)
+
+    @staticmethod
+    def _drop(tenants):
+        for tenant in Tenant.objects.filter(pk__in=[tenant.pk for tenant in tenants]):
+            tenant.auto_drop_schema = True
+            tenant.delete(force_drop=True)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from applications.tenants.services.tenant_provisioning import build_template_schema, get_template_schema_name
+
+
+class Command(BaseCommand):
+    help = 'Creates and migrates the template schema new tenants are cloned from.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Drop the template schema and build it again.')
+
+    def handle(self, *args, **options):
+        build_template_schema(rebuild=options['rebuild'])
+        self.stdout.write(f'Template schema {get_template_schema_name()} is up to date.')
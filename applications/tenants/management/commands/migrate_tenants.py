@@ -0,0 +1,114 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django_tenants.utils import schema_exists
+
+from applications.tenants.models import Tenant
+from applications.tenants.services.tenant_provisioning import get_template_schema_name
+from applications.tenants.services.tenant_resolution_cache import get_public_schema_name
+
+SCHEMA_SIZES_QUERY = '''
+    SELECT n.nspname, COALESCE(SUM(pg_total_relation_size(c.oid)), 0)
+    FROM pg_namespace n LEFT JOIN pg_class c ON c.relnamespace = n.oid
+    WHERE n.nspname = ANY(%s)
+    GROUP BY n.nspname
+'''
+
+
+class Command(BaseCommand):
+    help = ('Migrates the shared schema and then every tenant schema concurrently, biggest schemas first. Schemas that '
+            'are already up to date are skipped, so re-running after a failure resumes where it stopped.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                            help='Maximum number of schemas migrated at the same time.')
+        parser.add_argument('--serial', action='store_true',
+                            help='Use the serial django-tenants runner (migrate_schemas) instead.')
+
+    def handle(self, *args, **options):
+        if options['serial']:
+            call_command('migrate_schemas', interactive=False, verbosity=options['verbosity'])
+            return
+        started = time.perf_counter()
+        call_command('migrate_schemas', shared=True, interactive=False, verbosity=options['verbosity'])
+        schema_names = self._tenant_schemas_biggest_first()
+        results = self._migrate_concurrently(schema_names, options['processes'])
+        self._report(results, time.perf_counter() - started)
+
+    @staticmethod
+    def _tenant_schemas_biggest_first():
+        schema_names = list(Tenant.objects.exclude(schema_name=get_public_schema_name())
+                            .values_list('schema_name', flat=True))
+        # The template new tenants are cloned from must stay as migrated as the tenants themselves.
+        if schema_exists(get_template_schema_name()):
+            schema_names.append(get_template_schema_name())
+        with connection.cursor() as cursor:
+            cursor.execute(SCHEMA_SIZES_QUERY, [schema_names])
+            sizes = dict(cursor.fetchall())
+        return sorted(schema_names, key=lambda schema_name: sizes.get(schema_name, 0), reverse=True)
+
+    def _migrate_concurrently(self, schema_names, processes):
+        # Forked workers must not share the parent's sockets (nor its pool threads).
+        _close_connections()
+        results = []
+        with ProcessPoolExecutor(max_workers=max(1, processes), initializer=_setup_worker) as executor:
+            futures = [executor.submit(_migrate_schema, schema_name) for schema_name in schema_names]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                self._report_schema(result)
+        return results
+
+    def _report_schema(self, result):
+        schema_name, status, duration, error = result
+        message = f'{schema_name}: {status} in {duration:.2f} s'
+        if error:
+            self.stderr.write(self.style.ERROR(f'{message}: {error}'))
+        else:
+            self.stdout.write(message)
+
+    def _report(self, results, total_duration):
+        failed = [schema_name for schema_name, status, _, _ in results if status == 'failed']
+        migrated = sum(1 for _, status, _, _ in results if status == 'migrated')
+        skipped = sum(1 for _, status, _, _ in results if status == 'up to date')
+        slowest = max(results, key=lambda result: result[2], default=None)
+        self.stdout.write(f'{len(results)} tenant schemas in {total_duration:.2f} s: {migrated} migrated, '
+                          f'{skipped} up to date, {len(failed)} failed.')
+        if slowest is not None:
+            self.stdout.write(f'Slowest schema: {slowest[0]} ({slowest[2]:.2f} s)')
+        if failed:
+            raise CommandError(f'Migrations failed for: {", ".join(sorted(failed))}. Re-run to resume.')
+
+
+def _setup_worker():
+    if not apps.ready:
+        django.setup()
+
+
+def _migrate_schema(schema_name):
+    started = time.perf_counter()
+    try:
+        connection.set_schema(schema_name, include_public=False)
+        executor = MigrationExecutor(connection)
+        if not executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            return schema_name, 'up to date', time.perf_counter() - started, None
+        call_command('migrate_schemas', schema_name=schema_name, interactive=False, verbosity=0)
+        return schema_name, 'migrated', time.perf_counter() - started, None
+    except Exception as e:
+        return schema_name, 'failed', time.perf_counter() - started, str(e)
+    finally:
+        _close_connections()
+
+
+def _close_connections():
+    connections.close_all()
+    for database_connection in connections.all(initialized_only=True):
+        if database_connection.settings_dict['OPTIONS'].get('pool'):
+            database_connection.close_pool()
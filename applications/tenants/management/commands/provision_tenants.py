@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from applications.tenants.services.tenant_provisioning import provision_tenants
+
+
+class Command(BaseCommand):
+    help = 'Creates many tenants at once, cloning the template schema unless TENANT_PROVISIONING_MODE is migrate.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('schema_names', nargs='*', help='Schema names of the tenants to create.')
+        parser.add_argument('--count', type=int, default=0, help='Create this many tenants named <prefix><n>.')
+        parser.add_argument('--prefix', default='tenant_', help='Schema name prefix used with --count.')
+
+    def handle(self, *args, **options):
+        schema_names = options['schema_names'] + [f"{options['prefix']}{n}" for n in range(1, options['count'] + 1)]
+        if not schema_names:
+            raise CommandError('Give schema names or --count.')
+        tenants, durations = provision_tenants(schema_names)
+        for schema_name, duration in durations.items():
+            self.stdout.write(f'{schema_name}: {duration:.2f} s')
+        skipped = f' ({len(tenants) - len(durations)} already existed)' if len(tenants) > len(durations) else ''
+        self.stdout.write(self.style.SUCCESS(f'{len(durations)} tenants provisioned in {sum(durations.values()):.2f} s'
+                                             f'{skipped}.'))
@@ -0,0 +1,44 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from applications.tenants.services.jobs import claim_next_job, get_jobs_options, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Runs queued background jobs until stopped (SIGTERM/SIGINT let the current job finish first).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true', help='Exit once no job is ready to run.')
+        parser.add_argument('--sleep', type=float, default=None,
+                            help='Seconds to wait when the queue is empty; defaults to JOBS["POLL_INTERVAL_SECONDS"].')
+
+    def handle(self, *args, **options):
+        poll_interval = options['sleep'] or get_jobs_options()['POLL_INTERVAL_SECONDS']
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        recovered = requeue_stale_jobs()
+        if recovered:
+            self.stdout.write(f'{recovered} stale jobs recovered.')
+        last_stale_check = time.monotonic()
+        while not self._stopping:
+            close_old_connections()
+            if time.monotonic() - last_stale_check > get_jobs_options()['STALE_AFTER_SECONDS']:
+                requeue_stale_jobs()
+                last_stale_check = time.monotonic()
+            job = claim_next_job()
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(poll_interval)
+                continue
+            started = time.perf_counter()
+            run_job(job)
+            self.stdout.write(f'{job} in {time.perf_counter() - started:.2f} s')
+        self.stdout.write(self.style.SUCCESS('Worker stopped.'))
+
+    def _stop(self, *_):
+        self._stopping = True
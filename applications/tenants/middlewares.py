@@ -1,27 +1,32 @@
-from django.db import connection
 from django_tenants.middleware.main import TenantMainMiddleware
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 
-from .models import Tenant
+from applications.core.services.request_timing import measure
+from applications.core.services.token_verification import validate_request_token
+
+from .context import activate_tenant
+from .models import Tenant, User
+from .services.tenant_resolution_cache import (TenantResolution, aget_public_tenant, get_public_tenant,
+                                               get_tenant_resolution_cache, resolution_for_user)
+from .tokens import SCHEMA_NAME_CLAIM, TENANT_ID_CLAIM
 
 
 class UserTenantMiddleware(TenantMainMiddleware):
+    jwt_auth = JWTAuthentication()
+
     def process_request(self, request):
-        if self._requires_public(request):
-            return self._setup_public_tenant()
-        return self._setup_user_tenant(request)
+        with measure('tenant'):
+            return self._process_request(request)
 
-    def _requires_public(self, request):
+    def _process_request(self, request):
         if self._is_public_path(request.path):
-            return True
-        user = self._get_user_from_jwt(request)
-        if user is None:
-            return True
-        request.user = user
-        if self._is_public_admin(user):
-            return True
-        return False
+            return self._setup_public_tenant()
+        resolution = self._resolve_tenant(request)
+        if resolution is None or resolution.is_public:
+            return self._setup_public_tenant()
+        return self._setup_user_tenant(request, resolution)
 
     @staticmethod
     def _is_public_path(path):
@@ -29,30 +34,92 @@ class UserTenantMiddleware(TenantMainMiddleware):
                 path.startswith('/healthcheck/') or
                 path.startswith('/tenants/auth/'))
 
-    @staticmethod
-    def _is_public_admin(user):
-        return user.tenant is None
-
     @staticmethod
     def _setup_public_tenant():
-        tenant, _ = Tenant.objects.get_or_create(schema_name='public')
-        connection.set_tenant(tenant)
+        activate_tenant(get_public_tenant())
         return None
 
+    def _resolve_tenant(self, request):
+        user_id, resolution = self._resolve_tenant_without_queries(request)
+        if user_id is None or resolution is not None:
+            return resolution
+        user = User.objects.select_related('tenant').filter(pk=user_id).first()
+        return self._remember_resolution(user_id, user)
+
+    def _resolve_tenant_without_queries(self, request):
+        token = self._get_validated_token(request)
+        if token is None:
+            return None, None
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return None, None
+        cache = get_tenant_resolution_cache()
+        resolution = cache.get(user_id)
+        if resolution is None and cache.is_shared:
+            # Claims outlive tenant reassignments; only a shared cache pins the new tenant for every worker (see
+            # signals.refresh_user_tenant_resolution). Without one, misses are resolved from the database.
+            resolution = self._get_resolution_from_claims(token)
+        return user_id, resolution
+
     @staticmethod
-    def _get_user_from_jwt(request):
+    def _remember_resolution(user_id, user):
+        if user is None:
+            return None
+        resolution = resolution_for_user(user)
+        get_tenant_resolution_cache().set(user_id, resolution)
+        return resolution
+
+    def _get_validated_token(self, request):
+        header = self.jwt_auth.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.jwt_auth.get_raw_token(header)
+        if raw_token is None:
+            return None
         try:
-            jwt_auth = JWTAuthentication()
-            auth_result = jwt_auth.authenticate(request)
-            if auth_result is not None:
-                user, token = auth_result
-                return user
+            return validate_request_token(request, raw_token, self.jwt_auth.get_validated_token)
         except (InvalidToken, TokenError):
-            pass
-        return None
+            return None
+
+    @staticmethod
+    def _get_resolution_from_claims(token):
+        if SCHEMA_NAME_CLAIM not in token:
+            return None
+        return TenantResolution(tenant_id=token.get(TENANT_ID_CLAIM), schema_name=token[SCHEMA_NAME_CLAIM])
 
     @staticmethod
-    def _setup_user_tenant(request):
-        request.tenant = request.user.tenant
-        connection.set_tenant(request.tenant)
+    def _setup_user_tenant(request, resolution):
+        request.tenant = Tenant(id=resolution.tenant_id, schema_name=resolution.schema_name)
+        activate_tenant(request.tenant)
         return None
+
+
+class AsyncUserTenantMiddleware(UserTenantMiddleware):
+    """
+    Same tenant resolution as ``UserTenantMiddleware``, but under ASGI it runs on the event loop instead of hopping to
+    a thread: the cache/claims path is pure CPU and the fallback query uses the async ORM. The tenant is activated in
+    the request's own context, so concurrent requests never see each other's schema.
+    """
+
+    async def __acall__(self, request):
+        await self.aprocess_request(request)
+        return await self.get_response(request)
+
+    async def aprocess_request(self, request):
+        with measure('tenant'):
+            return await self._aprocess_request(request)
+
+    async def _aprocess_request(self, request):
+        if self._is_public_path(request.path):
+            return activate_tenant(await aget_public_tenant())
+        resolution = await self._aresolve_tenant(request)
+        if resolution is None or resolution.is_public:
+            return activate_tenant(await aget_public_tenant())
+        return self._setup_user_tenant(request, resolution)
+
+    async def _aresolve_tenant(self, request):
+        user_id, resolution = self._resolve_tenant_without_queries(request)
+        if user_id is None or resolution is not None:
+            return resolution
+        user = await User.objects.select_related('tenant').filter(pk=user_id).afirst()
+        return self._remember_resolution(user_id, user)
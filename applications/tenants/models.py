@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser
-from django.db.models import ForeignKey, PROTECT
+from django.db.models import (CASCADE, PROTECT, CharField, DateTimeField, ForeignKey, Index, JSONField, Model,
+                              PositiveSmallIntegerField, TextField)
+from django.utils import timezone
 from django_tenants.models import TenantMixin, DomainMixin
 
 
@@ -13,3 +15,37 @@ class Tenant(TenantMixin):
 
 class User(AbstractUser):
     tenant = ForeignKey(Tenant, on_delete=PROTECT, null=True, blank=True)
+
+
+class Job(Model):
+    """
+    Unit of background work, kept in the public schema. ``tenant`` is the schema the job runs against (None for
+    public jobs); ``name`` selects the handler registered in ``applications.tenants.services.jobs``.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUSES = [(QUEUED, 'Queued'), (RUNNING, 'Running'), (SUCCEEDED, 'Succeeded'), (FAILED, 'Failed')]
+
+    tenant = ForeignKey(Tenant, on_delete=CASCADE, null=True, blank=True, related_name='jobs')
+    name = CharField(max_length=100)
+    payload = JSONField(default=dict, blank=True)
+    status = CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = PositiveSmallIntegerField(default=0)
+    max_attempts = PositiveSmallIntegerField(default=3)
+    progress = JSONField(null=True, blank=True)
+    result = JSONField(null=True, blank=True)
+    error = TextField(blank=True)
+    run_after = DateTimeField(default=timezone.now)
+    created_at = DateTimeField(auto_now_add=True)
+    started_at = DateTimeField(null=True, blank=True)
+    heartbeat_at = DateTimeField(null=True, blank=True)
+    finished_at = DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [Index(fields=['status', 'run_after'], name='tenants_job_status_run_after'),
+                   Index(fields=['tenant', 'status'], name='tenants_job_tenant_status')]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
@@ -0,0 +1,92 @@
+from weakref import WeakKeyDictionary
+
+from django_tenants.postgresql_backend.base import DatabaseWrapper as TenantDatabaseWrapper
+
+from applications.tenants.context import _current_tenant
+
+
+class DatabaseWrapper(TenantDatabaseWrapper):
+    """
+    django-tenants backend that remembers which ``search_path`` every physical connection already has, so a connection
+    handed back by the pool (or kept alive by ``CONN_MAX_AGE``) only gets ``SET search_path`` when the tenant changes.
+    Relies on ``TENANT_LIMIT_SET_CALLS`` so the parent class skips the statement when told the path is already set.
+
+    The tenant is also recorded in the current context (``applications.tenants.context``) and re-applied to whichever
+    thread's connection opens a cursor: under ASGI the middleware runs on the event loop while views and async ORM
+    calls query from executor threads, each with its own connection.
+    """
+    _applied_search_paths = WeakKeyDictionary()
+    executed_search_path_sets = 0
+    skipped_search_path_sets = 0
+    _records_tenant = False
+
+    def __init__(self, *args, **kwargs):
+        # The parent resets to public here: that is a new thread's default, not a tenant the context chose.
+        super().__init__(*args, **kwargs)
+        self._records_tenant = True
+
+    def set_tenant(self, tenant, include_public=True):
+        super().set_tenant(tenant, include_public=include_public)
+        self._record_tenant()
+
+    def set_schema(self, schema_name, include_public=True, tenant_type=None):
+        super().set_schema(schema_name, include_public=include_public, tenant_type=tenant_type)
+        self._record_tenant()
+
+    def set_schema_to_public(self):
+        super().set_schema_to_public()
+        self._record_tenant()
+
+    def _record_tenant(self):
+        if self._records_tenant:
+            _current_tenant.set(self.tenant)
+
+    def _apply_current_tenant(self):
+        tenant = _current_tenant.get()
+        if tenant is not None and tenant.schema_name != self.schema_name:
+            super().set_tenant(tenant)
+
+    def _cursor(self, name=None):
+        self._apply_current_tenant()
+        self.ensure_connection()
+        raw_connection = self.connection
+        search_paths = self._get_cursor_search_paths()
+        if self._applied_search_paths.get(raw_connection) == search_paths:
+            self.search_path_set_schemas = search_paths
+        elif getattr(self, '_search_path_connection', None) is not raw_connection:
+            self.search_path_set_schemas = None
+        self._search_path_connection = raw_connection
+        if self.search_path_set_schemas == search_paths:
+            DatabaseWrapper.skipped_search_path_sets += 1
+        else:
+            DatabaseWrapper.executed_search_path_sets += 1
+        cursor = super()._cursor(name=name)
+        # A SET inside a transaction is undone by a rollback, so only autocommit sets are trusted across requests.
+        if self.search_path_set_schemas and not self.in_atomic_block:
+            self._applied_search_paths[raw_connection] = self.search_path_set_schemas
+        else:
+            self._applied_search_paths.pop(raw_connection, None)
+        return cursor
+
+    def _rollback(self):
+        super()._rollback()
+        self._forget_search_path()
+
+    def _savepoint_rollback(self, sid):
+        super()._savepoint_rollback(sid)
+        self._forget_search_path()
+
+    def _forget_search_path(self):
+        self.search_path_set_schemas = None
+        if self.connection is not None:
+            self._applied_search_paths.pop(self.connection, None)
+
+    def get_pool_stats(self):
+        stats = {
+            'conn_max_age': self.settings_dict.get('CONN_MAX_AGE'),
+            'search_path_sets_executed': DatabaseWrapper.executed_search_path_sets,
+            'search_path_sets_skipped': DatabaseWrapper.skipped_search_path_sets,
+        }
+        if self.settings_dict['OPTIONS'].get('pool'):
+            stats.update(self.pool.get_stats())
+        return stats
@@ -0,0 +1,17 @@
+from rest_framework.serializers import ModelSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from applications.tenants.models import Job
+from applications.tenants.tokens import TenantRefreshToken
+
+
+class TenantTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = TenantRefreshToken
+
+
+class JobSerializer(ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'status', 'attempts', 'max_attempts', 'progress', 'result', 'error', 'created_at',
+                  'started_at', 'finished_at']
+        read_only_fields = fields
@@ -1,12 +1,20 @@
+import asyncio
+import re
 import secrets
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from urllib.parse import urlencode
 
+import httpx
 import requests
 from django.conf import settings
-from jwt import encode, decode
-from jwt.exceptions import InvalidTokenError
+from jwt import PyJWK, decode, encode, get_unverified_header
+from jwt.exceptions import InvalidTokenError, PyJWKError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Configuration
 SECRET_KEY = getattr(settings, 'SECRET_KEY', secrets.token_urlsafe(32))
@@ -16,6 +24,28 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Google OAuth configuration
 GOOGLE_CLIENT_ID = getattr(settings, 'GOOGLE_CLIENT_ID', 'demo_client_id')
 GOOGLE_CLIENT_SECRET = getattr(settings, 'GOOGLE_CLIENT_SECRET', 'demo_client_secret')
+DEFAULT_OPTIONS = {
+    'AUTHORIZATION_ENDPOINT': 'https://accounts.google.com/o/oauth2/v2/auth',
+    'TOKEN_ENDPOINT': 'https://oauth2.googleapis.com/token',
+    'USERINFO_ENDPOINT': 'https://www.googleapis.com/oauth2/v2/userinfo',
+    'JWKS_URI': 'https://www.googleapis.com/oauth2/v3/certs',
+    'ISSUERS': ('https://accounts.google.com', 'accounts.google.com'),
+    'CONNECT_TIMEOUT': 3.05,
+    'READ_TIMEOUT': 10,
+    'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.2,
+    'POOL_SIZE': 10,
+    'VERIFY_ID_TOKEN': True,
+    'JWKS_CACHE_SECONDS': 3600,
+    'JWKS_MIN_REFRESH_SECONDS': 60,
+    'CLOCK_SKEW_SECONDS': 30,
+}
+RETRY_STATUSES = (500, 502, 503, 504)
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def get_google_auth_options():
+    return {**DEFAULT_OPTIONS, **getattr(settings, 'GOOGLE_AUTH', {})}
 
 
 class GoogleAuthException(Exception):
@@ -26,13 +56,71 @@ class GoogleAuthException(Exception):
         super().__init__(self.message)
 
 
+class GoogleSigningKeys:
+    """
+    Google's ID token signing keys, cached for the JWKS response's ``max-age`` (``JWKS_CACHE_SECONDS`` without one).
+    An unknown ``kid`` (key rotation) triggers a refetch, at most once every ``JWKS_MIN_REFRESH_SECONDS``.
+    """
+
+    def __init__(self, cache_seconds, min_refresh_seconds):
+        self.cache_seconds = cache_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self._keys = {}
+        self._expires_at = 0
+        self._fetched_at = None
+        self._lock = threading.Lock()
+
+    def needs_fetch(self, kid) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._expires_at:
+                return True
+            return kid not in self._keys and now - self._fetched_at >= self.min_refresh_seconds
+
+    def store(self, jwks: dict, max_age: Optional[int]):
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            try:
+                keys[jwk['kid']] = PyJWK(jwk).key
+            except (KeyError, PyJWKError):
+                continue
+        now = time.monotonic()
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + (self.cache_seconds if max_age is None else max_age)
+
+    def get(self, kid):
+        with self._lock:
+            key = self._keys.get(kid)
+        if key is None:
+            raise GoogleAuthException("ID token signed with an unknown key", status_code=400)
+        return key
+
+
 class GoogleAuth:
-    def __init__(self):
+    """
+    Google OAuth client. Calls go through one keep-alive session per process (``get_google_auth``) with
+    ``CONNECT_TIMEOUT``/``READ_TIMEOUT`` bounds; on both the sync and async paths connection errors are retried, and
+    so are 5xx answers to GETs (the code exchange is a POST of a single-use code, so it is only retried when it never
+    reached Google). When the token
+    response carries an ``id_token`` it is verified against Google's cached signing keys and the userinfo call is
+    skipped.
+    """
+
+    def __init__(self, options: Optional[dict] = None):
+        self.options = {**get_google_auth_options(), **(options or {})}
         self.client_id = GOOGLE_CLIENT_ID
         self.client_secret = GOOGLE_CLIENT_SECRET
-        self.authorization_endpoint = "https://accounts.google.com/o/oauth2/v2/auth"
-        self.token_endpoint = "https://oauth2.googleapis.com/token"
-        self.userinfo_endpoint = "https://www.googleapis.com/oauth2/v2/userinfo"
+        self.authorization_endpoint = self.options['AUTHORIZATION_ENDPOINT']
+        self.token_endpoint = self.options['TOKEN_ENDPOINT']
+        self.userinfo_endpoint = self.options['USERINFO_ENDPOINT']
+        self.jwks_uri = self.options['JWKS_URI']
+        self.timeout = (self.options['CONNECT_TIMEOUT'], self.options['READ_TIMEOUT'])
+        self.session = self._build_session()
+        self.signing_keys = GoogleSigningKeys(self.options['JWKS_CACHE_SECONDS'],
+                                              self.options['JWKS_MIN_REFRESH_SECONDS'])
+        self._async_clients = weakref.WeakKeyDictionary()
 
     def get_authorization_url(self, redirect_uri: str) -> str:
         """Get Google OAuth authorization URL"""
@@ -48,8 +136,80 @@ class GoogleAuth:
 
     def get_user_info(self, authorization_code: str, redirect_uri: str) -> dict:
         """Exchange authorization code for user info"""
-        # Exchange code for token
-        token_data = {
+        token_response = self._send('POST', self.token_endpoint,
+                                    data=self._token_data(authorization_code, redirect_uri))
+        token_json = self._parse_token_response(token_response)
+        id_token = self._id_token(token_json)
+        if id_token is not None:
+            kid = self._key_id(id_token)
+            if self.signing_keys.needs_fetch(kid):
+                self.signing_keys.store(*self._parse_jwks(self._send('GET', self.jwks_uri)))
+            return self._parse_id_token(id_token, self.signing_keys.get(kid))
+        access_token = self._parse_access_token(token_json)
+        user_response = self._send('GET', self.userinfo_endpoint, headers=self._userinfo_headers(access_token))
+        return self._parse_user_info(user_response)
+
+    async def aget_user_info(self, authorization_code: str, redirect_uri: str) -> dict:
+        """Same as ``get_user_info`` but awaits Google instead of blocking the worker"""
+        token_response = await self._asend('POST', self.token_endpoint,
+                                           data=self._token_data(authorization_code, redirect_uri))
+        token_json = self._parse_token_response(token_response)
+        id_token = self._id_token(token_json)
+        if id_token is not None:
+            kid = self._key_id(id_token)
+            if self.signing_keys.needs_fetch(kid):
+                self.signing_keys.store(*self._parse_jwks(await self._asend('GET', self.jwks_uri)))
+            return self._parse_id_token(id_token, self.signing_keys.get(kid))
+        access_token = self._parse_access_token(token_json)
+        user_response = await self._asend('GET', self.userinfo_endpoint,
+                                          headers=self._userinfo_headers(access_token))
+        return self._parse_user_info(user_response)
+
+    def _build_session(self) -> requests.Session:
+        # POST is not in the default allowed methods: only connection errors are retried for it.
+        retry = Retry(total=self.options['RETRIES'], backoff_factor=self.options['BACKOFF_FACTOR'],
+                      status_forcelist=RETRY_STATUSES, raise_on_status=False)
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=self.options['POOL_SIZE'])
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _send(self, method: str, url: str, **kwargs):
+        try:
+            return self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            raise GoogleAuthException("Google did not answer, please try again", status_code=502)
+
+    async def _asend(self, method: str, url: str, **kwargs):
+        # The transport retries connection errors; 5xx answers to GETs are retried here, like the session's Retry.
+        retries = self.options['RETRIES'] if method == 'GET' else 0
+        for attempt in range(retries + 1):
+            if attempt > 1:
+                await asyncio.sleep(self.options['BACKOFF_FACTOR'] * 2 ** (attempt - 1))
+            try:
+                response = await self._async_client().request(method, url, **kwargs)
+            except httpx.HTTPError:
+                raise GoogleAuthException("Google did not answer, please try again", status_code=502)
+            if response.status_code not in RETRY_STATUSES:
+                break
+        return response
+
+    def _async_client(self) -> httpx.AsyncClient:
+        # An AsyncClient is bound to the event loop that first used it: one per loop (one per ASGI worker).
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.options['POOL_SIZE'],
+                                  max_keepalive_connections=self.options['POOL_SIZE'])
+            transport = httpx.AsyncHTTPTransport(retries=self.options['RETRIES'], limits=limits)
+            timeout = httpx.Timeout(self.options['READ_TIMEOUT'], connect=self.options['CONNECT_TIMEOUT'])
+            client = httpx.AsyncClient(transport=transport, timeout=timeout)
+            self._async_clients[loop] = client
+        return client
+
+    def _token_data(self, authorization_code: str, redirect_uri: str) -> dict:
+        return {
             'client_id': self.client_id,
             'client_secret': self.client_secret,
             'code': authorization_code,
@@ -57,14 +217,20 @@ class GoogleAuth:
             'redirect_uri': redirect_uri
         }
 
-        token_response = requests.post(self.token_endpoint, data=token_data)
+    @staticmethod
+    def _parse_token_response(token_response) -> dict:
         if token_response.status_code != 200:
             raise GoogleAuthException(
                 "Failed to exchange authorization code for token",
                 status_code=400
             )
+        return token_response.json()
 
-        token_json = token_response.json()
+    def _id_token(self, token_json: dict) -> Optional[str]:
+        return token_json.get('id_token') if self.options['VERIFY_ID_TOKEN'] else None
+
+    @staticmethod
+    def _parse_access_token(token_json: dict) -> str:
         access_token = token_json.get('access_token')
 
         if not access_token:
@@ -72,11 +238,47 @@ class GoogleAuth:
                 "No access token received from Google",
                 status_code=400
             )
+        return access_token
 
-        # Get user info
-        headers = {'Authorization': f'Bearer {access_token}'}
-        user_response = requests.get(self.userinfo_endpoint, headers=headers)
+    @staticmethod
+    def _key_id(id_token: str) -> Optional[str]:
+        try:
+            return get_unverified_header(id_token).get('kid')
+        except InvalidTokenError:
+            raise GoogleAuthException("Invalid ID token received from Google", status_code=400)
+
+    @staticmethod
+    def _parse_jwks(jwks_response):
+        if jwks_response.status_code != 200:
+            raise GoogleAuthException(
+                "Failed to get Google signing keys",
+                status_code=502
+            )
+        max_age = _MAX_AGE.search(jwks_response.headers.get('Cache-Control', ''))
+        return jwks_response.json(), int(max_age.group(1)) if max_age else None
 
+    def _parse_id_token(self, id_token: str, key) -> dict:
+        try:
+            claims = decode(id_token, key, algorithms=['RS256'], audience=self.client_id,
+                            leeway=self.options['CLOCK_SKEW_SECONDS'])
+        except InvalidTokenError:
+            raise GoogleAuthException("Invalid ID token received from Google", status_code=400)
+        if claims.get('iss') not in self.options['ISSUERS'] or not claims.get('email'):
+            raise GoogleAuthException("Invalid ID token received from Google", status_code=400)
+        if not claims.get('email_verified'):
+            raise GoogleAuthException("Google account email is not verified", status_code=400)
+        return {
+            'email': claims['email'],
+            'name': claims.get('name', ''),
+            'picture': claims.get('picture', '')
+        }
+
+    @staticmethod
+    def _userinfo_headers(access_token: str) -> dict:
+        return {'Authorization': f'Bearer {access_token}'}
+
+    @staticmethod
+    def _parse_user_info(user_response) -> dict:
         if user_response.status_code != 200:
             raise GoogleAuthException(
                 "Failed to get user info from Google",
@@ -118,3 +320,14 @@ class GoogleAuth:
                 "Could not validate credentials",
                 status_code=401
             )
+
+
+_google_auth = None
+
+
+def get_google_auth() -> GoogleAuth:
+    """Process-wide ``GoogleAuth``, so connections and signing keys are reused across requests."""
+    global _google_auth
+    if _google_auth is None:
+        _google_auth = GoogleAuth()
+    return _google_auth
@@ -0,0 +1,131 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from applications.tenants.context import activate_tenant
+from applications.tenants.models import Job
+from applications.tenants.services.tenant_resolution_cache import get_public_schema_name, get_public_tenant
+
+DEFAULT_MAX_CONCURRENT_PER_TENANT = 2
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF_SECONDS = 10
+DEFAULT_STALE_AFTER_SECONDS = 900
+DEFAULT_POLL_INTERVAL_SECONDS = 1
+# Key of the transaction level advisory lock that serializes claims, so the per tenant limit holds across workers.
+CLAIM_LOCK_KEY = 0x6a6f6273
+
+logger = logging.getLogger(__name__)
+_handlers = {}
+
+
+def get_jobs_options():
+    options = getattr(settings, 'JOBS', {})
+    return {'MAX_CONCURRENT_PER_TENANT': options.get('MAX_CONCURRENT_PER_TENANT', DEFAULT_MAX_CONCURRENT_PER_TENANT),
+            'MAX_ATTEMPTS': options.get('MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS),
+            'RETRY_BACKOFF_SECONDS': options.get('RETRY_BACKOFF_SECONDS', DEFAULT_RETRY_BACKOFF_SECONDS),
+            'STALE_AFTER_SECONDS': options.get('STALE_AFTER_SECONDS', DEFAULT_STALE_AFTER_SECONDS),
+            'POLL_INTERVAL_SECONDS': options.get('POLL_INTERVAL_SECONDS', DEFAULT_POLL_INTERVAL_SECONDS)}
+
+
+def job_handler(name):
+    """Registers the decorated ``function(job)`` as the handler of ``name`` jobs; its return value is the result."""
+    def register(function):
+        _handlers[name] = function
+        return function
+    return register
+
+
+def enqueue(name, payload=None, tenant=None, max_attempts=None):
+    """Queues a ``name`` job to run against ``tenant``'s schema (public when None) and returns it."""
+    if name not in _handlers:
+        raise ValueError(f'Unknown job "{name}"')
+    if tenant is not None and tenant.schema_name == get_public_schema_name():
+        tenant = None
+    return Job.objects.create(name=name, payload=payload or {}, tenant_id=tenant.pk if tenant is not None else None,
+                              max_attempts=max_attempts or get_jobs_options()['MAX_ATTEMPTS'])
+
+
+def report_progress(job, progress):
+    """Stores ``progress`` and counts as a heartbeat: jobs that keep reporting are never taken for stale."""
+    job.progress = progress
+    job.heartbeat_at = timezone.now()
+    Job.objects.filter(pk=job.pk).update(progress=progress, heartbeat_at=job.heartbeat_at)
+
+
+def claim_next_job():
+    """
+    Marks the oldest due job as running and returns it, skipping tenants that already run
+    ``MAX_CONCURRENT_PER_TENANT`` jobs. Returns None when nothing can run now.
+    """
+    limit = get_jobs_options()['MAX_CONCURRENT_PER_TENANT']
+    now = timezone.now()
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_KEY])
+        busy_tenants = (Job.objects.filter(status=Job.RUNNING, tenant__isnull=False).values('tenant')
+                        .annotate(running=Count('id')).filter(running__gte=limit).values('tenant'))
+        job = (Job.objects.select_for_update(skip_locked=True, of=('self',)).select_related('tenant')
+               .filter(status=Job.QUEUED, run_after__lte=now).exclude(tenant__in=busy_tenants)
+               .order_by('run_after', 'id').first())
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        job.save(update_fields=['status', 'attempts', 'started_at', 'heartbeat_at'])
+    return job
+
+
+def run_job(job):
+    """Runs ``job`` with its tenant's schema active and records the outcome, scheduling a retry on failure."""
+    handler = _handlers.get(job.name)
+    activate_tenant(job.tenant or get_public_tenant())
+    try:
+        if handler is None:
+            raise LookupError(f'No handler registered for "{job.name}"')
+        result = handler(job)
+    except Exception:
+        logger.exception('Job %s failed (attempt %s of %s)', job, job.attempts, job.max_attempts)
+        error = traceback.format_exc()
+        connection.set_schema_to_public()
+        _record_failure(job, error)
+    else:
+        connection.set_schema_to_public()
+        job.status = Job.SUCCEEDED
+        job.result = result
+        job.error = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job
+
+
+def _record_failure(job, error):
+    job.error = error
+    if job.attempts < job.max_attempts:
+        backoff = get_jobs_options()['RETRY_BACKOFF_SECONDS'] * 2 ** (job.attempts - 1)
+        job.status = Job.QUEUED
+        job.run_after = timezone.now() + timedelta(seconds=backoff)
+    else:
+        job.status = Job.FAILED
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'run_after', 'finished_at'])
+
+
+def requeue_stale_jobs():
+    """
+    Jobs left running by a worker that died, i.e. with no heartbeat (claim or ``report_progress``) for
+    ``STALE_AFTER_SECONDS``: queued again, or failed when out of attempts. Returns the count.
+    """
+    cutoff = timezone.now() - timedelta(seconds=get_jobs_options()['STALE_AFTER_SECONDS'])
+    stale = Job.objects.filter(Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff),
+                               status=Job.RUNNING)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, error='Worker stopped while running the job', finished_at=timezone.now())
+    requeued = stale.update(status=Job.QUEUED, run_after=timezone.now())
+    return failed + requeued
@@ -0,0 +1,84 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django_tenants.postgresql_backend.base import is_valid_schema_name
+from django_tenants.utils import get_creation_fakes_migrations, schema_exists
+
+CLONE_MODE = 'clone'
+MIGRATE_MODE = 'migrate'
+PROVISIONING_MODES = (CLONE_MODE, MIGRATE_MODE)
+
+logger = logging.getLogger(__name__)
+
+
+def get_template_schema_name():
+    return getattr(settings, 'TENANT_BASE_SCHEMA', 'tenant_template')
+
+
+def get_provisioning_mode():
+    return CLONE_MODE if get_creation_fakes_migrations() else MIGRATE_MODE
+
+
+def build_template_schema(rebuild=False):
+    """Creates (or recreates) the template schema and migrates it like any tenant schema."""
+    template_schema = get_template_schema_name()
+    with connection.cursor() as cursor:
+        if rebuild:
+            cursor.execute(f'DROP SCHEMA IF EXISTS "{template_schema}" CASCADE')
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{template_schema}"')
+    call_command('migrate_schemas', schema_name=template_schema, interactive=False, verbosity=0)
+    connection.set_schema_to_public()
+
+
+def create_tenant_schema(tenant, verbosity=1):
+    """
+    Creates ``tenant``'s schema with django-tenants' ``TenantMixin.create_schema``: with
+    ``TENANT_CREATION_FAKES_MIGRATIONS`` it copies the template schema (built first when missing) and fakes the
+    migrations the copy already has, otherwise it replays every migration.
+    """
+    mode = get_provisioning_mode()
+    started = time.perf_counter()
+    if mode == CLONE_MODE and not schema_exists(get_template_schema_name()):
+        build_template_schema()
+    tenant.create_schema(check_if_exists=True, verbosity=verbosity)
+    duration = time.perf_counter() - started
+    logger.info("Provisioned schema %s (%s) in %.2f s", tenant.schema_name, mode, duration)
+    return duration
+
+
+def validate_schema_names(schema_names):
+    invalid_names = [schema_name for schema_name in schema_names if not is_valid_schema_name(schema_name)]
+    if invalid_names:
+        raise ValueError(f"Invalid schema names: {', '.join(invalid_names)}")
+
+
+def provision_tenants(schema_names, on_provisioned=None):
+    """
+    Creates one tenant per distinct schema name; the new rows are inserted in a single query before the schemas are
+    built. Safe to run again: tenants that already have their schema are skipped, and rows left without one (e.g. by a
+    worker that died) get it built now. ``on_provisioned(tenant, seconds)`` is called after every schema.
+    """
+    from applications.tenants.models import Tenant
+
+    schema_names = list(dict.fromkeys(schema_names))
+    validate_schema_names(schema_names)
+    existing = {tenant.schema_name: tenant for tenant in Tenant.objects.filter(schema_name__in=schema_names)}
+    with transaction.atomic():
+        created = Tenant.objects.bulk_create([Tenant(schema_name=schema_name) for schema_name in schema_names
+                                              if schema_name not in existing])
+    tenants = sorted([*existing.values(), *created], key=lambda tenant: schema_names.index(tenant.schema_name))
+    pending = [tenant for tenant in existing.values() if not schema_exists(tenant.schema_name)] + created
+    durations = {}
+    try:
+        for tenant in pending:
+            durations[tenant.schema_name] = create_tenant_schema(tenant, verbosity=0)
+            if on_provisioned is not None:
+                on_provisioned(tenant, durations[tenant.schema_name])
+    except Exception:
+        # Leave no new tenant rows pointing at schemas that were never built.
+        Tenant.objects.filter(pk__in=[tenant.pk for tenant in created if tenant.schema_name not in durations]).delete()
+        raise
+    return tenants, durations
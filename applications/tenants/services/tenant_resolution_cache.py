@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_MAX_SIZE = 4096
+SHARED_KEY_PREFIX = 'tenant-resolution'
+
+
+@dataclass(frozen=True)
+class TenantResolution:
+    """Tenant a user belongs to. ``tenant_id`` is None for public (admin) users."""
+    tenant_id: Optional[int]
+    schema_name: str
+
+    @property
+    def is_public(self):
+        return self.tenant_id is None
+
+
+class TenantResolutionCache:
+    """
+    Per-process LRU with TTL, optionally backed by a shared Django cache alias so that invalidations done in one
+    worker are seen by the others.
+    """
+    _MISSING = object()
+
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS, max_size=DEFAULT_MAX_SIZE, shared_cache_alias=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.shared_cache_alias = shared_cache_alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'TENANT_RESOLUTION_CACHE', {})
+        return cls(ttl=options.get('TTL', DEFAULT_TTL_SECONDS), max_size=options.get('MAX_SIZE', DEFAULT_MAX_SIZE),
+                   shared_cache_alias=options.get('SHARED_CACHE_ALIAS'))
+
+    @property
+    def is_shared(self):
+        return bool(self.shared_cache_alias)
+
+    def get(self, key):
+        resolution = self._get_local(key)
+        if resolution is not None:
+            return resolution
+        resolution = self._get_shared(key)
+        if resolution is not None:
+            self._set_local(key, resolution, self.ttl)
+        return resolution
+
+    def set(self, key, resolution, timeout=None):
+        timeout = timeout or self.ttl
+        self._set_local(key, resolution, timeout)
+        shared_cache = self._shared_cache()
+        if shared_cache is not None:
+            shared_cache.set(self._shared_key(key), (resolution.tenant_id, resolution.schema_name), timeout)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        shared_cache = self._shared_cache()
+        if shared_cache is not None:
+            shared_cache.delete(self._shared_key(key))
+
+    def delete_tenant(self, tenant_id):
+        with self._lock:
+            stale_keys = [key for key, (resolution, _) in self._entries.items() if resolution.tenant_id == tenant_id]
+            for key in stale_keys:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key, self._MISSING)
+            if entry is self._MISSING:
+                return None
+            resolution, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return resolution
+
+    def _set_local(self, key, resolution, timeout):
+        with self._lock:
+            self._entries[key] = (resolution, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, key):
+        shared_cache = self._shared_cache()
+        if shared_cache is None:
+            return None
+        value = shared_cache.get(self._shared_key(key))
+        if value is None:
+            return None
+        tenant_id, schema_name = value
+        return TenantResolution(tenant_id=tenant_id, schema_name=schema_name)
+
+    def _shared_cache(self):
+        if not self.shared_cache_alias:
+            return None
+        return caches[self.shared_cache_alias]
+
+    @staticmethod
+    def _shared_key(key):
+        return f'{SHARED_KEY_PREFIX}:{key}'
+
+
+_cache = None
+_public_tenant = None
+
+
+def get_tenant_resolution_cache():
+    global _cache
+    if _cache is None:
+        _cache = TenantResolutionCache.from_settings()
+    return _cache
+
+
+def get_public_tenant():
+    global _public_tenant
+    if _public_tenant is None:
+        from applications.tenants.models import Tenant
+        _public_tenant, _ = Tenant.objects.get_or_create(schema_name=get_public_schema_name())
+    return _public_tenant
+
+
+async def aget_public_tenant():
+    global _public_tenant
+    if _public_tenant is None:
+        from applications.tenants.models import Tenant
+        _public_tenant, _ = await Tenant.objects.aget_or_create(schema_name=get_public_schema_name())
+    return _public_tenant
+
+
+def forget_public_tenant():
+    global _public_tenant
+    _public_tenant = None
+
+
+def get_public_schema_name():
+    return getattr(settings, 'PUBLIC_SCHEMA_NAME', 'public')
+
+
+def resolution_for_user(user):
+    if user.tenant_id is None:
+        return TenantResolution(tenant_id=None, schema_name=get_public_schema_name())
+    return TenantResolution(tenant_id=user.tenant_id, schema_name=user.tenant.schema_name)
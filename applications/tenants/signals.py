@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from applications.tenants.models import Tenant, User
+from applications.tenants.services.tenant_resolution_cache import (forget_public_tenant, get_public_schema_name,
+                                                                    get_tenant_resolution_cache, resolution_for_user)
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_tenant(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'tenant' not in update_fields:
+        instance._previous_tenant_id = instance.tenant_id
+        return
+    if instance.pk is None:
+        instance._previous_tenant_id = None
+        return
+    instance._previous_tenant_id = sender.objects.filter(pk=instance.pk).values_list('tenant_id', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def refresh_user_tenant_resolution(sender, instance, created, **kwargs):
+    if created or instance.tenant_id == getattr(instance, '_previous_tenant_id', instance.tenant_id):
+        return
+    # Tokens issued before the change still carry the old tenant claims, so the new resolution is pinned in the cache
+    # for as long as those tokens may live.
+    lifetime = settings.SIMPLE_JWT.get('ACCESS_TOKEN_LIFETIME')
+    timeout = int(lifetime.total_seconds()) if lifetime else None
+    get_tenant_resolution_cache().set(instance.pk, resolution_for_user(instance), timeout=timeout)
+
+
+@receiver(post_delete, sender=User)
+def forget_user_tenant_resolution(sender, instance, **kwargs):
+    get_tenant_resolution_cache().delete(instance.pk)
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def forget_tenant_resolutions(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    cache = get_tenant_resolution_cache()
+    cache.delete_tenant(instance.pk)
+    for user_id in User.objects.filter(tenant_id=instance.pk).values_list('pk', flat=True):
+        cache.delete(user_id)
+    if instance.schema_name == get_public_schema_name():
+        forget_public_tenant()
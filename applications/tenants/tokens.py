@@ -0,0 +1,33 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+TENANT_ID_CLAIM = 'tenant_id'
+SCHEMA_NAME_CLAIM = 'schema_name'
+# Read by simplejwt's TokenUser
+IS_STAFF_CLAIM = 'is_staff'
+IS_SUPERUSER_CLAIM = 'is_superuser'
+
+
+class TenantRefreshToken(RefreshToken):
+    """Refresh token carrying the user's tenant and staff flags, copied into every access token derived from it."""
+
+    @classmethod
+    def for_user(cls, user):
+        from applications.tenants.services.tenant_resolution_cache import resolution_for_user
+
+        token = super().for_user(user)
+        resolution = resolution_for_user(user)
+        token[TENANT_ID_CLAIM] = resolution.tenant_id
+        token[SCHEMA_NAME_CLAIM] = resolution.schema_name
+        token[IS_STAFF_CLAIM] = user.is_staff
+        token[IS_SUPERUSER_CLAIM] = user.is_superuser
+        return token
+
+
+class TenantTokenUser(TokenUser):
+    """User built from access token claims alone (``TOKEN_VERIFICATION['STATELESS_READS']``), tenant included."""
+
+    @cached_property
+    def tenant_id(self):
+        return self.token.get(TENANT_ID_CLAIM)
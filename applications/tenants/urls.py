@@ -1,7 +1,10 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from applications.tenants.controllers import GoogleAuthController
+from applications.tenants.controllers import GoogleAuthController, JobController, TenantProvisioningController
 
 router = DefaultRouter()
 router.register(r'auth/google', GoogleAuthController, basename='google-auth')
+router.register(r'jobs', JobController, basename='jobs')
 urlpatterns = router.urls
+urlpatterns += [path('provisioning/', TenantProvisioningController.as_view(), name='tenant-provisioning')]
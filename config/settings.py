@@ -6,6 +6,8 @@ from pathlib import Path
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS').split(',')
 APP_NAME = '<<app name>>'
 APP_DESCRIPTION = '<<app description>>'
+# Serve ReadableWritableModelController list/retrieve and the OAuth callback from async handlers (run config.asgi).
+ASYNC_CONTROLLERS = os.getenv('ASYNC_CONTROLLERS') == 'True'
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator', },
@@ -14,14 +16,35 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 AUTH_USER_MODEL = "tenants.User"  # TODO: remove if tenants is not used
 BASE_DIR = Path(__file__).parent.parent
+# `manage.py benchmark_api`: factories run (create_batch(--rows)) in every benchmark tenant. Add 'SCENARIOS' to replace
+# the default request mix (applications.core.services.load_benchmark.DEFAULT_SCENARIOS) as endpoints are added.
+BENCHMARK = {'FACTORIES': []}
+# 'default' is shared by every worker when REDIS_URL is set; 'local' is the per-process L1 of TenantCache.
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': os.getenv('REDIS_URL')}
+          if os.getenv('REDIS_URL') else {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+          'local': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tenant-cache-l1',
+                    'OPTIONS': {'MAX_ENTRIES': 10000}}}
 CORS_ALLOW_ALL_ORIGINS = True
 CSRF_TRUSTED_ORIGINS = os.getenv('CSRF_TRUSTED_ORIGINS').split(',')
 DATABASE_ROUTERS = ('django_tenants.routers.TenantSyncRouter',)
-# TODO:  In next line, use 'django_tenants.postgresql_backend' for multi tenants.
-DATABASES = {'default': {'ENGINE': 'django.db.backends.postgresql_psycopg2', 'NAME': os.getenv('DATABASE_NAME'),
+# TODO:  In next line, use 'django.db.backends.postgresql' for single tenant.
+# Pooling (psycopg 3) and persistent connections (CONN_MAX_AGE) are mutually exclusive in Django: pick one per deploy.
+DATABASE_POOL = os.getenv('DATABASE_POOL', 'True') == 'True'
+DATABASES = {'default': {'ENGINE': 'applications.tenants.postgresql_backend', 'NAME': os.getenv('DATABASE_NAME'),
                          'USER': os.getenv('DATABASE_USER'), 'PASSWORD': os.getenv('DATABASE_PASSWORD'),
-                         'HOST': os.getenv('DATABASE_HOST'), 'PORT': os.getenv('DATABASE_PORT')}}
-DEBUG = os.getenv('DEBUG')
+                         'HOST': os.getenv('DATABASE_HOST'), 'PORT': os.getenv('DATABASE_PORT'),
+                         'CONN_HEALTH_CHECKS': True,
+                         'CONN_MAX_AGE': 0 if DATABASE_POOL else int(os.getenv('DATABASE_CONN_MAX_AGE', '60')),
+                         'OPTIONS': {'pool': {'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+                                              'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+                                              'timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', '10'))}}
+                         if DATABASE_POOL else {}}}
+DEBUG = os.getenv('DEBUG') == 'True'
+# Google OAuth calls are bounded by these timeouts (seconds); ID tokens are verified locally against cached JWKS.
+GOOGLE_AUTH = {'CONNECT_TIMEOUT': 3.05, 'READ_TIMEOUT': float(os.getenv('GOOGLE_AUTH_TIMEOUT', '10')), 'RETRIES': 2}
+# /health/ready/ reuses its SELECT 1 result this long, so frequent probes from many replicas stay cheap.
+# /health/deep/ answers only `Authorization: Bearer $HEALTH_DEEP_TOKEN` (403 without it or when unset).
+HEALTH_CHECKS = {'READY_CACHE_SECONDS': 2, 'DEEP_TOKEN': os.getenv('HEALTH_DEEP_TOKEN')}
 # region INSTALLED_APPS
 # TODO: keep this to use single tenant
 # DJANGO_APPS = [
@@ -30,6 +53,7 @@ DEBUG = os.getenv('DEBUG')
 #     'django.contrib.contenttypes',
 #     'django.contrib.sessions',
 #     'django.contrib.messages',
+#     'django.contrib.postgres',
 #     'django.contrib.staticfiles'
 # ]
 # LOCAL_APPS = [
@@ -52,6 +76,7 @@ DEBUG = os.getenv('DEBUG')
 #     'django.contrib.contenttypes',
 #     'django.contrib.sessions',
 #     'django.contrib.messages',
+#     'django.contrib.postgres',
 #     'django.contrib.staticfiles',
 #
 #     # External Apps
@@ -98,6 +123,17 @@ DECIMAL_SEPARATOR = ','
 USE_THOUSAND_SEPARATOR = True
 THOUSAND_SEPARATOR = '.'
 # endregion
+# Server-Timing header, Prometheus metrics (METRICS_TOKEN lets scrapers in), slow request log and sampling profiler.
+# TENANT_LABEL adds a schema label to every metric: one series per tenant, so only for a handful of tenants.
+INSTRUMENTATION = {'SERVER_TIMING': os.getenv('SERVER_TIMING', 'True') == 'True',
+                   'TENANT_LABEL': os.getenv('METRICS_TENANT_LABEL') == 'True',
+                   'METRICS_TOKEN': os.getenv('METRICS_TOKEN'),
+                   'SLOW_REQUEST_MS': int(os.getenv('SLOW_REQUEST_MS', '1000')),
+                   'PROFILE_SAMPLE_RATE': float(os.getenv('PROFILE_SAMPLE_RATE', '0')), 'PROFILE_INTERVAL_MS': 5,
+                   'PROFILE_DIR': os.path.join(BASE_DIR, 'profiles')}
+# Background jobs run by `manage.py run_jobs`; failed attempts are retried after RETRY_BACKOFF_SECONDS * 2^(n - 1).
+JOBS = {'MAX_CONCURRENT_PER_TENANT': int(os.getenv('JOBS_MAX_CONCURRENT_PER_TENANT', '2')), 'MAX_ATTEMPTS': 3,
+        'RETRY_BACKOFF_SECONDS': 10, 'STALE_AFTER_SECONDS': 900, 'POLL_INTERVAL_SECONDS': 1}
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -116,12 +152,21 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        'console_verbose': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'verbose',
+        },
     },
     'root': {
         'handlers': ['console'],
         'level': 'INFO',
     },
     'loggers': {
+        'applications.core.middlewares': {
+            'handlers': ['console_verbose'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
         'applications.core.models.company_branch': {
             'handlers': ['console'],
             'level': 'INFO',
@@ -129,8 +174,13 @@ LOGGING = {
         },
     },
 }
+# `import-job/` stores the upload here for the `run_jobs` worker: web and workers must share this directory (a shared
+# volume), or configure a shared STORAGES['default'] backend such as S3.
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
 MIDDLEWARE = [
-    'django_tenants.middleware.main.UserTenantMiddleware',
+    'applications.core.middlewares.HealthCheckMiddleware',
+    'applications.core.middlewares.InstrumentationMiddleware',
+    'applications.tenants.middlewares.AsyncUserTenantMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -141,23 +191,33 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+# 'log' or 'raise' count queries per request and check ReadableWritableModelController.query_budgets.
+QUERY_BUDGET = {'MODE': os.getenv('QUERY_BUDGET_MODE', 'off'), 'N_PLUS_ONE_THRESHOLD': 5}
+# Share of requests whose filter/ordering/search fields are counted for `manage.py report_unindexed_queries`.
+QUERY_USAGE_SAMPLE_RATE = float(os.getenv('QUERY_USAGE_SAMPLE_RATE', '0.01'))
 REST_FRAMEWORK = {
     'COERCE_DECIMAL_TO_STRING': False,
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S.%f',
-    'DEFAULT_AUTHENTICATION_CLASSES': ['rest_framework_simplejwt.authentication.JWTAuthentication'],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_AUTHENTICATION_CLASSES': ['applications.core.controllers.authentication.TimedJWTAuthentication'],
+    'DEFAULT_PAGINATION_CLASS': 'applications.core.controllers.paginations.AsyncLimitOffsetPagination',
+    'DEFAULT_PARSER_CLASSES': ['applications.core.controllers.renderers.ORJSONParser',
+                               'rest_framework.parsers.FormParser',
+                               'rest_framework.parsers.MultiPartParser'],
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
-    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer',
-                                 'rest_framework.renderers.BrowsableAPIRenderer'],
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend',
-                                'rest_framework.filters.OrderingFilter',
-                                'rest_framework.filters.SearchFilter'],
+    # The browsable API costs a template render per response: development only.
+    'DEFAULT_RENDERER_CLASSES': ['applications.core.controllers.renderers.ORJSONRenderer'] +
+                                (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    'DEFAULT_FILTER_BACKENDS': ['applications.core.controllers.filters.IndexedFilterBackend',
+                                'applications.core.controllers.filters.IndexedOrderingFilter',
+                                'applications.core.controllers.filters.IndexedSearchFilter'],
     'EXCEPTION_HANDLER': 'applications.utils.exception_handler',
     'PAGE_SIZE': 20
 }
 ROOT_URLCONF = 'config.urls'
 SECRET_KEY = os.getenv('SECRET_KEY')
-SIMPLE_JWT = {'ACCESS_TOKEN_LIFETIME': timedelta(days=30)}
+SIMPLE_JWT = {'ACCESS_TOKEN_LIFETIME': timedelta(days=30),
+              'TOKEN_OBTAIN_SERIALIZER': 'applications.tenants.serializers.TenantTokenObtainPairSerializer',
+              'TOKEN_USER_CLASS': 'applications.tenants.tokens.TenantTokenUser'}
 # region Static files (CSS, JavaScript, Images)
 STATIC_ROOT = os.path.join(BASE_DIR, 'static_storage')
 STATIC_URL = '/static/'
@@ -181,6 +241,20 @@ TEMPLATES = [{'BACKEND': 'django.template.backends.django.DjangoTemplates',
                                                  'django.template.context_processors.request',
                                                  'django.contrib.auth.context_processors.auth',
                                                  'django.contrib.messages.context_processors.messages']}}]
+TENANT_BASE_SCHEMA = 'tenant_template'
+TENANT_CACHE = {'L1_ALIAS': 'local', 'L2_ALIAS': 'default', 'L1_TIMEOUT': 5, 'TIMEOUT': 300}
+# Lets the tenant backend skip `SET search_path` when the connection already points at the right schema.
+TENANT_LIMIT_SET_CALLS = True
 TENANT_MODEL = 'tenants.Tenant'
+# 'clone' has django-tenants copy TENANT_BASE_SCHEMA for new tenants and fake its migrations, 'migrate' replays them.
+TENANT_CREATION_FAKES_MIGRATIONS = os.getenv('TENANT_PROVISIONING_MODE', 'clone') == 'clone'
+# With a shared cache (REDIS_URL) tenant reassignments are seen by every worker and the tenant can be taken from
+# the token claims; without one, cache misses are resolved from the database (stale for at most TTL seconds).
+TENANT_RESOLUTION_CACHE = {'TTL': 300, 'MAX_SIZE': 4096,
+                           'SHARED_CACHE_ALIAS': 'default' if os.getenv('REDIS_URL') else None}
 TENANT_DOMAIN_MODEL = 'tenants.Domain'
+# Verified access tokens are remembered per process until `exp` (at most MAX_TTL s). STATELESS_READS serves safe
+# methods with a user built from the token claims: no users table query, but deactivations apply at token expiry.
+TOKEN_VERIFICATION = {'MAX_SIZE': 10000, 'MAX_TTL': 300,
+                      'STATELESS_READS': os.getenv('JWT_STATELESS_READS', 'False') == 'True'}
 WSGI_APPLICATION = 'config.wsgi.application'
@@ -2,18 +2,12 @@ from django.conf import settings
 from django.conf.urls.i18n import i18n_patterns
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.contrib.auth import get_user_model
-from django.http import JsonResponse
 from django.urls import include, path
 from django.views.generic import TemplateView
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 
 
-def health_check(_):
-    get_user_model().objects.first()
-    return JsonResponse({'status': 'ok', 'message': 'Application is running', 'database': 'Connection successful'})
-
 # region Admin configuration
 urlpatterns = i18n_patterns(path('admin/', admin.site.urls), prefix_default_language=False)
 admin.site.site_header = settings.APP_NAME
@@ -46,6 +40,6 @@ urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 # endregion
 
 # region Public Routes
+# Health probes (/health/live/, /health/ready/, /health/deep/, /healthcheck/) are answered by HealthCheckMiddleware.
 urlpatterns += i18n_patterns(path('', TemplateView.as_view(template_name="index.html")), prefix_default_language=False)
-urlpatterns += i18n_patterns(path('healthcheck/', health_check), prefix_default_language=False)
 # endregion
@@ -1,22 +1,123 @@
 #!/usr/bin/env python
+import hashlib
+import logging
 import os
+import sys
+import time
+from contextlib import contextmanager
 from datetime import date
+from pathlib import Path
 
 import django
+from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
 from dotenv import load_dotenv
 
-def main():
+logger = logging.getLogger('production_main')
+
+# Execution models: name -> (gunicorn worker class, application)
+SERVER_MODELS = {
+    'sync': ('sync', 'config.wsgi:application'),
+    'gthread': ('gthread', 'config.wsgi:application'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'config.asgi:application'),
+}
+DEFAULT_SERVER_MODEL = 'gthread'
+DEFAULT_TIMEOUT_SECONDS = 30
+DEFAULT_WORKER_MEMORY_MB = 256
+DEFAULT_THREADS_PER_WORKER = 4
+DEFAULT_MAX_REQUESTS = 1000
+DEFAULT_MAX_REQUESTS_JITTER = 100
+_MIGRATIONS_CACHE_KEY = 'release:migrations-applied:{}'
+_STATIC_MANIFEST_NAME = '.collectstatic-hash'
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     load_dotenv()
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
-    django.setup()  # Needed for migrating and createsuperuser
-    call_command("makemigrations", interactive=False)
-    call_command("migrate", interactive=False)
-    call_command("collectstatic", "--no-input")
-    _create_superuser_if_non_existent()
+    with _phase("django setup"):
+        django.setup()  # Needed for migrating and createsuperuser
+    if argv[:1] == ['release']:
+        _release()
+    else:
+        _start_web()
+
+def _release():
+    """One-shot schema and assets work; run once per deploy, before (not inside) the web replicas."""
+    with _phase("makemigrations"):
+        call_command("makemigrations", interactive=False)
+    with _phase("migrate"):
+        call_command("migrate_tenants")
+    _collect_static_if_changed()
+    with _phase("superuser"):
+        _create_superuser_if_non_existent()
+    _remember_migrations_applied()
+
+def _start_web():
+    with _phase("migration check"):
+        pending = not _migrations_applied()
+    if pending:
+        if os.environ.get('MIGRATE_ON_BOOT', 'True') != 'True':
+            raise SystemExit("Unapplied migrations found: run `production_main.py release` before starting the web.")
+        logger.warning("Unapplied migrations found, running the release steps on boot.")
+        _release()
+    else:
+        _collect_static_if_changed()
     _execute_run_command()
 
+@contextmanager
+def _phase(name):
+    started = time.perf_counter()
+    yield
+    logger.info("Startup phase '%s' took %.2f s", name, time.perf_counter() - started)
+
+def _migrations_applied():
+    migrations_hash = _migrations_hash()
+    if cache.get(_MIGRATIONS_CACHE_KEY.format(migrations_hash)):
+        return True
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        return False
+    cache.set(_MIGRATIONS_CACHE_KEY.format(migrations_hash), True, None)
+    return True
+
+def _remember_migrations_applied():
+    cache.set(_MIGRATIONS_CACHE_KEY.format(_migrations_hash()), True, None)
+
+def _migrations_hash():
+    digest = hashlib.sha256()
+    for app_config in apps.get_app_configs():
+        migrations_dir = Path(app_config.path) / 'migrations'
+        for migration_file in sorted(migrations_dir.glob('*.py')):
+            digest.update(f"{app_config.label}/{migration_file.name}".encode())
+            digest.update(migration_file.read_bytes())
+    return digest.hexdigest()
+
+def _collect_static_if_changed():
+    manifest = Path(settings.STATIC_ROOT) / _STATIC_MANIFEST_NAME
+    static_hash = _static_sources_hash()
+    if manifest.exists() and manifest.read_text() == static_hash:
+        logger.info("Static files unchanged, skipping collectstatic")
+        return
+    with _phase("collectstatic"):
+        call_command("collectstatic", "--no-input")
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    manifest.write_text(static_hash)
+
+def _static_sources_hash():
+    digest = hashlib.sha256()
+    for static_dir in settings.STATICFILES_DIRS:
+        for static_file in sorted(Path(static_dir).rglob('*')):
+            if static_file.is_file():
+                file_stat = static_file.stat()
+                digest.update(f"{static_file}:{file_stat.st_size}:{file_stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
 def _create_superuser_if_non_existent():
     user_model = get_user_model()
     superuser_name = os.environ.get("DJANGO_SUPERUSER_USERNAME")
@@ -30,8 +131,76 @@ def _create_superuser_if_non_existent():
                          birthdate=default_birthdate, life_expectancy=80)
 
 def _execute_run_command():
-    gunicorn_command = f"gunicorn --timeout 600 config.wsgi:application"
-    os.execvp("gunicorn", gunicorn_command.split())
+    gunicorn_command = _build_gunicorn_command(os.environ)
+    logger.info("Starting: %s", ' '.join(gunicorn_command))
+    os.execvp("gunicorn", gunicorn_command)
+
+def _build_gunicorn_command(environ):
+    """
+    Reads SERVER_MODEL (sync, gthread or uvicorn), WEB_CONCURRENCY, SERVER_THREADS, SERVER_TIMEOUT,
+    SERVER_WORKER_MEMORY_MB, SERVER_MAX_REQUESTS and SERVER_MAX_REQUESTS_JITTER; anything unset is derived from the
+    container's CPU and memory limits.
+    """
+    server_model = environ.get('SERVER_MODEL', DEFAULT_SERVER_MODEL)
+    if server_model not in SERVER_MODELS:
+        raise ValueError(f"Unknown SERVER_MODEL '{server_model}', expected one of {', '.join(SERVER_MODELS)}")
+    worker_class, application = SERVER_MODELS[server_model]
+    threads = int(environ.get('SERVER_THREADS', DEFAULT_THREADS_PER_WORKER)) if server_model == 'gthread' else 1
+    worker_memory_mb = int(environ.get('SERVER_WORKER_MEMORY_MB', DEFAULT_WORKER_MEMORY_MB))
+    workers = int(environ.get('WEB_CONCURRENCY') or _auto_worker_count(_cpu_count(), _memory_mb(), worker_memory_mb,
+                                                                       threads))
+    command = ['gunicorn', application,
+               '--bind', f"0.0.0.0:{environ.get('PORT', '8000')}",
+               '--worker-class', worker_class,
+               '--workers', str(workers),
+               '--timeout', environ.get('SERVER_TIMEOUT', str(DEFAULT_TIMEOUT_SECONDS)),
+               '--graceful-timeout', environ.get('SERVER_TIMEOUT', str(DEFAULT_TIMEOUT_SECONDS)),
+               '--max-requests', environ.get('SERVER_MAX_REQUESTS', str(DEFAULT_MAX_REQUESTS)),
+               '--max-requests-jitter', environ.get('SERVER_MAX_REQUESTS_JITTER', str(DEFAULT_MAX_REQUESTS_JITTER)),
+               '--preload']
+    if threads > 1:
+        command += ['--threads', str(threads)]
+    return command
+
+def _auto_worker_count(cpu_count, memory_mb, worker_memory_mb, threads):
+    # Classic (2 x CPU) + 1 for sync workers; threaded workers already overlap I/O, so one per CPU is enough.
+    by_cpu = cpu_count + 1 if threads > 1 else cpu_count * 2 + 1
+    if memory_mb is None:
+        return by_cpu
+    by_memory = max(1, memory_mb // worker_memory_mb)
+    return max(1, min(by_cpu, by_memory))
+
+def _cpu_count():
+    quota = _read_cgroup_cpu_quota()
+    available = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    return max(1, min(available, quota)) if quota else available
+
+def _read_cgroup_cpu_quota():
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as cpu_max:
+            quota, period = cpu_max.read().split()
+    except (OSError, ValueError):
+        return None
+    if quota == 'max':
+        return None
+    return max(1, int(quota) // int(period))
+
+def _memory_mb():
+    try:
+        with open('/sys/fs/cgroup/memory.max') as memory_max:
+            limit = memory_max.read().strip()
+        if limit != 'max':
+            return int(limit) // (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
 
 if __name__ == "__main__":
     main()